@@ -6,10 +6,14 @@ Checks if page titles are properly reflected in the page content
 
 import os
 import re
-from bs4 import BeautifulSoup
+import argparse
+from concurrent.futures import ProcessPoolExecutor
 from collections import defaultdict
 import json
 from pathlib import Path
+from bs4 import Tag, NavigableString, CData
+from page_store import PageStore
+from html_parsers import PARSER_BACKENDS
 
 # Common stop words to ignore
 STOP_WORDS = {
@@ -30,16 +34,22 @@ EXCLUDE_SELECTORS = [
 ]
 
 def normalize_word(word):
-    """Normalize a word for comparison (lowercase, remove punctuation, handle plurals)"""
+    """Normalize a word for comparison (lowercase, remove punctuation, handle plurals)
+    
+    Title and body words both go through this, so a plural and its singular
+    always reduce to the same stem ('services' and 'service' -> 'service').
+    """
     # Remove punctuation and convert to lowercase
     word = re.sub(r'[^\w\s]', '', word.lower())
     
     # Basic singular/plural handling
-    if word.endswith('ies'):
+    if word.endswith('ies') and len(word) > 4:
         return word[:-3] + 'y'
-    elif word.endswith('es'):
+    elif word.endswith('sses'):
+        return word[:-2]
+    elif word.endswith('es') and word[:-2].endswith(('x', 'z', 'ch', 'sh')):
         return word[:-2]
-    elif word.endswith('s') and len(word) > 3:
+    elif word.endswith('s') and not word.endswith('ss') and len(word) > 3:
         return word[:-1]
     
     return word
@@ -59,48 +69,87 @@ def extract_title_words(title):
     
     return meaningful_words
 
+def _split_selectors(selectors):
+    """Split simple selectors into tag, class and id lookup sets"""
+    tags, classes, ids = set(), set(), set()
+    for selector in selectors:
+        if selector.startswith('.'):
+            classes.add(selector[1:])
+        elif selector.startswith('#'):
+            ids.add(selector[1:])
+        else:
+            tags.add(selector)
+    return tags, classes, ids
+
+EXCLUDED_TAGS, EXCLUDED_CLASSES, EXCLUDED_IDS = _split_selectors(EXCLUDE_SELECTORS)
+
+def is_excluded(tag):
+    """True if the element matches one of EXCLUDE_SELECTORS"""
+    if tag.name in EXCLUDED_TAGS or tag.get('id') in EXCLUDED_IDS:
+        return True
+    classes = tag.get('class') or ()
+    if isinstance(classes, str):
+        classes = classes.split()
+    return any(cls in EXCLUDED_CLASSES for cls in classes)
+
+def find_content_element(soup, name):
+    """First element with this tag name that is not inside an excluded section"""
+    for element in soup.find_all(name):
+        if not is_excluded(element) and not any(is_excluded(parent) for parent in element.parents if parent.name):
+            return element
+    return None
+
 def extract_body_content(soup):
-    """Extract main body content, excluding navigation and footer"""
-    # Remove excluded elements
-    for selector in EXCLUDE_SELECTORS:
-        for element in soup.select(selector):
-            element.decompose()
+    """Extract main body content, excluding navigation and footer
     
-    # Get text from body
+    Walks the body once, skipping excluded subtrees, and leaves the tree
+    unchanged so other analyzers can share it.
+    """
     body = soup.find('body')
-    if not body:
+    if not body or is_excluded(body):
         return ""
     
-    # Get all text content
-    text = body.get_text(separator=' ', strip=True)
+    # Collect the visible strings outside excluded elements
+    pieces = []
+    stack = [iter(body.contents)]
+    while stack:
+        for node in stack[-1]:
+            if isinstance(node, Tag):
+                if not is_excluded(node):
+                    stack.append(iter(node.contents))
+                    break
+            elif type(node) in (NavigableString, CData):
+                text = node.strip()
+                if text:
+                    pieces.append(text)
+        else:
+            stack.pop()
+    
+    text = ' '.join(pieces)
     
     # Normalize the text
     text = re.sub(r'\s+', ' ', text)
     
     return text.lower()
 
+def content_terms(content):
+    """Tokenize body text once into the set of its normalized word stems"""
+    return {normalize_word(word) for word in re.findall(r'\w+', content.lower())}
+
 def check_words_in_content(title_words, content):
-    """Check which title words are missing from content"""
+    """Check which title words are missing from content
+    
+    `content` is the body text or the term set from content_terms(). Title
+    words are stemmed like the body and matched as whole stems, so 'roof'
+    is found via 'roofs' but not via 'roofing', and never as a fragment of
+    an unrelated word.
+    """
+    terms = content_terms(content) if isinstance(content, str) else content
     missing_words = []
     found_words = []
     
     for word in title_words:
-        # Check for the word and common variations
-        variations = [
-            word,
-            word + 's',  # plural
-            word + 'es', # plural
-            word + 'ing', # gerund
-            word + 'ed',  # past tense
-        ]
-        
-        found = False
-        for variation in variations:
-            if variation in content:
-                found = True
-                break
-        
-        if found:
+        if normalize_word(word) in terms:
             found_words.append(word)
         else:
             missing_words.append(word)
@@ -111,8 +160,8 @@ def suggest_content_improvements(page_file, missing_words, soup):
     """Suggest where to add missing title words"""
     suggestions = []
     
-    # Check if there's an H1 tag
-    h1 = soup.find('h1')
+    # Check if there's an H1 tag in the page content
+    h1 = find_content_element(soup, 'h1')
     if h1:
         h1_text = h1.get_text().lower()
         for word in missing_words:
@@ -120,7 +169,7 @@ def suggest_content_improvements(page_file, missing_words, soup):
                 suggestions.append(f"Consider adding '{word}' to the H1 heading")
     
     # Check first paragraph
-    first_para = soup.find('p')
+    first_para = find_content_element(soup, 'p')
     if first_para:
         para_text = first_para.get_text().lower()
         for word in missing_words:
@@ -140,8 +189,86 @@ def suggest_content_improvements(page_file, missing_words, soup):
     
     return suggestions
 
-def analyze_website(root_path):
-    """Main analysis function"""
+def analyze_page(file_path, root_path, store):
+    """Analyze a single page; returns (page_info or None, console lines)"""
+    relative_path = os.path.relpath(file_path, root_path)
+    messages = []
+    
+    try:
+        soup = store.soup(file_path)
+        
+        # Extract title
+        title_tag = soup.find('title')
+        if not title_tag:
+            messages.append(f"⚠️  {relative_path}: No title tag found")
+            return None, messages
+        
+        title = title_tag.get_text().strip()
+        title_words = extract_title_words(title)
+        
+        if not title_words:
+            messages.append(f"⚠️  {relative_path}: No meaningful words in title")
+            return None, messages
+        
+        # Extract body content
+        body_content = extract_body_content(soup)
+        
+        # Check for missing words
+        found_words, missing_words = check_words_in_content(title_words, body_content)
+        
+        if not missing_words:
+            messages.append(f"✅ {relative_path} - All title words found in content")
+            return None, messages
+        
+        page_info = {
+            'file': relative_path,
+            'title': title,
+            'title_words': title_words,
+            'missing_words': missing_words,
+            'found_words': found_words,
+            'suggestions': suggest_content_improvements(file_path, missing_words, soup)
+        }
+        
+        messages.append(f"\n❌ {relative_path}")
+        messages.append(f"   Title: {title}")
+        messages.append(f"   Missing words: {', '.join(missing_words)}")
+        if page_info['suggestions']:
+            messages.append(f"   Suggestions:")
+            for suggestion in page_info['suggestions'][:3]:
+                messages.append(f"     • {suggestion}")
+        return page_info, messages
+    
+    except Exception as e:
+        messages.append(f"❌ Error processing {relative_path}: {str(e)}")
+        return None, messages
+
+def _analyze_and_release(file_path, root_path, store, release):
+    """Serial path: analyze a page, then drop its tree if nobody else shares the store"""
+    page_result = analyze_page(file_path, root_path, store)
+    if release:
+        store.release(file_path)
+    return page_result
+
+# Per-process page store used by --jobs workers
+_worker_store = None
+
+def _analyze_page_job(job):
+    """Process-pool entry point: analyze one page with this worker's own store"""
+    global _worker_store
+    file_path, root_path, parser = job
+    if _worker_store is None:
+        _worker_store = PageStore(root_path, parser)
+    page_result = analyze_page(file_path, root_path, _worker_store)
+    # Pages are never revisited by the same worker, so don't keep their trees
+    _worker_store.clear()
+    return page_result
+
+def analyze_website(root_path, store=None, jobs=1, parser=None):
+    """Main analysis function
+    
+    With jobs > 1 pages are spread over a process pool. Results are merged in
+    the same order as a serial run, so the report and JSON output are identical.
+    """
     results = {
         'total_pages': 0,
         'pages_with_issues': [],
@@ -149,73 +276,38 @@ def analyze_website(root_path):
         'recommendations': []
     }
     
+    # A store we created is not shared, so pages can be dropped once analyzed
+    owns_store = store is None
+    if owns_store:
+        store = PageStore(root_path, parser)
+    
     # Find all HTML files
-    html_files = []
-    for root, dirs, files in os.walk(root_path):
-        # Skip node_modules and other build directories
-        if 'node_modules' in root or '.git' in root:
-            continue
-        
-        for file in files:
-            if file.endswith('.html'):
-                html_files.append(os.path.join(root, file))
+    html_files = store.html_files()
     
     results['total_pages'] = len(html_files)
     
     print(f"Found {len(html_files)} HTML files to analyze")
     print("-" * 80)
     
-    for file_path in html_files:
-        relative_path = os.path.relpath(file_path, root_path)
-        
-        try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                html_content = f.read()
-            
-            soup = BeautifulSoup(html_content, 'html.parser')
-            
-            # Extract title
-            title_tag = soup.find('title')
-            if not title_tag:
-                print(f"⚠️  {relative_path}: No title tag found")
-                continue
-            
-            title = title_tag.get_text().strip()
-            title_words = extract_title_words(title)
-            
-            if not title_words:
-                print(f"⚠️  {relative_path}: No meaningful words in title")
-                continue
-            
-            # Extract body content
-            body_content = extract_body_content(soup)
-            
-            # Check for missing words
-            found_words, missing_words = check_words_in_content(title_words, body_content)
-            
-            if missing_words:
-                page_info = {
-                    'file': relative_path,
-                    'title': title,
-                    'title_words': title_words,
-                    'missing_words': missing_words,
-                    'found_words': found_words,
-                    'suggestions': suggest_content_improvements(file_path, missing_words, soup)
-                }
-                results['pages_with_issues'].append(page_info)
-                
-                print(f"\n❌ {relative_path}")
-                print(f"   Title: {title}")
-                print(f"   Missing words: {', '.join(missing_words)}")
-                if page_info['suggestions']:
-                    print(f"   Suggestions:")
-                    for suggestion in page_info['suggestions'][:3]:
-                        print(f"     • {suggestion}")
-            else:
-                print(f"✅ {relative_path} - All title words found in content")
-        
-        except Exception as e:
-            print(f"❌ Error processing {relative_path}: {str(e)}")
+    if jobs > 1 and len(html_files) > 1:
+        chunksize = max(1, len(html_files) // (jobs * 4))
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            page_results = executor.map(
+                _analyze_page_job,
+                [(file_path, root_path, store.parser) for file_path in html_files],
+                chunksize=chunksize
+            )
+            # executor.map yields in submission order
+            page_results = list(page_results)
+    else:
+        page_results = (_analyze_and_release(file_path, root_path, store, owns_store)
+                        for file_path in html_files)
+    
+    for page_info, messages in page_results:
+        for message in messages:
+            print(message)
+        if page_info:
+            results['pages_with_issues'].append(page_info)
     
     # Generate summary
     results['summary'] = {
@@ -297,8 +389,18 @@ def generate_report(results):
     print("=" * 80)
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that page titles are reflected in page content")
+    parser.add_argument('root_path', nargs='?',
+                        default="/mnt/c/Users/adams/OneDrive/Desktop/BC Roofing Website",
+                        help="Site directory to analyze")
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help="Number of worker processes (default: 1, serial)")
+    parser.add_argument('--parser', choices=PARSER_BACKENDS + ('auto',), default=None,
+                        help="HTML parser backend (default: html.parser; auto picks the fastest installed)")
+    args = parser.parse_args()
+    
     # Set the root path for analysis
-    root_path = "/mnt/c/Users/adams/OneDrive/Desktop/BC Roofing Website"
+    root_path = args.root_path
     
     if not os.path.exists(root_path):
         print(f"Error: Path {root_path} does not exist")
@@ -308,7 +410,7 @@ if __name__ == "__main__":
     print(f"   Analyzing: {root_path}")
     print("-" * 80)
     
-    results = analyze_website(root_path)
+    results = analyze_website(root_path, jobs=args.jobs, parser=args.parser)
     generate_report(results)
     
     print("\n✅ Analysis complete!")
\ No newline at end of file
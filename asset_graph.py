@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Page Asset Graph for BC Roofing Website
+Maps every page to the stylesheets, scripts, images, fonts and third-party origins it loads and checks page-weight budgets
+"""
+
+import os
+import re
+import sys
+import json
+import gzip
+import fnmatch
+import argparse
+import posixpath
+from collections import namedtuple
+from urllib.parse import urlsplit
+
+from page_store import PageStore
+from html_rewriter import tokenize, parse_attrs
+from fingerprint_assets import resolve_reference, CSS_URL_RE
+from precompress import COMPRESSIBLE_EXTENSIONS
+
+BUDGET_PATH = "page_budgets.json"
+
+KIND_BY_EXTENSION = {
+    '.css': 'css', '.js': 'js', '.mjs': 'js',
+    '.woff': 'font', '.woff2': 'font', '.ttf': 'font', '.otf': 'font', '.eot': 'font',
+    '.png': 'image', '.jpg': 'image', '.jpeg': 'image', '.gif': 'image', '.svg': 'image',
+    '.webp': 'image', '.avif': 'image', '.ico': 'image'
+}
+
+# link rel values that make the browser fetch the target during page load
+FETCHING_RELS = {'stylesheet', 'preload', 'modulepreload', 'icon', 'manifest'}
+
+# What a <link rel="preload" as="..."> fetches
+KIND_BY_PRELOAD_AS = {'style': 'css', 'script': 'js', 'font': 'font', 'image': 'image'}
+
+CSS_IMPORT_RE = re.compile(r'@import\s+(?:url\()?\s*["\']?([^"\')\s;]+)')
+FONT_FACE_RE = re.compile(r'@font-face\s*\{([^}]*)\}', re.IGNORECASE)
+FONT_SRC_RE = re.compile(r'(?:^|;)\s*src\s*:([^;]*)', re.IGNORECASE)
+FONT_FORMAT_RE = re.compile(r'format\(\s*["\']?([\w-]+)', re.IGNORECASE)
+TOP_LEVEL_COMMA_RE = re.compile(r',(?![^(]*\))')
+
+# @font-face formats every current browser takes; it downloads the first of these in src and no other
+SUPPORTED_FONT_FORMATS = {'woff2', 'woff', 'truetype', 'opentype', 'woff2-variations', 'woff-variations',
+                          'truetype-variations', 'opentype-variations'}
+
+# target: site-relative path, or the full URL for third-party requests
+# preload: requested early at high priority through <link rel="preload">
+# via: the stylesheet that pulled it in, None for references in the page itself
+# conditional: a url() in a stylesheet rule, fetched only if the rule matches something on the page
+Dependency = namedtuple('Dependency', 'target kind blocking external via preload conditional', defaults=(False,))
+
+
+def asset_kind(path):
+    return KIND_BY_EXTENSION.get(posixpath.splitext(path.split('?')[0])[1].lower(), 'other')
+
+
+def _origin(url):
+    parts = urlsplit(url if not url.startswith('//') else 'https:' + url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def _is_external(url):
+    return url.startswith(('http:', 'https:', '//'))
+
+
+def _blocking_link(attrs, in_head):
+    """A stylesheet link that holds first render"""
+    media = attrs.get('media', 'all').lower()
+    return in_head and 'onload' not in attrs and 'disabled' not in attrs and media in ('all', 'screen', '')
+
+
+def _blocking_script(attrs, in_head):
+    """A classic external script that stops the parser"""
+    return in_head and 'async' not in attrs and 'defer' not in attrs and attrs.get('type', '') != 'module'
+
+
+def font_face_source(declarations):
+    """URL a browser downloads for one @font-face block: the first src entry in a supported format"""
+    sources = FONT_SRC_RE.findall(declarations)
+    if not sources:
+        return None
+    for entry in TOP_LEVEL_COMMA_RE.split(sources[-1]):
+        url = CSS_URL_RE.search(entry)
+        if not url:
+            continue
+        font_format = FONT_FORMAT_RE.search(entry)
+        if font_format is None or font_format.group(1).lower() in SUPPORTED_FONT_FORMATS:
+            return url.group(2)
+    return None
+
+
+def _srcset_urls(value):
+    return [candidate.strip().split()[0] for candidate in value.split(',') if candidate.strip()]
+
+
+def page_references(content):
+    """(url, kind hint, blocking, preload) for every request a page makes directly; <noscript> content is skipped"""
+    references = []
+    in_head = True
+    noscript = 0
+    for token in tokenize(content):
+        if token.name == 'noscript' and token.kind in ('starttag', 'endtag'):
+            noscript += 1 if token.kind == 'starttag' else -1
+            continue
+        if token.kind == 'rawtext' and token.name == 'style' and not noscript:
+            references.extend((url, None, False, False) for _, url in CSS_URL_RE.findall(content[token.start:token.end]))
+            continue
+        if token.kind != 'starttag' or noscript:
+            continue
+        if token.name == 'body':
+            in_head = False
+        attrs = parse_attrs(token.attrs_src)
+
+        if token.name == 'link':
+            rel = set(attrs.get('rel', '').lower().split())
+            if rel & FETCHING_RELS and attrs.get('href'):
+                hint = 'css' if 'stylesheet' in rel else KIND_BY_PRELOAD_AS.get(attrs.get('as', '').lower())
+                blocking = 'stylesheet' in rel and _blocking_link(attrs, in_head)
+                references.append((attrs['href'], hint, blocking, bool(rel & {'preload', 'modulepreload'})))
+        elif token.name == 'script' and attrs.get('src'):
+            references.append((attrs['src'], 'js', _blocking_script(attrs, in_head), False))
+        elif token.name in ('img', 'source', 'video', 'audio', 'iframe', 'embed'):
+            for name in ('src', 'poster', 'data-src'):
+                if attrs.get(name):
+                    references.append((attrs[name], None, False, False))
+            for name in ('srcset', 'data-srcset'):
+                if attrs.get(name):
+                    references.extend((url, None, False, False) for url in _srcset_urls(attrs[name]))
+        if 'style' in attrs:
+            references.extend((url, None, False, False) for _, url in CSS_URL_RE.findall(attrs['style']))
+    return references
+
+
+class AssetGraph:
+    """Pages -> assets, with stylesheets expanded into the fonts, images and imports they reference"""
+
+    def __init__(self, root_path="public_html"):
+        self.store = PageStore(root_path)
+        self.root_path = self.store.root_path
+        self.pages = {}
+        self.missing = {}
+        self._weights = {}
+        self._css_children = {}
+
+    def build(self):
+        for file_path in self.store.html_files():
+            rel_path = self.store.relpath(file_path).replace(os.sep, '/')
+            self.pages[rel_path] = self._page_dependencies(rel_path, self.store.read(file_path) or '')
+        return self
+
+    def _page_dependencies(self, rel_path, content):
+        base_dir = posixpath.dirname(rel_path)
+        dependencies = {}
+        for url, hint, blocking, preload in page_references(content):
+            url = url.strip()
+            external = _is_external(url)
+            target = url if external else resolve_reference(url, base_dir)
+            if not target:
+                continue
+            if not external and not os.path.isfile(os.path.join(self.root_path, target)):
+                self.missing.setdefault(rel_path, set()).add(target)
+                continue
+            # A URL both preloaded and linked counts once, as its most urgent use; a direct
+            # reference also makes a conditional stylesheet image certain
+            known = dependencies.get(target)
+            if known is None or known.conditional or (blocking and not known.blocking) or (preload and not known.preload):
+                kind = hint or (known.kind if known else asset_kind(urlsplit(url).path if external else target))
+                blocking = blocking or bool(known and known.blocking)
+                preload = preload or bool(known and known.preload)
+                dependencies[target] = Dependency(target, kind, blocking, external, None, preload)
+            if not external and asset_kind(target) == 'css':
+                for child in self._stylesheet_children(target, set()):
+                    dependencies.setdefault(child.target, child)
+        return list(dependencies.values())
+
+    def _stylesheet_children(self, sheet, seen):
+        """Everything a stylesheet pulls in, following @import
+
+        Each @font-face counts once, as the source a browser actually picks.
+        Other url() references belong to rules that may not match the page, so
+        they are marked conditional.
+        """
+        if sheet in self._css_children:
+            return self._css_children[sheet]
+        seen.add(sheet)
+        with open(os.path.join(self.root_path, sheet), 'r', encoding='utf-8', errors='replace') as f:
+            css = f.read()
+        base_dir = posixpath.dirname(sheet)
+        children = []
+        fonts = [font_face_source(block) for block in FONT_FACE_RE.findall(css)]
+        rules = FONT_FACE_RE.sub('', css)
+        urls = ([(url, 'font', False) for url in fonts if url] +
+                [(url, None, True) for _, url in CSS_URL_RE.findall(rules)] +
+                [(url, 'css', False) for url in CSS_IMPORT_RE.findall(rules)])
+        for url, kind, conditional in urls:
+            url = url.strip()
+            imported = kind == 'css'
+            if url.startswith('data:'):
+                continue
+            if _is_external(url):
+                kind = kind or asset_kind(urlsplit(url).path)
+                children.append(Dependency(url, kind, False, True, sheet, False, conditional))
+                continue
+            target = resolve_reference(url, base_dir)
+            if not target or not os.path.isfile(os.path.join(self.root_path, target)):
+                continue
+            children.append(Dependency(target, kind or asset_kind(target), False, False, sheet, False, conditional))
+            if imported and target not in seen:
+                children.extend(self._stylesheet_children(target, seen))
+        self._css_children[sheet] = children
+        return children
+
+    def weight(self, rel_path):
+        """(raw bytes, gzip-9 bytes) of a local file; compressed equals raw for formats that are already compressed"""
+        if rel_path not in self._weights:
+            with open(os.path.join(self.root_path, rel_path), 'rb') as f:
+                data = f.read()
+            compressed = len(data)
+            if posixpath.splitext(rel_path)[1].lower() in COMPRESSIBLE_EXTENSIONS:
+                compressed = min(compressed, len(gzip.compress(data, compresslevel=9, mtime=0)))
+            self._weights[rel_path] = (len(data), compressed)
+        return self._weights[rel_path]
+
+    def page_metrics(self, rel_path):
+        """Transfer weight and request counts of one page, its own HTML included
+
+        Conditional stylesheet images are left out of the totals and reported
+        separately as conditional_kb, the most they could add.
+        """
+        raw, compressed = self.weight(rel_path)
+        metrics = {'raw_kb': 0.0, 'compressed_kb': 0.0, 'requests': 1, 'render_blocking': 0,
+                   'third_party_origins': 0, 'by_kind': {}, 'conditional_kb': 0.0}
+        origins = set()
+        conditional = 0
+        for dependency in self.pages[rel_path]:
+            if dependency.conditional:
+                if not dependency.external:
+                    conditional += self.weight(dependency.target)[1]
+                continue
+            metrics['requests'] += 1
+            metrics['render_blocking'] += dependency.blocking
+            if dependency.external:
+                origins.add(_origin(dependency.target))
+                continue
+            asset_raw, asset_compressed = self.weight(dependency.target)
+            raw += asset_raw
+            compressed += asset_compressed
+            metrics['by_kind'][dependency.kind] = metrics['by_kind'].get(dependency.kind, 0) + asset_compressed
+        metrics['raw_kb'] = round(raw / 1024, 1)
+        metrics['compressed_kb'] = round(compressed / 1024, 1)
+        metrics['third_party_origins'] = len(origins)
+        metrics['conditional_kb'] = round(conditional / 1024, 1)
+        return metrics
+
+
+def load_budgets(path=BUDGET_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def page_budget(budgets, rel_path):
+    """The default budget overlaid with every 'pages' pattern matching the page, in file order"""
+    budget = dict(budgets.get('default', {}))
+    for pattern, overrides in budgets.get('pages', {}).items():
+        if fnmatch.fnmatch(rel_path, pattern):
+            budget.update(overrides)
+    return budget
+
+
+def check_budgets(graph, budgets):
+    """{page: [(metric, value, limit)]} for every budget a page exceeds"""
+    violations = {}
+    for rel_path in graph.pages:
+        metrics = graph.page_metrics(rel_path)
+        for metric, limit in page_budget(budgets, rel_path).items():
+            if metrics.get(metric, 0) > limit:
+                violations.setdefault(rel_path, []).append((metric, metrics[metric], limit))
+    return violations
+
+
+def print_graph_report(graph, verbose=False):
+    """Per-page weight table, optionally with every dependency"""
+    print(f"{'Page':<58} {'Raw KB':>8} {'Gzip KB':>8} {'Reqs':>5} {'Block':>6} {'3rd':>4}")
+    print("-" * 94)
+    for rel_path in graph.pages:
+        metrics = graph.page_metrics(rel_path)
+        print(f"{rel_path:<58} {metrics['raw_kb']:>8,.1f} {metrics['compressed_kb']:>8,.1f} "
+              f"{metrics['requests']:>5} {metrics['render_blocking']:>6} {metrics['third_party_origins']:>4}")
+        if verbose:
+            for dependency in sorted(graph.pages[rel_path], key=lambda d: (d.kind, d.target)):
+                flag = ' 🚧' if dependency.blocking else ' (if a rule matches)' if dependency.conditional else ''
+                via = f" (via {dependency.via})" if dependency.via else ''
+                print(f"    {dependency.kind:<6} {dependency.target}{via}{flag}")
+    if graph.missing:
+        print(f"\n⚠️  {sum(len(targets) for targets in graph.missing.values())} references to missing files:")
+        for rel_path, targets in graph.missing.items():
+            print(f"   • {rel_path}: {', '.join(sorted(targets))}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report each page's assets and weight, and enforce page budgets")
+    parser.add_argument('root_path', nargs='?', default="public_html")
+    parser.add_argument('--budget', default=BUDGET_PATH, help="Budget file (JSON)")
+    parser.add_argument('--verbose', '-v', action='store_true', help="List every dependency of every page")
+    parser.add_argument('--json', metavar='FILE', help="Also write the graph and metrics as JSON")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.root_path):
+        print(f"Error: {args.root_path} not found")
+        return 1
+
+    graph = AssetGraph(args.root_path).build()
+    print_graph_report(graph, args.verbose)
+
+    if args.json:
+        data = {rel_path: {'metrics': graph.page_metrics(rel_path),
+                           'dependencies': [dependency._asdict() for dependency in dependencies]}
+                for rel_path, dependencies in graph.pages.items()}
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+
+    budgets = load_budgets(args.budget)
+    if not budgets:
+        print(f"\nℹ️  No budget file at {args.budget}; nothing enforced")
+        return 0
+    violations = check_budgets(graph, budgets)
+    if not violations:
+        print(f"\n✅ All {len(graph.pages)} pages are within budget")
+        return 0
+    print(f"\n❌ {len(violations)} pages over budget:")
+    for rel_path, exceeded in violations.items():
+        details = ', '.join(f"{metric} {value} > {limit}" for metric, value, limit in exceeded)
+        print(f"   • {rel_path}: {details}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Content-Addressed Backup Store for BC Roofing Website
+Keeps each distinct file version once and records every run as a small path-to-hash manifest
+"""
+
+import sys
+import json
+import hashlib
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+from page_writer import write_atomic
+
+DEFAULT_STORE = "backups"
+
+
+def _write_file(path, data):
+    """Atomic write that creates missing store directories"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    write_atomic(path, data)
+
+
+class BackupStore:
+    """Blobs under objects/<2 hex>/<sha256>, one manifest per run under runs/<run id>.json.
+
+    A run only writes blobs the store does not hold yet, so backing up an
+    unchanged site again costs a hash per file and a few hundred bytes of manifest.
+    """
+
+    def __init__(self, store_path=DEFAULT_STORE, base_path="public_html"):
+        self.store_path = Path(store_path)
+        self.base_path = Path(base_path)
+        self.run_id = None
+        self.files = {}
+        self.stats = {'files': 0, 'blobs_written': 0, 'bytes_written': 0}
+
+    def object_path(self, digest):
+        return self.store_path / "objects" / digest[:2] / digest
+
+    def run_path(self, run_id):
+        return self.store_path / "runs" / f"{run_id}.json"
+
+    def begin_run(self):
+        """Start a new run named after the current time"""
+        run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+        suffix = 1
+        while self.run_path(run_id).exists():
+            suffix += 1
+            run_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{suffix}"
+        self.run_id = run_id
+        self.files = {}
+        return run_id
+
+    def add(self, file_path, data=None):
+        """Record a file's current content in this run; returns its blob hash"""
+        if self.run_id is None:
+            self.begin_run()
+        file_path = Path(file_path)
+        if data is None:
+            data = file_path.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()
+        blob = self.object_path(digest)
+        if not blob.exists():
+            _write_file(blob, data)
+            self.stats['blobs_written'] += 1
+            self.stats['bytes_written'] += len(data)
+        self.files[self._relative(file_path)] = digest
+        self.stats['files'] += 1
+        return digest
+
+    def _relative(self, file_path):
+        """Path under the site root; files outside it keep their absolute path"""
+        absolute = file_path.resolve()
+        try:
+            return absolute.relative_to(self.base_path.resolve()).as_posix()
+        except ValueError:
+            return absolute.as_posix()
+
+    def save_run(self):
+        """Write this run's manifest; nothing is written for a run that backed up no files"""
+        if self.run_id is None or not self.files:
+            return None
+        manifest = {
+            'run': self.run_id,
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'base_path': str(self.base_path.resolve()),
+            'files': dict(sorted(self.files.items()))
+        }
+        path = self.run_path(self.run_id)
+        _write_file(path, (json.dumps(manifest, indent=2) + '\n').encode('utf-8'))
+        return path
+
+    def list_runs(self):
+        """Run manifests, oldest first"""
+        runs_dir = self.store_path / "runs"
+        if not runs_dir.is_dir():
+            return []
+        return [json.loads(path.read_text(encoding='utf-8')) for path in sorted(runs_dir.glob("*.json"))]
+
+    def load_run(self, run_id):
+        """The manifest of a run; 'latest' names the newest one"""
+        if run_id == 'latest':
+            runs = self.list_runs()
+            if not runs:
+                raise FileNotFoundError(f"No backup runs in {self.store_path}")
+            return runs[-1]
+        path = self.run_path(run_id)
+        if not path.exists():
+            raise FileNotFoundError(f"No backup run {run_id} in {self.store_path}")
+        return json.loads(path.read_text(encoding='utf-8'))
+
+    def restore(self, run_id, base_path=None):
+        """Put every file of a run back; files already holding that content are not rewritten
+
+        Returns (files restored, files already current).
+        """
+        manifest = self.load_run(run_id)
+        base = Path(base_path or manifest['base_path'])
+        restored = current = 0
+        for rel_path, digest in manifest['files'].items():
+            target = base / rel_path
+            if target.exists() and hashlib.sha256(target.read_bytes()).hexdigest() == digest:
+                current += 1
+                continue
+            _write_file(target, self.object_path(digest).read_bytes())
+            restored += 1
+        return restored, current
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="List and restore content-addressed backup runs")
+    parser.add_argument('--store', default=DEFAULT_STORE)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('list', help="Show every backup run")
+    restore_parser = subparsers.add_parser('restore', help="Put the files of a run back")
+    restore_parser.add_argument('run', help="Run id from 'list', or 'latest'")
+    restore_parser.add_argument('--root', default=None, help="Restore under this directory instead of the original site root")
+    args = parser.parse_args(argv)
+
+    store = BackupStore(args.store)
+    if args.command == 'list':
+        runs = store.list_runs()
+        if not runs:
+            print(f"No backup runs in {args.store}")
+            return 0
+        for run in runs:
+            print(f"🗂️  {run['run']}  {run['created']}  {len(run['files'])} files  ({run['base_path']})")
+        return 0
+
+    try:
+        restored, current = store.restore(args.run, args.root)
+    except FileNotFoundError as e:
+        print(f"Error: {e}")
+        return 1
+    print(f"🔄 Restored {restored} files ({current} already current)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Benchmark Runner for BC Roofing Website Scripts
+Times each site script on synthetic sites and records pages/sec and peak memory
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import resource
+import contextlib
+import multiprocessing
+from queue import Empty
+from pathlib import Path
+
+from generate_synthetic_site import generate_site
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+RESULTS_PATH = "benchmark_results.json"
+
+# Seconds one benchmark may run before it is stopped and reported as failed
+DEFAULT_TIMEOUT = 3600
+
+
+def html_pages(site_root):
+    return sorted(str(path) for path in Path(site_root).glob("**/*.html"))
+
+
+def bench_analyze_website(site_root, work_dir):
+    from analyze_title_content import analyze_website
+    analyze_website(site_root)
+
+
+def bench_final_performance_optimizer(site_root, work_dir):
+    from final_performance_optimization import FinalPerformanceOptimizer
+    from backup_store import BackupStore
+    optimizer = FinalPerformanceOptimizer(site_root, manifest_path=os.path.join(work_dir, "manifest.json"))
+    optimizer.backups = BackupStore(Path(work_dir) / "backups", site_root)
+    optimizer.optimize_all_html_files()
+
+
+def bench_add_lazy_loading_to_file(site_root, work_dir):
+    from implement_image_lazy_loading import add_lazy_loading_to_file
+    for page in html_pages(site_root):
+        add_lazy_loading_to_file(page)
+
+
+def bench_charset_scanner(site_root, work_dir):
+    from scan_all_charset_issues import analyze_charset_placement
+    for page in html_pages(site_root):
+        analyze_charset_placement(page)
+
+
+def bench_minifier(site_root, work_dir):
+    from minify_metal_roofing import minify_html
+    for page in html_pages(site_root):
+        with open(page, 'r', encoding='utf-8') as f:
+            minify_html(f.read())
+
+
+# name -> (function, rewrites the site in place)
+BENCHMARKS = {
+    'analyze_website': (bench_analyze_website, False),
+    'final_performance_optimizer': (bench_final_performance_optimizer, True),
+    'add_lazy_loading_to_file': (bench_add_lazy_loading_to_file, True),
+    'charset_scanner': (bench_charset_scanner, False),
+    'minifier': (bench_minifier, False),
+}
+
+
+def _run_in_child(name, site_root, work_dir, queue):
+    """Run one benchmark in a fresh process so peak RSS belongs to it alone"""
+    function, _ = BENCHMARKS[name]
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        function(site_root, work_dir)
+    elapsed = time.perf_counter() - start
+    # ru_maxrss is KiB on Linux
+    queue.put((elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss))
+
+
+def _wait_for_result(process, queue, timeout):
+    """The child's (seconds, peak RSS) or an error message; never blocks past the timeout"""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return queue.get(timeout=1), None
+        except Empty:
+            pass
+        if not process.is_alive():
+            try:
+                return queue.get(timeout=1), None
+            except Empty:
+                return None, f"exited with code {process.exitcode}"
+        if time.monotonic() > deadline:
+            process.terminate()
+            return None, f"timed out after {timeout}s"
+
+
+def run_benchmark(name, site_root, pages, work_dir, timeout=DEFAULT_TIMEOUT):
+    """Time one script against a site; in-place scripts get a scratch copy"""
+    _, mutates = BENCHMARKS[name]
+    target = site_root
+    if mutates:
+        target = os.path.join(work_dir, "site")
+        if os.path.exists(target):
+            shutil.rmtree(target)
+        shutil.copytree(site_root, target)
+
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    process = context.Process(target=_run_in_child, args=(name, target, work_dir, queue))
+    process.start()
+    measurement, error = _wait_for_result(process, queue, timeout)
+    process.join()
+    if error is None and process.exitcode != 0:
+        error = f"exited with code {process.exitcode}"
+    if error:
+        return {'benchmark': name, 'pages': pages, 'error': error}
+
+    elapsed, peak_rss_kb = measurement
+    return {
+        'benchmark': name,
+        'pages': pages,
+        'seconds': round(elapsed, 3),
+        'pages_per_sec': round(pages / elapsed, 1) if elapsed else None,
+        'peak_rss_mb': round(peak_rss_kb / 1024, 1)
+    }
+
+
+def run_benchmarks(sizes, names, workspace="benchmarks", timeout=DEFAULT_TIMEOUT):
+    """Generate each site size once and run every selected benchmark on it"""
+    results = []
+    for pages in sizes:
+        site_root = os.path.join(workspace, f"site-{pages}")
+        if not os.path.exists(site_root):
+            print(f"Generating {pages}-page site...")
+            generate_site(site_root, pages)
+        work_dir = os.path.join(workspace, f"work-{pages}")
+        os.makedirs(work_dir, exist_ok=True)
+
+        for name in names:
+            result = run_benchmark(name, site_root, pages, work_dir, timeout)
+            results.append(result)
+            if 'error' in result:
+                print(f"{name:<30} {pages:>7} pages  ❌ failed: {result['error']}")
+                continue
+            print(f"{name:<30} {pages:>7} pages  {result['seconds']:>9.2f}s  "
+                  f"{result['pages_per_sec']:>9} pages/s  {result['peak_rss_mb']:>8} MB")
+
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the site scripts on synthetic sites")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument('--workspace', default="benchmarks")
+    parser.add_argument('--output', default=RESULTS_PATH)
+    parser.add_argument('--timeout', type=int, default=DEFAULT_TIMEOUT,
+                        help="Seconds before a single benchmark is stopped and reported as failed")
+    args = parser.parse_args(argv)
+
+    print("=" * 80)
+    print("BC ROOFING SCRIPT BENCHMARKS")
+    print("=" * 80)
+    results = run_benchmarks(args.sizes, args.only, args.workspace, args.timeout)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n📁 Results saved to: {args.output}")
+    return 1 if any('error' in result for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Offline Cache Policy Verifier for BC Roofing Website
+Evaluates the mod_expires, mod_headers and FilesMatch rules of .htaccess for every file and reports cacheable bytes
+"""
+
+import os
+import re
+import sys
+import time
+import shlex
+import fnmatch
+import argparse
+import mimetypes
+from collections import namedtuple
+
+from page_store import SKIP_DIRS
+from fingerprint_assets import FINGERPRINTED_RE
+from precompress import SIDECAR_EXTENSIONS
+
+# Modules assumed loaded on the host when evaluating <IfModule> blocks
+DEFAULT_MODULES = {'mod_headers', 'mod_expires', 'mod_deflate', 'mod_rewrite', 'mod_mime'}
+
+# Lifetimes from here up count as cacheable for repeat visits
+LONG_LIFETIME = 30 * 24 * 3600
+
+UNIT_SECONDS = {
+    'year': 365 * 86400, 'month': 30 * 86400, 'week': 7 * 86400, 'day': 86400,
+    'hour': 3600, 'minute': 60, 'second': 1
+}
+
+# Types Python's mimetypes does not know, or knows differently from Apache
+EXTRA_TYPES = {
+    '.woff': 'font/woff', '.woff2': 'font/woff2', '.webmanifest': 'application/manifest+json',
+    '.avif': 'image/avif', '.webp': 'image/webp', '.ico': 'image/x-icon', '.svg': 'image/svg+xml',
+    '.js': 'application/javascript', '.xml': 'application/xml'
+}
+
+NOT_SERVED = ('.htaccess', '.htpasswd', '.md')
+
+MAX_WARNINGS_SHOWN = 15
+
+# Sections whose condition depends on the request or server config, which an offline check cannot know
+UNEVALUATED_SECTIONS = {'if', 'elseif', 'else', 'directory', 'directorymatch', 'location', 'locationmatch'}
+
+MAX_AGE_RE = re.compile(r'(?:^|,)\s*max-age\s*=\s*"?(\d+)', re.IGNORECASE)
+EXPIRES_CODE_RE = re.compile(r'^([AM])(\d+)$')
+
+# One directive with the sections it sits in; files: FilesMatch regex or Files name, None at top level
+Directive = namedtuple('Directive', 'name args files')
+
+# headers: final response headers set by mod_headers; expires_seconds: lifetime mod_expires gives, or None
+Policy = namedtuple('Policy', 'cache_control expires_seconds lifetime headers')
+
+
+def _split_args(text):
+    try:
+        return shlex.split(text)
+    except ValueError:
+        return text.split()
+
+
+def _files_pattern(args):
+    """Regex for a <Files> section: 'name' with shell wildcards, or '~ "regex"' like <FilesMatch>"""
+    if args[:1] == ['~'] and len(args) > 1:
+        return re.compile(args[1])
+    return re.compile(fnmatch.translate(args[0] if args else ''))
+
+
+def parse_htaccess(text, modules=DEFAULT_MODULES, skipped=None):
+    """Directives in file order, with <IfModule> blocks resolved against the loaded modules
+
+    Directives inside <If>, <Directory>, <Location> and similar sections are
+    left out; each such section is appended to skipped as (line number, name).
+    """
+    directives = []
+    stack = []
+    for number, raw_line in enumerate(text.splitlines(), 1):
+        line = raw_line.strip()
+        if not line or line.startswith('#'):
+            continue
+        if line.startswith('</'):
+            if stack:
+                stack.pop()
+            continue
+        if line.startswith('<') and line.endswith('>'):
+            parts = _split_args(line[1:-1])
+            section = parts[0].lower()
+            argument = parts[1] if len(parts) > 1 else ''
+            if section in UNEVALUATED_SECTIONS:
+                stack.append(('unevaluated', section))
+                if skipped is not None:
+                    skipped.append((number, parts[0]))
+            elif section == 'ifmodule':
+                negated = argument.startswith('!')
+                name = argument.lstrip('!').replace('.c', '')
+                if not name.startswith('mod_'):
+                    name = 'mod_' + name
+                stack.append(('ifmodule', (name in modules) != negated))
+            elif section == 'filesmatch':
+                stack.append(('files', re.compile(argument)))
+            elif section == 'files':
+                stack.append(('files', _files_pattern(parts[1:])))
+            else:
+                stack.append((section, argument))
+            continue
+        if not all(active for kind, active in stack if kind == 'ifmodule'):
+            continue
+        if any(kind == 'unevaluated' for kind, _ in stack):
+            continue
+        parts = _split_args(line)
+        files = [pattern for kind, pattern in stack if kind == 'files']
+        directives.append(Directive(parts[0].lower(), parts[1:], files or None))
+    return directives
+
+
+def parse_expires(value, mtime=None, now=None):
+    """Seconds from now an ExpiresDefault/ExpiresByType value gives, e.g. 'access plus 1 year' or 'A31536000'"""
+    now = time.time() if now is None else now
+    code = EXPIRES_CODE_RE.match(value.strip())
+    if code:
+        base, seconds = ('access' if code.group(1) == 'A' else 'modification'), int(code.group(2))
+    else:
+        words = value.lower().split()
+        if not words or words[0] not in ('access', 'now', 'modification'):
+            return None
+        base = 'modification' if words[0] == 'modification' else 'access'
+        seconds = 0
+        amounts = [word for word in words[1:] if word != 'plus']
+        for amount, unit in zip(amounts[::2], amounts[1::2]):
+            seconds += int(amount) * UNIT_SECONDS.get(unit.rstrip('s'), 0)
+    if base == 'modification' and mtime is not None:
+        return max(0, int(mtime + seconds - now))
+    return seconds
+
+
+def mime_type(path):
+    extension = os.path.splitext(path)[1].lower()
+    return EXTRA_TYPES.get(extension) or mimetypes.guess_type(path)[0] or 'application/octet-stream'
+
+
+def _apply_header(headers, action, name, value):
+    key = name.lower()
+    if action == 'set':
+        headers[key] = value
+    elif action == 'unset':
+        headers.pop(key, None)
+    elif action in ('append', 'add'):
+        headers[key] = f"{headers[key]}, {value}" if key in headers else value
+    elif action == 'merge':
+        existing = [item.strip() for item in headers.get(key, '').split(',') if item.strip()]
+        if value not in existing:
+            headers[key] = ', '.join(existing + [value])
+
+
+def effective_policy(directives, file_name, mtime=None, now=None):
+    """The caching headers Apache sends for a file name
+
+    Top-level directives apply first and matching <Files>/<FilesMatch>
+    sections after them in file order, so later sections win. mod_headers
+    runs after mod_expires and replaces the Cache-Control it derived.
+    """
+    ordered = [d for d in directives if d.files is None] + [d for d in directives if d.files is not None]
+    headers = {}
+    expires_active = False
+    expires_default = None
+    expires_by_type = {}
+    content_type = mime_type(file_name)
+
+    for directive in ordered:
+        if directive.files and not all(pattern.search(file_name) for pattern in directive.files):
+            continue
+        args = directive.args
+        if directive.name == 'expiresactive' and args:
+            expires_active = args[0].lower() == 'on'
+        elif directive.name == 'expiresdefault' and args:
+            expires_default = args[0]
+        elif directive.name == 'expiresbytype' and len(args) >= 2:
+            expires_by_type[args[0].lower()] = args[1]
+        elif directive.name == 'header' and args:
+            if args[0].lower() in ('always', 'onsuccess'):
+                args = args[1:]
+            if len(args) >= 2:
+                _apply_header(headers, args[0].lower(), args[1], args[2] if len(args) > 2 else '')
+
+    expires_seconds = None
+    if expires_active:
+        # A type-specific rule beats the default
+        rule = expires_by_type.get(content_type, expires_default)
+        if rule is not None:
+            expires_seconds = parse_expires(rule, mtime, now)
+
+    cache_control = headers.get('cache-control')
+    if cache_control is None and expires_seconds is not None:
+        cache_control = f"max-age={expires_seconds}"
+    lifetime = 0
+    if cache_control:
+        directives_set = {item.strip().split('=')[0].lower() for item in cache_control.split(',')}
+        max_age = MAX_AGE_RE.search(cache_control)
+        if not directives_set & {'no-store', 'no-cache'} and max_age:
+            lifetime = int(max_age.group(1))
+    elif expires_seconds is not None:
+        lifetime = expires_seconds
+    return Policy(cache_control, expires_seconds, lifetime, headers)
+
+
+def _htaccess_chain(root_path, directory, cache, warnings):
+    """Directives of every .htaccess from the root down to a directory, parents first"""
+    if directory in cache:
+        return cache[directory]
+    path = os.path.join(directory, '.htaccess')
+    own = []
+    if os.path.exists(path):
+        skipped = []
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            own = parse_htaccess(f.read(), skipped=skipped)
+        rel_path = os.path.relpath(path, root_path).replace(os.sep, '/')
+        for number, section in skipped:
+            warnings.append(f"{rel_path}:{number}: <{section}> depends on the request and is not evaluated; "
+                            f"its directives were ignored")
+    parent = ([] if os.path.samefile(directory, root_path)
+              else _htaccess_chain(root_path, os.path.dirname(directory), cache, warnings))
+    cache[directory] = parent + own
+    return cache[directory]
+
+
+def verify_site(root_path="public_html", now=None):
+    """Effective policy of every served file, plus warnings about risky or inconsistent rules"""
+    results = []
+    warnings = []
+    cache = {}
+    for dirpath, dirnames, filenames in os.walk(root_path):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+        directives = _htaccess_chain(root_path, dirpath, cache, warnings)
+        for filename in sorted(filenames):
+            if filename.startswith('.') or filename.endswith(NOT_SERVED):
+                continue
+            path = os.path.join(dirpath, filename)
+            rel_path = os.path.relpath(path, root_path).replace(os.sep, '/')
+            stat = os.stat(path)
+            policy = effective_policy(directives, filename, stat.st_mtime, now)
+
+            if filename.endswith(SIDECAR_EXTENSIONS):
+                source = filename[:-3]
+                if os.path.exists(os.path.join(dirpath, source)):
+                    # A sidecar must be cached exactly like the file it stands in for
+                    expected = effective_policy(directives, source, stat.st_mtime, now)
+                    if expected.cache_control != policy.cache_control:
+                        warnings.append(f"{rel_path}: '{policy.cache_control}' differs from its source's "
+                                        f"'{expected.cache_control}'")
+                    continue
+
+            cache_control = (policy.cache_control or '').lower()
+            if 'immutable' in cache_control and not FINGERPRINTED_RE.match(filename):
+                warnings.append(f"{rel_path}: immutable but not fingerprinted, so edits never reach repeat visitors")
+            if not policy.cache_control and policy.expires_seconds is None:
+                warnings.append(f"{rel_path}: no Cache-Control or Expires")
+            results.append({'file': rel_path, 'bytes': stat.st_size, 'cache_control': policy.cache_control,
+                            'lifetime': policy.lifetime})
+    return results, warnings
+
+
+def format_lifetime(seconds):
+    for unit in ('year', 'month', 'week', 'day', 'hour', 'minute'):
+        if seconds >= UNIT_SECONDS[unit]:
+            return f"{seconds / UNIT_SECONDS[unit]:g} {unit}{'s' if seconds >= 2 * UNIT_SECONDS[unit] else ''}"
+    return f"{seconds} s"
+
+
+def print_policy_report(results, warnings, verbose=False):
+    """Bytes per lifetime bucket and the warnings list"""
+    if verbose:
+        print(f"{'File':<60} {'Bytes':>10} {'Lifetime':>12}  Cache-Control")
+        print("-" * 120)
+        for result in results:
+            print(f"{result['file']:<60} {result['bytes']:>10,} {format_lifetime(result['lifetime']):>12}  "
+                  f"{result['cache_control'] or '-'}")
+        print()
+
+    buckets = {}
+    for result in results:
+        buckets.setdefault(result['lifetime'], []).append(result)
+    print(f"{'Lifetime':>12} {'Files':>7} {'Bytes':>13}")
+    print("-" * 34)
+    for lifetime in sorted(buckets, reverse=True):
+        files = buckets[lifetime]
+        print(f"{format_lifetime(lifetime):>12} {len(files):>7} {sum(r['bytes'] for r in files):>13,}")
+
+    total = sum(result['bytes'] for result in results) or 1
+    long_bytes = sum(result['bytes'] for result in results if result['lifetime'] >= LONG_LIFETIME)
+    none_bytes = sum(result['bytes'] for result in results if result['lifetime'] == 0)
+    short_bytes = total - long_bytes - none_bytes
+    print(f"\n💾 Cacheable (≥ {format_lifetime(LONG_LIFETIME)}): {long_bytes:,} bytes ({long_bytes / total * 100:.1f}%)")
+    print(f"⏱️  Short lifetime: {short_bytes:,} bytes ({short_bytes / total * 100:.1f}%)")
+    print(f"🚫 Revalidated every time: {none_bytes:,} bytes ({none_bytes / total * 100:.1f}%)")
+
+    if warnings:
+        print(f"\n⚠️  {len(warnings)} warnings:")
+        shown = warnings if verbose else warnings[:MAX_WARNINGS_SHOWN]
+        for warning in shown:
+            print(f"   • {warning}")
+        if len(shown) < len(warnings):
+            print(f"   ... and {len(warnings) - len(shown)} more (use --verbose)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compute the cache headers .htaccess gives every file, offline")
+    parser.add_argument('root_path', nargs='?', default="public_html")
+    parser.add_argument('--verbose', '-v', action='store_true', help="List the policy of every file")
+    parser.add_argument('--strict', action='store_true', help="Exit non-zero when there are warnings")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.root_path):
+        print(f"Error: {args.root_path} not found")
+        return 1
+
+    results, warnings = verify_site(args.root_path)
+    print_policy_report(results, warnings, args.verbose)
+    return 1 if args.strict and warnings else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
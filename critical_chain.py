@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Critical Request Chain Simulator for BC Roofing Website
+Estimates each local page's critical chain depth and request waterfall under throttled network profiles
+"""
+
+import os
+import sys
+import json
+import argparse
+from collections import namedtuple
+from urllib.parse import urlsplit
+
+from asset_graph import AssetGraph
+from html_rewriter import tokenize, parse_attrs
+
+# rtt_ms: round trip time; down_kbps: downlink bandwidth in kilobits per second
+NetworkProfile = namedtuple('NetworkProfile', 'name rtt_ms down_kbps')
+
+PROFILES = {
+    'slow-3g': NetworkProfile('slow-3g', 400, 400),
+    # Lighthouse's mobile throttling
+    'slow-4g': NetworkProfile('slow-4g', 150, 1638.4),
+    'fast-4g': NetworkProfile('fast-4g', 40, 9000),
+    'cable': NetworkProfile('cable', 28, 5000)
+}
+DEFAULT_PROFILE = 'slow-4g'
+
+# DNS, TCP and TLS each cost a round trip on a new origin
+CONNECTION_SETUP_RTTS = 3
+
+# Third-party bodies cannot be measured offline; typical transfer sizes stand in for them
+EXTERNAL_BYTES = {'css': 2 * 1024, 'font': 25 * 1024, 'js': 30 * 1024, 'image': 20 * 1024, 'other': 10 * 1024}
+
+# Stylesheet children on the critical chain by default. Images in CSS are left out: they
+# load at low priority, only once a matching element is laid out, and never hold first
+# render. A CSS background can still be the LCP element, so --images adds them.
+CRITICAL_CHILD_KINDS = {'css', 'font'}
+
+# depth: 1 for the document; ready_ms: response ready; receive_ms: its body gets the downlink; end_ms: last byte in
+Request = namedtuple('Request', 'target kind depth bytes estimated blocking start_ms ready_ms receive_ms end_ms')
+
+
+def _origin(url, page_origin):
+    if not url.startswith(('http:', 'https:', '//')):
+        return page_origin
+    parts = urlsplit(url if not url.startswith('//') else 'https:' + url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def preconnected_origins(content):
+    """Origins the page warms up with <link rel="preconnect">"""
+    origins = set()
+    for token in tokenize(content):
+        if token.kind == 'endtag' and token.name == 'head':
+            break
+        if token.kind == 'starttag' and token.name == 'link':
+            attrs = parse_attrs(token.attrs_src)
+            if 'preconnect' in attrs.get('rel', '').lower().split() and attrs.get('href'):
+                origins.add(_origin(attrs['href'], None))
+    return origins
+
+
+def critical_dependencies(dependencies, include_images=False):
+    """Render-blocking and preloaded requests, plus the imports and fonts of critical stylesheets, with depths
+
+    include_images also follows the images those stylesheets reference.
+    """
+    child_kinds = CRITICAL_CHILD_KINDS | {'image'} if include_images else CRITICAL_CHILD_KINDS
+    depths = {}
+    for dependency in dependencies:
+        if dependency.via is None and (dependency.blocking or dependency.preload):
+            depths[dependency.target] = 2
+    # Children become critical once their stylesheet is; repeat for @import chains
+    changed = True
+    while changed:
+        changed = False
+        for dependency in dependencies:
+            if dependency.target in depths or dependency.via not in depths:
+                continue
+            if dependency.kind in child_kinds:
+                depths[dependency.target] = depths[dependency.via] + 1
+                changed = True
+    return [(dependency, depths[dependency.target]) for dependency in dependencies if dependency.target in depths]
+
+
+def simulate_page(graph, rel_path, profile, include_images=False):
+    """Waterfall of a page's critical requests, document first
+
+    A request starts once its parent has fully arrived (the document for
+    page references, the stylesheet for its children). It then waits one round
+    trip, plus connection setup on an origin not seen or preconnected before.
+    Bodies share the downlink one at a time, in the order they become ready.
+    """
+    rtt = profile.rtt_ms
+    bytes_per_ms = profile.down_kbps * 1024 / 8 / 1000
+    page_origin = 'self'
+    warm = preconnected_origins(graph.store.read(os.path.join(graph.root_path, rel_path)) or '')
+    connected = set()
+    link_free_ms = 0.0
+
+    def fetch(target, kind, depth, size, estimated, blocking, start_ms):
+        nonlocal link_free_ms
+        origin = _origin(target, page_origin)
+        setup = 0 if origin in connected or origin in warm else CONNECTION_SETUP_RTTS * rtt
+        connected.add(origin)
+        ready_ms = start_ms + setup + rtt
+        receive_ms = max(ready_ms, link_free_ms)
+        end_ms = link_free_ms = receive_ms + size / bytes_per_ms
+        return Request(target, kind, depth, size, estimated, blocking, start_ms, ready_ms, receive_ms, end_ms)
+
+    document = fetch(rel_path, 'html', 1, graph.weight(rel_path)[1], False, True, 0.0)
+    requests = [document]
+    ends = {None: document.end_ms}
+
+    critical = critical_dependencies(graph.pages[rel_path], include_images)
+    for dependency, depth in sorted(critical, key=lambda item: item[1]):
+        if dependency.external:
+            size, estimated = EXTERNAL_BYTES.get(dependency.kind, EXTERNAL_BYTES['other']), True
+        else:
+            size, estimated = graph.weight(dependency.target)[1], False
+        request = fetch(dependency.target, dependency.kind, depth, size, estimated,
+                        dependency.blocking, ends.get(dependency.via, document.end_ms))
+        ends[dependency.target] = request.end_ms
+        requests.append(request)
+    return requests
+
+
+def chain_summary(requests):
+    """Depth, size and timing figures for one page's waterfall"""
+    blocking = [request for request in requests if request.blocking]
+    return {
+        'depth': max(request.depth for request in requests),
+        'requests': len(requests),
+        'critical_kb': round(sum(request.bytes for request in requests) / 1024, 1),
+        'render_start_ms': round(max(request.end_ms for request in blocking)),
+        'chain_end_ms': round(max(request.end_ms for request in requests))
+    }
+
+
+def print_waterfall(rel_path, requests, profile, width=50):
+    """One bar per request, scaled to the end of the chain"""
+    total = max(request.end_ms for request in requests) or 1
+    print(f"\n🌊 {rel_path} ({profile.name}: {profile.rtt_ms} ms RTT, {profile.down_kbps:g} kbps)")
+    for request in requests:
+        start = int(request.start_ms / total * width)
+        ready = max(int(request.ready_ms / total * width), start)
+        receive = max(int(request.receive_ms / total * width), ready)
+        end = max(int(request.end_ms / total * width), receive + 1)
+        bar = ' ' * start + '·' * (ready - start) + '-' * (receive - ready) + '█' * (end - receive)
+        flag = '🚧' if request.blocking else '  '
+        size = f"{request.bytes / 1024:.1f}{'~' if request.estimated else ''} KB"
+        print(f"  {'  ' * (request.depth - 1)}{request.target[-48:]:<{56 - 2 * request.depth}} {size:>10} "
+              f"{request.end_ms:>7,.0f} ms {flag} |{bar:<{width}}|")
+    print("  · setup + round trip  - queued behind other downloads  █ downloading  "
+          "~ estimated third-party size  🚧 render-blocking")
+
+
+def _float(value):
+    try:
+        return float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not a number: {value}")
+
+
+def _non_negative_float(value):
+    number = _float(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"must be 0 or more, got {value}")
+    return number
+
+
+def _positive_float(value):
+    number = _float(value)
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"must be more than 0, got {value}")
+    return number
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate critical request chains of local pages under a network profile")
+    parser.add_argument('pages', nargs='*', help="Pages relative to the site root (default: all)")
+    parser.add_argument('--root', default="public_html")
+    parser.add_argument('--profile', choices=sorted(PROFILES), default=DEFAULT_PROFILE)
+    parser.add_argument('--rtt', type=_non_negative_float, help="Override the profile's round trip time (ms)")
+    parser.add_argument('--bandwidth', type=_positive_float, help="Override the profile's downlink (kbps)")
+    parser.add_argument('--images', action='store_true',
+                        help="Also put images referenced from critical stylesheets on the chain (possible LCP backgrounds)")
+    parser.add_argument('--waterfall', action='store_true', help="Draw the waterfall of every page")
+    parser.add_argument('--json', metavar='FILE', help="Also write the summaries as JSON, to compare runs")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.root):
+        print(f"Error: {args.root} not found")
+        return 1
+
+    profile = PROFILES[args.profile]
+    if args.rtt is not None:
+        profile = profile._replace(rtt_ms=args.rtt)
+    if args.bandwidth is not None:
+        profile = profile._replace(down_kbps=args.bandwidth)
+    graph = AssetGraph(args.root).build()
+    pages = args.pages or list(graph.pages)
+    unknown = [page for page in pages if page not in graph.pages]
+    if unknown:
+        print(f"Error: not a page under {args.root}: {', '.join(unknown)}")
+        return 1
+
+    summaries = {}
+    print(f"{'Page':<58} {'Depth':>5} {'Reqs':>5} {'Crit KB':>8} {'Render':>9} {'Chain end':>10}")
+    print("-" * 100)
+    for rel_path in pages:
+        requests = simulate_page(graph, rel_path, profile, args.images)
+        summary = summaries[rel_path] = chain_summary(requests)
+        print(f"{rel_path:<58} {summary['depth']:>5} {summary['requests']:>5} {summary['critical_kb']:>8,.1f} "
+              f"{summary['render_start_ms']:>6,} ms {summary['chain_end_ms']:>7,} ms")
+        if args.waterfall:
+            print_waterfall(rel_path, requests, profile)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'profile': profile._asdict(), 'pages': summaries}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Critical CSS Inliner for BC Roofing Website
+Inlines the above-the-fold rules of each page template and loads the full stylesheets without blocking render
+"""
+
+import os
+import re
+import sys
+import argparse
+import posixpath
+
+from page_store import PageStore
+from page_types import group_pages
+from html_rewriter import tokenize, parse_attrs, Edit, apply_edits
+from css_purge import SelectorUsage, linked_stylesheets, purge_css
+from page_writer import InPlaceWriter, add_dry_run_arguments, writer_from_args
+
+# Templates that get critical CSS; other pages keep their stylesheet links as they are
+TEMPLATES = ('home', 'service', 'city', 'blog')
+
+# The fold is the header plus the first content section, but never more markup than this
+FOLD_MAX_BYTES = 20000
+
+# Inline CSS beyond this no longer fits the first round trip alongside the markup
+CRITICAL_BUDGET_BYTES = 14 * 1024
+
+# Hand-written critical blocks this stage replaces
+LEGACY_CRITICAL_MARKER = '/* Critical above-the-fold styles */'
+
+INTERACTION_PSEUDO_RE = re.compile(r':(?:hover|focus|focus-visible|focus-within|active|visited|checked)\b|::selection')
+CSS_URL_RE = re.compile(r'url\(\s*(["\']?)([^"\')]+)\1\s*\)')
+
+PRELOAD_LINK = '<link rel="preload" href="{href}" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">'
+NOSCRIPT_LINK = '<link rel="stylesheet" href="{href}">'
+
+
+class FoldUsage(SelectorUsage):
+    """Selector usage of above-the-fold markup; interaction states never paint first"""
+
+    def matches(self, selector):
+        if INTERACTION_PSEUDO_RE.search(selector):
+            return False
+        return super().matches(selector)
+
+
+def above_the_fold(content):
+    """Head plus body markup through the end of the first section after the header"""
+    body_start = None
+    depth = 0
+    for token in tokenize(content):
+        if token.kind == 'starttag' and token.name == 'body':
+            body_start = token.end
+        if body_start is None:
+            continue
+        if token.end - body_start > FOLD_MAX_BYTES:
+            return content[:token.start]
+        if token.kind == 'starttag' and token.name == 'section':
+            depth += 1
+        elif token.kind == 'endtag' and token.name == 'section':
+            depth -= 1
+            if depth <= 0:
+                return content[:token.end]
+    return content
+
+
+def fold_usage(store, pages):
+    """Union of what every page of a template shows above the fold"""
+    usage = FoldUsage()
+    for file_path in pages:
+        content = store.read(file_path)
+        if content is not None:
+            for token in tokenize(above_the_fold(content)):
+                if token.kind == 'starttag':
+                    usage.add_element(token.name, parse_attrs(token.attrs_src))
+    return usage
+
+
+def rebase_urls(css, from_dir, to_dir):
+    """Rewrite relative url() references so CSS moved from from_dir into a page in to_dir still resolves"""
+    def rebase(match):
+        url = match.group(2).strip()
+        if url.startswith(('data:', 'http:', 'https:', '//', '/', '#')):
+            return match.group(0)
+        target = posixpath.normpath(posixpath.join(from_dir, url))
+        return f'url({match.group(1)}{posixpath.relpath(target, to_dir or ".")}{match.group(1)})'
+    return CSS_URL_RE.sub(rebase, css)
+
+
+def _line_span(content, start, end):
+    """Widen a span to its whole line(s) when nothing else shares them"""
+    line_start = content.rfind('\n', 0, start) + 1
+    line_end = content.find('\n', end)
+    line_end = len(content) if line_end == -1 else line_end
+    if content[line_start:start].strip() or content[end:line_end].strip():
+        return start, end
+    return line_start, min(line_end + 1, len(content))
+
+
+def _generated_span(content, start, end, separator_before):
+    """Span of a block this stage inserted, with the line break it was inserted with
+
+    Blocks alone on their line go with the whole line. Otherwise the newline and
+    indent written next to them go too, so a rerun reproduces the page exactly.
+    """
+    span = _line_span(content, start, end)
+    if span != (start, end):
+        return span
+    if separator_before:
+        match = re.search(r'\r?\n[ \t]*$', content[:start])
+        return (match.start() if match else start), end
+    match = re.match(r'\r?\n[ \t]*', content[end:])
+    return start, end + (match.end() if match else 0)
+
+
+def _local_css(href):
+    return href.split('?')[0].split('#')[0].endswith('.css') and '://' not in href and not href.startswith('//')
+
+
+def _managed_link(attrs):
+    """Local stylesheet links this stage owns: blocking, print-swap or preload-swap"""
+    rel = attrs.get('rel', '').lower().split()
+    if not _local_css(attrs.get('href', '')):
+        return False
+    if 'preload' in rel:
+        return attrs.get('as') == 'style'
+    if 'stylesheet' not in rel:
+        return False
+    media = attrs.get('media', 'all').lower()
+    return media in ('all', 'screen') or (media == 'print' and 'onload' in attrs)
+
+
+def inline_critical_css(content, critical_css, template):
+    """Put critical CSS in <head> and switch the page's own stylesheets to non-blocking loads
+
+    Returns the rewritten page, or the page unchanged if its head links no local stylesheet.
+    """
+    edits = []
+    hrefs = []
+    first_link = last_link = None
+    noscript = None
+
+    for token in tokenize(content):
+        if (token.kind == 'endtag' and token.name == 'head') or (token.kind == 'starttag' and token.name == 'body'):
+            break
+        if token.kind == 'starttag' and token.name == 'noscript':
+            noscript = {'start': token.start, 'links': 0, 'other': 0}
+        elif token.kind == 'endtag' and token.name == 'noscript' and noscript:
+            # Fallbacks holding only local stylesheets are regenerated below
+            if noscript['links'] and not noscript['other']:
+                edits.append(Edit(*_generated_span(content, noscript['start'], token.end, True), ''))
+            noscript = None
+        elif token.kind == 'starttag' and token.name == 'link':
+            attrs = parse_attrs(token.attrs_src)
+            if noscript:
+                if _local_css(attrs.get('href', '')) and 'stylesheet' in attrs.get('rel', '').lower():
+                    noscript['links'] += 1
+                else:
+                    noscript['other'] += 1
+            elif _managed_link(attrs):
+                # Swapped in place, so the cascade order against inline <style> is kept
+                replacement = ''
+                if attrs['href'] not in hrefs:
+                    hrefs.append(attrs['href'])
+                    replacement = PRELOAD_LINK.format(href=attrs['href'])
+                if first_link is None:
+                    first_link = token
+                last_link = token
+                edits.append(Edit(token.start, token.end, replacement))
+        elif token.kind == 'starttag' and token.name == 'style' and not noscript:
+            attrs = parse_attrs(token.attrs_src)
+            body = content[token.end:token.close_end]
+            if 'data-critical' in attrs:
+                edits.append(Edit(*_generated_span(content, token.start, token.close_end, False), ''))
+            elif body.lstrip().startswith(LEGACY_CRITICAL_MARKER):
+                edits.append(Edit(*_line_span(content, token.start, token.close_end), ''))
+        elif noscript and token.kind == 'starttag':
+            noscript['other'] += 1
+
+    if not hrefs:
+        return content
+
+    line_start = content.rfind('\n', 0, first_link.start) + 1
+    indent = re.match(r'[ \t]*', content[line_start:]).group()
+    style = f'<style data-critical="{template}">{critical_css}</style>\n{indent}'
+    fallback = '\n' + indent + '<noscript>' + ''.join(NOSCRIPT_LINK.format(href=href) for href in hrefs) + '</noscript>'
+    edits.append(Edit(first_link.start, first_link.start, style))
+    edits.append(Edit(last_link.end, last_link.end, fallback))
+    return apply_edits(content, edits)
+
+
+def build_critical_css(root_path="public_html", write=True, writer=None):
+    """Compute each template's critical rules and inline them into its pages"""
+    store = PageStore(root_path)
+    writer = writer or InPlaceWriter()
+    results = []
+
+    for template, pages in group_pages(store).items():
+        if template not in TEMPLATES or not pages:
+            continue
+        usage = fold_usage(store, pages)
+        purged = {}
+        sizes = []
+        for file_path in pages:
+            page_dir = posixpath.dirname(store.relpath(file_path).replace(os.sep, '/'))
+            parts = []
+            for sheet in linked_stylesheets(store, file_path):
+                if sheet not in purged:
+                    with open(sheet, 'r', encoding='utf-8') as f:
+                        purged[sheet] = purge_css(f.read(), usage)
+                sheet_dir = posixpath.dirname(store.relpath(sheet).replace(os.sep, '/'))
+                parts.append(rebase_urls(purged[sheet], sheet_dir, page_dir))
+            critical = ''.join(parts)
+
+            content = store.read(file_path)
+            updated = inline_critical_css(content, critical, template)
+            if updated != content:
+                if write:
+                    writer.write(file_path, updated, content)
+                sizes.append(len(critical.encode('utf-8')))
+
+        results.append({
+            'template': template,
+            'pages': len(pages),
+            'rewritten': len(sizes),
+            'critical_bytes': max(sizes) if sizes else 0
+        })
+    return results
+
+
+def print_critical_report(results):
+    """Critical CSS size per template against the first round-trip budget"""
+    print(f"{'Template':<10} {'Pages':>6} {'Rewritten':>10} {'Critical CSS':>14}")
+    print("-" * 44)
+    for result in results:
+        flag = "⚠️ " if result['critical_bytes'] > CRITICAL_BUDGET_BYTES else "✅"
+        print(f"{result['template']:<10} {result['pages']:>6} {result['rewritten']:>10} "
+              f"{result['critical_bytes']:>10,} B {flag}")
+    print(f"\nBudget: {CRITICAL_BUDGET_BYTES:,} bytes of inline CSS per page")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inline per-template critical CSS and load stylesheets asynchronously")
+    parser.add_argument('root_path', nargs='?', default="public_html")
+    parser.add_argument('--check', action='store_true', help="Report critical CSS sizes without rewriting pages")
+    add_dry_run_arguments(parser)
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.root_path):
+        print(f"Error: {args.root_path} not found")
+        return 1
+
+    with writer_from_args(args) as writer:
+        results = build_critical_css(args.root_path, write=not args.check, writer=writer)
+        print_critical_report(results)
+        writer.summary()
+        over = [result['template'] for result in results if result['critical_bytes'] > CRITICAL_BUDGET_BYTES]
+        if over:
+            print(f"❌ Critical CSS over budget: {', '.join(over)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
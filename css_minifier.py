@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+CSS Minifier and Bundle Builder for BC Roofing Website
+Tokenizes stylesheets, minifies them safely, merges duplicate rules and rebuilds every .min.css
+"""
+
+import os
+import re
+import sys
+import json
+import gzip
+import argparse
+from pathlib import Path
+
+from page_writer import InPlaceWriter, add_dry_run_arguments, writer_from_args, write_if_changed
+
+CSS_DIR = Path("public_html") / "css"
+BUNDLES_PATH = Path("css_bundles.json")
+
+TOKEN_RE = re.compile(r'''
+    (?P<comment>/\*.*?(?:\*/|\Z))
+  | (?P<string>"(?:[^"\\\n]|\\.)*"?|'(?:[^'\\\n]|\\.)*'?)
+  | (?P<url>url\(\s*(?:"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*'|[^)"'\s]*)\s*\))
+  | (?P<space>\s+)
+  | (?P<punct>[{}:;,()>+~!])
+  | (?P<other>[^\s{}:;,()>+~!"'/]+|/)
+''', re.VERBOSE | re.DOTALL | re.IGNORECASE)
+
+# At-rules whose block holds rules rather than declarations
+RULE_BLOCK_AT_RULES = ('@media', '@supports', '@document', '@layer', '@container', '@keyframes',
+                       '@-webkit-keyframes', '@-moz-keyframes', '@scope')
+
+# Functions whose + and - operators must keep their surrounding spaces
+MATH_FUNCTIONS = ('calc(', '-webkit-calc(', 'min(', 'max(', 'clamp(')
+
+
+def tokenize_css(css):
+    """Yield (kind, text) tokens; strings, comments and url() values are single tokens"""
+    for match in TOKEN_RE.finditer(css):
+        yield match.lastgroup, match.group()
+
+
+class Rule:
+    """A style rule, declaration-only at-rule (@font-face) or statement (@import)"""
+
+    def __init__(self, prelude, declarations=None, children=None, statement=False):
+        self.prelude = prelude
+        self.declarations = declarations
+        self.children = children
+        self.statement = statement
+
+    def serialize(self):
+        if self.statement:
+            return self.prelude if self.prelude.startswith('/*') else self.prelude + ';'
+        if self.children is not None:
+            return self.prelude + '{' + ''.join(child.serialize() for child in self.children) + '}'
+        return self.prelude + '{' + ';'.join(self.declarations) + '}'
+
+
+def _join(tokens, selector_context):
+    """Serialize tokens (comments already removed) with only the whitespace CSS needs"""
+    droppable_around = set('{};,!')
+    if selector_context:
+        droppable_around |= set('>+~')
+    out = []
+    pending_space = False
+    paren_math = []
+
+    for kind, text in tokens:
+        if kind == 'space':
+            pending_space = bool(out)
+            continue
+
+        in_math = any(paren_math)
+        if pending_space:
+            previous = out[-1]
+            keep = True
+            if text in droppable_around or previous in droppable_around:
+                keep = False
+            elif text == ')' or previous == '(':
+                keep = False
+            elif text == ':' and not selector_context:
+                keep = False
+            elif previous == ':' and (not selector_context or paren_math):
+                keep = False
+            if in_math and (text in ('+', '-') or previous in ('+', '-')):
+                keep = True
+            if keep:
+                out.append(' ')
+            pending_space = False
+
+        if text == '(':
+            previous = out[-1].lower() if out else ''
+            paren_math.append(previous + '(' in MATH_FUNCTIONS or (bool(paren_math) and paren_math[-1]))
+        elif text == ')' and paren_math:
+            paren_math.pop()
+        out.append(text)
+
+    return ''.join(out).strip()
+
+
+def _split_declarations(tokens):
+    """Split a declaration block's tokens on top-level semicolons"""
+    declarations, current, depth = [], [], 0
+    for kind, text in tokens:
+        if text == '(':
+            depth += 1
+        elif text == ')':
+            depth = max(0, depth - 1)
+        if text == ';' and depth == 0 and kind == 'punct':
+            declarations.append(current)
+            current = []
+        else:
+            current.append((kind, text))
+    declarations.append(current)
+    return [d for d in (_join(tokens, False) for tokens in declarations) if d]
+
+
+def parse_css(css):
+    """Parse a stylesheet into a list of Rule objects (comments dropped, /*! */ kept)"""
+    tokens = []
+    preserved = []
+    for kind, text in tokenize_css(css):
+        if kind == 'comment':
+            if text.startswith('/*!'):
+                preserved.append(Rule(text, statement=True))
+            continue
+        tokens.append((kind, text))
+
+    position = 0
+
+    def parse_rules(stop_at_close):
+        nonlocal position
+        rules = []
+        prelude = []
+        while position < len(tokens):
+            kind, text = tokens[position]
+            position += 1
+            if kind == 'punct' and text == '}':
+                if stop_at_close:
+                    return rules
+                continue
+            if kind == 'punct' and text == ';' and prelude and _join(prelude, True).startswith('@'):
+                rules.append(Rule(_join(prelude, True), statement=True))
+                prelude = []
+                continue
+            if kind == 'punct' and text == '{':
+                head = _join(prelude, True)
+                prelude = []
+                if head.lower().startswith(RULE_BLOCK_AT_RULES):
+                    rules.append(Rule(head, children=parse_rules(True)))
+                else:
+                    rules.append(Rule(head, declarations=_split_declarations(read_block())))
+                continue
+            prelude.append((kind, text))
+        return rules
+
+    def read_block():
+        nonlocal position
+        block, depth = [], 0
+        while position < len(tokens):
+            kind, text = tokens[position]
+            position += 1
+            if kind == 'punct' and text == '{':
+                depth += 1
+            elif kind == 'punct' and text == '}':
+                if depth == 0:
+                    break
+                depth -= 1
+            block.append((kind, text))
+        return block
+
+    return preserved + parse_rules(False)
+
+
+# Pseudo selectors some browsers reject; a merged selector list containing one
+# would be dropped as a whole by those browsers
+FRAGILE_SELECTORS = (':-', ':has(', ':is(', ':where(', ':focus-visible', ':focus-within',
+                     ':placeholder-shown', '::marker', '::backdrop')
+
+
+def _is_mergeable_selector(selector):
+    """True if joining this selector into a selector list cannot invalidate the list"""
+    return not any(fragile in selector for fragile in FRAGILE_SELECTORS)
+
+
+def _dedupe_declarations(declarations):
+    """Drop exact duplicate declarations, keeping the last occurrence of each"""
+    seen = set()
+    kept = []
+    for declaration in reversed(declarations):
+        if declaration not in seen:
+            seen.add(declaration)
+            kept.append(declaration)
+    kept.reverse()
+    return kept
+
+
+def merge_rules(rules):
+    """Merge adjacent duplicate rules and duplicate declarations, recursively
+
+    Only adjacent rules are merged, so the cascade order never changes:
+    a{x}a{y} -> a{x;y} and a{x}b{x} -> a,b{x}.
+    """
+    merged = []
+    for rule in rules:
+        if rule.children is not None:
+            rule.children = merge_rules(rule.children)
+            if not rule.children:
+                continue
+        elif not rule.statement:
+            rule.declarations = _dedupe_declarations(rule.declarations)
+            if not rule.declarations:
+                continue
+
+        previous = merged[-1] if merged else None
+        if previous and previous.declarations is not None and rule.declarations is not None \
+                and not previous.prelude.startswith('@') and not rule.prelude.startswith('@'):
+            if previous.prelude == rule.prelude:
+                previous.declarations = _dedupe_declarations(previous.declarations + rule.declarations)
+                continue
+            if previous.declarations == rule.declarations \
+                    and _is_mergeable_selector(previous.prelude) and _is_mergeable_selector(rule.prelude):
+                previous.prelude = previous.prelude + ',' + rule.prelude
+                continue
+        merged.append(rule)
+    return merged
+
+
+def strip_css(css):
+    """Minify whitespace and comments only (no rule merging)"""
+    return ''.join(rule.serialize() for rule in parse_css(css))
+
+
+def minify_css(css_content, merge=True):
+    """Minify CSS: tokenized whitespace/comment removal plus duplicate rule merging"""
+    rules = parse_css(css_content)
+    if merge:
+        rules = merge_rules(rules)
+    return ''.join(rule.serialize() for rule in rules)
+
+
+def minify_with_report(css):
+    """Minify and measure the bytes each step saved"""
+    original = len(css.encode('utf-8'))
+    stripped = strip_css(css)
+    merged = minify_css(css)
+    return merged, {
+        'original': original,
+        'whitespace_comments': original - len(stripped.encode('utf-8')),
+        'merged_rules': len(stripped.encode('utf-8')) - len(merged.encode('utf-8')),
+        'minified': len(merged.encode('utf-8')),
+        'gzip': len(gzip.compress(merged.encode('utf-8'), compresslevel=6))
+    }
+
+
+def load_bundles(path=BUNDLES_PATH):
+    """Declared bundles: {output file: [source files in cascade order]}"""
+    if not Path(path).exists():
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def build_css(css_dir=CSS_DIR, bundles_path=BUNDLES_PATH, writer=None):
+    """Regenerate every .min.css from its source and every declared bundle"""
+    writer = writer or InPlaceWriter()
+    css_dir = Path(css_dir)
+    bundles = load_bundles(bundles_path)
+    bundled = {name for sources in bundles.values() for name in sources}
+    reports = []
+
+    for source in sorted(css_dir.glob("*.css")):
+        if source.name.endswith('.min.css'):
+            continue
+        target = source.with_name(source.stem + '.min.css')
+        # Sources that only feed a bundle get no .min.css of their own, and a bundle's output is built below
+        if (source.name in bundled and not target.exists()) or target.name in bundles:
+            continue
+        minified, report = minify_with_report(source.read_text(encoding='utf-8'))
+        write_if_changed(writer, target, minified)
+        reports.append((target.name, report))
+
+    for bundle, sources in bundles.items():
+        css = '\n'.join((css_dir / name).read_text(encoding='utf-8') for name in sources)
+        minified, report = minify_with_report(css)
+        target = css_dir / bundle
+        write_if_changed(writer, target, minified)
+        reports.append((bundle, report))
+
+    return reports
+
+
+def print_build_report(reports):
+    """Bytes saved by each minification step"""
+    print(f"{'Output':<40} {'Source':>9} {'-Space/Cmt':>11} {'-Merged':>9} {'Minified':>9} {'Gzip':>8}")
+    print("-" * 90)
+    totals = [0, 0, 0, 0, 0]
+    for name, report in reports:
+        row = [report['original'], report['whitespace_comments'], report['merged_rules'],
+               report['minified'], report['gzip']]
+        totals = [a + b for a, b in zip(totals, row)]
+        print(f"{name:<40} {row[0]:>9,} {row[1]:>11,} {row[2]:>9,} {row[3]:>9,} {row[4]:>8,}")
+    print("-" * 90)
+    print(f"{'TOTAL':<40} {totals[0]:>9,} {totals[1]:>11,} {totals[2]:>9,} {totals[3]:>9,} {totals[4]:>8,}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild minified CSS and bundles from source")
+    parser.add_argument('--css-dir', default=str(CSS_DIR))
+    parser.add_argument('--bundles', default=str(BUNDLES_PATH))
+    add_dry_run_arguments(parser)
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.css_dir):
+        print(f"Error: {args.css_dir} not found")
+        return 1
+
+    with writer_from_args(args) as writer:
+        print_build_report(build_css(args.css_dir, args.bundles, writer))
+        writer.summary()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+Selector-Level Unused CSS Purger for BC Roofing Website
+Indexes the classes, ids, tags and attributes every page and script uses, and emits purged stylesheets per page type
+"""
+
+import os
+import re
+import sys
+import json
+import gzip
+import fnmatch
+import argparse
+from pathlib import Path
+
+from page_store import PageStore
+from page_types import PAGE_TYPES, group_pages
+from html_rewriter import tokenize, parse_attrs
+from css_minifier import parse_css, merge_rules
+from page_writer import InPlaceWriter, add_dry_run_arguments, writer_from_args, write_if_changed
+
+ALLOWLIST_PATH = Path("css_purge_allowlist.json")
+
+# Present on every page even when the markup omits them
+ALWAYS_PRESENT_TAGS = {'html', 'head', 'body'}
+
+JS_STRING_RE = re.compile(r'"(?:[^"\\\n]|\\.)*"|\'(?:[^\'\\\n]|\\.)*\'|`(?:[^`\\]|\\.)*`', re.DOTALL)
+CLASSLIST_RE = re.compile(r'classList\.(?:add|toggle|replace)\s*\(([^)]*)\)')
+CLASSNAME_RE = re.compile(r'className\s*\+?=\s*(["\'`])(.*?)\1')
+SET_ATTRIBUTE_RE = re.compile(r'setAttribute\(\s*["\']([\w:-]+)["\']\s*(?:,\s*["\']([^"\']*)["\'])?')
+ID_ASSIGN_RE = re.compile(r'\.id\s*=\s*["\']([^"\']+)["\']')
+CREATE_ELEMENT_RE = re.compile(r'createElement\(\s*["\'](\w+)["\']')
+DATASET_RE = re.compile(r'\.dataset\.(\w+)')
+
+SIMPLE_SELECTOR_RE = re.compile(r'''
+    (?P<attr>\[\s*(?P<attr_name>[\w:-]+)(?:[^\]"']|"[^"]*"|'[^']*')*\])
+  | (?P<pseudo>::?[\w-]+(?P<paren>\()?)
+  | (?P<id>\#(?:[\w-]|\\.)+)
+  | (?P<cls>\.(?:[\w-]|\\.)+)
+  | (?P<tag>(?:[\w-]|\\.)+)
+  | (?P<other>.)
+''', re.VERBOSE | re.DOTALL)
+
+ANIMATION_PROPERTY_RE = re.compile(r'^(?:-\w+-)?animation(?:-name)?:', re.IGNORECASE)
+KEYFRAMES_RE = re.compile(r'^@(?:-\w+-)?keyframes\s+(\S+)', re.IGNORECASE)
+
+
+def _unescape(name):
+    return re.sub(r'\\(.)', r'\1', name)
+
+
+def _words(value):
+    """Class-like words of a string; template placeholders are skipped"""
+    return [word for word in value.split() if '$' not in word and '{' not in word and '}' not in word]
+
+
+class SelectorUsage:
+    """Classes, ids, tags and attribute names seen in markup and scripts"""
+
+    def __init__(self, allowlist=None):
+        self.classes = set()
+        self.ids = set()
+        self.tags = set(ALWAYS_PRESENT_TAGS)
+        self.attributes = set()
+        allowlist = allowlist or {}
+        self.allowed_classes = allowlist.get('classes', [])
+        self.allowed_ids = allowlist.get('ids', [])
+
+    def add_html(self, content):
+        """Record everything a page's start tags use, plus its inline scripts"""
+        for token in tokenize(content):
+            if token.kind == 'starttag':
+                self.add_element(token.name, parse_attrs(token.attrs_src))
+            elif token.kind == 'rawtext' and token.name == 'script':
+                self.add_js(content[token.start:token.end])
+
+    def add_element(self, tag, attrs):
+        self.tags.add(tag.lower())
+        self.attributes.update(attrs)
+        self.classes.update(_words(attrs.get('class', '')))
+        if attrs.get('id'):
+            self.ids.add(attrs['id'])
+
+    def add_js(self, source):
+        """Record classes, ids and markup a script adds to the DOM"""
+        for literal in JS_STRING_RE.findall(source):
+            if '<' in literal:
+                markup = literal[1:-1]
+                for token in tokenize(markup):
+                    if token.kind == 'starttag':
+                        self.add_element(token.name, parse_attrs(token.attrs_src))
+        for arguments in CLASSLIST_RE.findall(source):
+            for literal in JS_STRING_RE.findall(arguments):
+                self.classes.update(_words(literal[1:-1]))
+        for _, value in CLASSNAME_RE.findall(source):
+            self.classes.update(_words(value))
+        for name, value in SET_ATTRIBUTE_RE.findall(source):
+            self.attributes.add(name.lower())
+            if name == 'class':
+                self.classes.update(_words(value))
+            elif name == 'id' and value:
+                self.ids.add(value)
+        self.ids.update(ID_ASSIGN_RE.findall(source))
+        self.tags.update(tag.lower() for tag in CREATE_ELEMENT_RE.findall(source))
+        for key in DATASET_RE.findall(source):
+            self.attributes.add('data-' + re.sub(r'([A-Z])', r'-\1', key).lower())
+
+    def merge(self, other):
+        """Add another index's usage to this one"""
+        self.classes |= other.classes
+        self.ids |= other.ids
+        self.tags |= other.tags
+        self.attributes |= other.attributes
+
+    def has_class(self, name):
+        return name in self.classes or any(fnmatch.fnmatchcase(name, p) for p in self.allowed_classes)
+
+    def has_id(self, name):
+        return name in self.ids or any(fnmatch.fnmatchcase(name, p) for p in self.allowed_ids)
+
+    def matches(self, selector):
+        """False only if the selector needs something no page or script ever uses
+
+        Each simple selector is checked on its own, so this over-approximates:
+        '.a .b' is kept when .a and .b exist anywhere. Pseudo-classes and
+        their arguments (:not(), :is(), :has()) never remove a selector.
+        """
+        position = 0
+        while position < len(selector):
+            match = SIMPLE_SELECTOR_RE.match(selector, position)
+            position = match.end()
+            if match.group('paren'):
+                position = _skip_parens(selector, position)
+            elif match.group('attr'):
+                if match.group('attr_name').lower() not in self.attributes:
+                    return False
+            elif match.group('id'):
+                if not self.has_id(_unescape(match.group('id')[1:])):
+                    return False
+            elif match.group('cls'):
+                if not self.has_class(_unescape(match.group('cls')[1:])):
+                    return False
+            elif match.group('tag'):
+                if _unescape(match.group('tag')).lower() not in self.tags:
+                    return False
+        return True
+
+
+def _skip_parens(text, position):
+    """Index just past the ')' closing a '(' that ends at position"""
+    depth = 1
+    while position < len(text) and depth:
+        if text[position] == '(':
+            depth += 1
+        elif text[position] == ')':
+            depth -= 1
+        position += 1
+    return position
+
+
+def split_selector_list(prelude):
+    """Split 'a, b:is(c, d)' on top-level commas only"""
+    selectors, depth, start = [], 0, 0
+    quote = None
+    for i, char in enumerate(prelude):
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in '"\'':
+            quote = char
+        elif char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            selectors.append(prelude[start:i])
+            start = i + 1
+    selectors.append(prelude[start:])
+    return [selector.strip() for selector in selectors if selector.strip()]
+
+
+def load_allowlist(path=ALLOWLIST_PATH):
+    """Class and id patterns (fnmatch globs) added at runtime by code the scanner cannot see"""
+    if not Path(path).exists():
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def script_usage(root_path, allowlist=None):
+    """Usage from every site script; any page may load any of them dynamically"""
+    usage = SelectorUsage(allowlist)
+    js_dir = Path(root_path) / "js"
+    for script in sorted(js_dir.glob("*.js")) if js_dir.exists() else []:
+        # Scan the readable source when both versions exist
+        if script.name.endswith('.min.js') and script.with_name(script.name[:-len('.min.js')] + '.js').exists():
+            continue
+        usage.add_js(script.read_text(encoding='utf-8', errors='replace'))
+    return usage
+
+
+def build_usage(store, pages, allowlist=None, scripts=None):
+    """Union of what a set of pages (and the site scripts) use"""
+    usage = SelectorUsage(allowlist)
+    if scripts is not None:
+        usage.merge(scripts)
+    for file_path in pages:
+        content = store.read(file_path)
+        if content is not None:
+            usage.add_html(content)
+    return usage
+
+
+def _purge_rules(rules, usage):
+    kept = []
+    for rule in rules:
+        if rule.statement or KEYFRAMES_RE.match(rule.prelude):
+            kept.append(rule)
+        elif rule.children is not None:
+            rule.children = _purge_rules(rule.children, usage)
+            if rule.children:
+                kept.append(rule)
+        elif rule.prelude.startswith('@'):
+            kept.append(rule)
+        else:
+            selectors = [s for s in split_selector_list(rule.prelude) if usage.matches(s)]
+            if selectors:
+                rule.prelude = ','.join(selectors)
+                kept.append(rule)
+    return kept
+
+
+def _animation_names(rules, names):
+    for rule in rules:
+        if rule.children is not None and not KEYFRAMES_RE.match(rule.prelude):
+            _animation_names(rule.children, names)
+        elif rule.declarations:
+            for declaration in rule.declarations:
+                if ANIMATION_PROPERTY_RE.match(declaration):
+                    names.update(re.split(r'[\s,]+', declaration.split(':', 1)[1]))
+    return names
+
+
+def _drop_unused_keyframes(rules, names):
+    kept = []
+    for rule in rules:
+        keyframes = KEYFRAMES_RE.match(rule.prelude)
+        if keyframes and keyframes.group(1) not in names:
+            continue
+        if rule.children is not None and not keyframes:
+            rule.children = _drop_unused_keyframes(rule.children, names)
+            if not rule.children:
+                continue
+        kept.append(rule)
+    return kept
+
+
+def purge_css(css, usage):
+    """Drop every selector the usage index proves unused, then unreferenced @keyframes"""
+    rules = _purge_rules(parse_css(css), usage)
+    rules = _drop_unused_keyframes(rules, _animation_names(rules, set()))
+    return ''.join(rule.serialize() for rule in merge_rules(rules))
+
+
+def linked_stylesheets(store, file_path):
+    """Local stylesheets a page links (or preloads as style), as paths under the site root"""
+    content = store.read(file_path) or ''
+    root = os.path.abspath(store.root_path)
+    sheets = []
+    for token in tokenize(content):
+        if token.kind != 'starttag' or token.name != 'link':
+            continue
+        attrs = parse_attrs(token.attrs_src)
+        rel = attrs.get('rel', '').lower().split()
+        href = attrs.get('href', '').split('?')[0].split('#')[0]
+        if not href.endswith('.css') or '://' in href or href.startswith('//'):
+            continue
+        if 'stylesheet' not in rel and not ('preload' in rel and attrs.get('as') == 'style'):
+            continue
+        if href.startswith('/'):
+            path = os.path.join(root, href.lstrip('/'))
+        else:
+            path = os.path.join(os.path.dirname(os.path.abspath(file_path)), href)
+        path = os.path.normpath(path)
+        if path.startswith(root + os.sep) and os.path.isfile(path) and path not in sheets:
+            sheets.append(path)
+    return sheets
+
+
+def purged_name(stylesheet, page_type):
+    """'styles.min.css' -> 'styles.city.min.css' (same directory, so url() paths still resolve)"""
+    name = os.path.basename(stylesheet)
+    stem = name[:-len('.min.css')] if name.endswith('.min.css') else name[:-len('.css')]
+    return f"{stem}.{page_type}.min.css"
+
+
+def purge_site(root_path="public_html", output_path=None, allowlist=None, writer=None):
+    """Write purged copies of each stylesheet for every page type that links it"""
+    store = PageStore(root_path)
+    writer = writer or InPlaceWriter()
+    scripts = script_usage(root_path, allowlist)
+    results = []
+
+    for page_type, pages in group_pages(store).items():
+        if not pages:
+            continue
+        usage = build_usage(store, pages, allowlist, scripts)
+        sheets = []
+        for file_path in pages:
+            for sheet in linked_stylesheets(store, file_path):
+                if sheet not in sheets:
+                    sheets.append(sheet)
+
+        for sheet in sheets:
+            original = Path(sheet).read_text(encoding='utf-8')
+            purged = purge_css(original, usage)
+            target_dir = Path(output_path) if output_path else Path(sheet).parent
+            target = target_dir / purged_name(sheet, page_type)
+            write_if_changed(writer, target, purged)
+            results.append({
+                'page_type': page_type,
+                'pages': len(pages),
+                'stylesheet': os.path.relpath(sheet, root_path),
+                'output': str(target),
+                'bytes_before': len(original.encode('utf-8')),
+                'bytes_after': len(purged.encode('utf-8')),
+                'gzip_before': len(gzip.compress(original.encode('utf-8'), compresslevel=6)),
+                'gzip_after': len(gzip.compress(purged.encode('utf-8'), compresslevel=6))
+            })
+    return results
+
+
+def print_purge_report(results):
+    """Per page type and stylesheet savings"""
+    print(f"{'Type':<8} {'Stylesheet':<42} {'Before':>9} {'After':>9} {'Saved':>7} {'Gzip after':>11}")
+    print("-" * 90)
+    for result in results:
+        saved = 1 - result['bytes_after'] / result['bytes_before'] if result['bytes_before'] else 0
+        print(f"{result['page_type']:<8} {result['stylesheet']:<42} {result['bytes_before']:>9,} "
+              f"{result['bytes_after']:>9,} {saved:>7.0%} {result['gzip_after']:>11,}")
+    print("-" * 90)
+    before = sum(result['bytes_before'] for result in results)
+    after = sum(result['bytes_after'] for result in results)
+    print(f"📉 {before - after:,} of {before:,} stylesheet bytes are unused by the pages that load them")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Emit per-page-type stylesheets without unused selectors")
+    parser.add_argument('root_path', nargs='?', default="public_html")
+    parser.add_argument('--output', default=None, help="Directory for purged stylesheets (default: next to each source)")
+    parser.add_argument('--allowlist', default=str(ALLOWLIST_PATH))
+    add_dry_run_arguments(parser)
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.root_path):
+        print(f"Error: {args.root_path} not found")
+        return 1
+
+    with writer_from_args(args) as writer:
+        print(f"Page types: {', '.join(PAGE_TYPES)}")
+        print_purge_report(purge_site(args.root_path, args.output, load_allowlist(args.allowlist), writer))
+        writer.summary()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
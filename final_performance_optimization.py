@@ -7,61 +7,206 @@ Targets specific PageSpeed issues with measurable improvements
 import os
 import re
 import json
+import argparse
+import hashlib
 from pathlib import Path
-from collections import defaultdict
-import shutil
 from datetime import datetime
+from html_rewriter import HtmlRewriter, Transform, REMOVE_ELEMENT, add_attribute, parse_attrs
+from page_store import PageStore
+from css_purge import build_usage, script_usage, linked_stylesheets, purge_css, load_allowlist
+from implement_image_lazy_loading import LazyLoadingTransform
+from backup_store import BackupStore
+from page_writer import InPlaceWriter, add_dry_run_arguments, writer_from_args
+
+# Bump whenever a transform changes so every page is reprocessed on the next run
+OPTIMIZER_VERSION = "3"
+
+# Report section for each transform's per-file counts
+REPORT_KEYS = {
+    "lazy_loading": "images_lazy_loaded",
+    "defer_scripts": "scripts_deferred",
+    "css_loading": "css_optimized"
+}
+
+class DeferScriptsTransform(Transform):
+    """Add defer to non-critical external scripts"""
+    name = "defer_scripts"
+    tags = {"script"}
+    
+    # Scripts that should NOT be deferred (critical)
+    critical_scripts = ['gtag', 'analytics', 'main.js', 'main.min.js']
+    
+    def on_starttag(self, token, text, context):
+        attrs = parse_attrs(token.attrs_src)
+        script_src = attrs.get('src', '')
+        if not script_src or 'defer' in attrs or 'async' in attrs:
+            return None
+        if any(critical in script_src.lower() for critical in self.critical_scripts):
+            return None
+        context.count(self.name)
+        return text[:len('<script')] + ' defer' + text[len('<script'):]
+        
+class CssLoadingTransform(Transform):
+    """Load non-critical minified stylesheets without blocking render"""
+    name = "css_loading"
+    tags = {"link"}
+    
+    # Critical CSS that should load immediately
+    critical_css = ['styles.min.css', 'combined.min.css']
+    
+    def on_starttag(self, token, text, context):
+        attrs = parse_attrs(token.attrs_src)
+        href = attrs.get('href', '')
+        if 'stylesheet' not in attrs.get('rel', '').lower() or 'media' in attrs:
+            return None
+        # <noscript> fallbacks must stay render-blocking
+        if context.inside('noscript'):
+            return None
+        if '.min.css' not in href or any(css in href for css in self.critical_css):
+            return None
+        context.count(self.name)
+        return add_attribute(text, 'media="print" onload="this.media=\'all\'"')
+        
+class RemoveUnusedCodeTransform(Transform):
+    """Drop empty style/script blocks, HTML comments and runs of blank lines"""
+    name = "remove_unused_code"
+    
+    def on_starttag(self, token, text, context):
+        # Only bare <style> and <script> tags whose body is whitespace
+        if token.name not in ('style', 'script') or token.attrs_src.strip():
+            return None
+        body_end = context.content.rfind('<', token.end, token.close_end)
+        if body_end != -1 and not context.content[token.end:body_end].strip():
+            return REMOVE_ELEMENT
+        return None
+        
+    def on_comment(self, token, text, context):
+        # Keep conditional comments
+        if text.startswith('<!--[if'):
+            return None
+        return ''
+        
+    def on_text(self, token, text, context):
+        if '\n' not in text or context.inside('pre'):
+            return None
+        return re.sub(r'\n\s*\n\s*\n', '\n\n', text)
 
 class FinalPerformanceOptimizer:
-    def __init__(self, base_path="public_html"):
+    def __init__(self, base_path="public_html", manifest_path=".performance_manifest.json", writer=None):
         self.base_path = Path(base_path)
-        self.backup_dir = Path("backups") / datetime.now().strftime("%Y%m%d_%H%M%S")
+        # A DryRunWriter turns every write into a diff and disables backups and the manifest
+        self.writer = writer or InPlaceWriter()
+        self.backups = BackupStore("backups", base_path)
+        self.manifest_path = Path(manifest_path)
+        self.manifest = self.load_manifest()
         self.report = {
             "javascript_removed": [],
             "css_optimized": [],
             "images_lazy_loaded": [],
             "scripts_deferred": [],
             "total_savings_kb": 0,
-            "files_modified": []
+            "files_modified": [],
+            "files_skipped": [],
+            "transform_stats": {}
         }
+        self.rewriter = HtmlRewriter([
+            LazyLoadingTransform(str(self.base_path)),
+            DeferScriptsTransform(),
+            CssLoadingTransform(),
+            RemoveUnusedCodeTransform()
+        ])
         
-    def backup_file(self, file_path):
-        """Create backup before modification"""
+    def load_manifest(self):
+        """Load the per-file hash manifest from the previous run"""
         try:
-            rel_path = Path(file_path).relative_to(Path.cwd())
-            backup_path = self.backup_dir / rel_path
-            backup_path.parent.mkdir(parents=True, exist_ok=True)
-            shutil.copy2(file_path, backup_path)
+            manifest = json.loads(self.manifest_path.read_text(encoding='utf-8'))
+            return manifest.get("files", {})
+        except (OSError, ValueError):
+            return {}
+            
+    def save_manifest(self):
+        """Persist the per-file hash manifest (atomic replace)"""
+        data = {"version": OPTIMIZER_VERSION, "files": self.manifest}
+        tmp_path = self.manifest_path.with_name(self.manifest_path.name + ".tmp")
+        tmp_path.write_text(json.dumps(data, indent=2, sort_keys=True), encoding='utf-8')
+        os.replace(tmp_path, self.manifest_path)
+        
+    def is_unchanged(self, rel_path, html_file):
+        """True if the file is exactly what the current optimizer produced last run.
+        
+        Checks size and mtime first so untouched files are never read; falls
+        back to comparing the content hash when only the stat changed.
+        """
+        entry = self.manifest.get(rel_path)
+        if not entry or entry.get("version") != OPTIMIZER_VERSION:
+            return False
+        stat = html_file.stat()
+        if entry.get("mtime_ns") == stat.st_mtime_ns and entry.get("size") == stat.st_size:
+            return True
+        if hashlib.sha256(html_file.read_bytes()).hexdigest() == entry.get("output_hash"):
+            entry["mtime_ns"] = stat.st_mtime_ns
+            entry["size"] = stat.st_size
+            return True
+        return False
+        
+    def backup_file(self, file_path, data=None):
+        """Record the file's content in this run's backup before modification"""
+        try:
+            self.backups.add(file_path, data)
             return True
         except Exception as e:
             print(f"Warning: Could not backup {file_path}: {e}")
             return False
             
     def optimize_all_html_files(self):
-        """Main optimization function for HTML files"""
+        """Main optimization function for HTML files
+        
+        Pages whose content matches the output recorded in the manifest for
+        the current OPTIMIZER_VERSION are skipped without being rewritten,
+        so their mtimes (and the ETags derived from them) stay the same.
+        """
         html_files = list(self.base_path.glob("**/*.html"))
+        seen = set()
         
         for html_file in html_files:
             if "min.html" in str(html_file):
                 continue
                 
-            print(f"Optimizing: {html_file.name}")
+            rel_path = html_file.relative_to(self.base_path).as_posix()
+            seen.add(rel_path)
             
             try:
-                self.backup_file(html_file)
-                content = html_file.read_text(encoding='utf-8')
+                if self.is_unchanged(rel_path, html_file):
+                    self.report["files_skipped"].append(rel_path)
+                    continue
+                    
+                print(f"Optimizing: {html_file.name}")
+                
+                raw = html_file.read_bytes()
+                content = raw.decode('utf-8')
                 original_size = len(content)
                 
-                # Apply all optimizations
-                content = self.add_lazy_loading(content, html_file)
-                content = self.defer_scripts(content, html_file)
-                content = self.optimize_css_loading(content, html_file)
-                content = self.remove_unused_code(content, html_file)
+                # Apply all optimizations in a single pass
+                optimized = self.rewrite(content, html_file)
                 
-                # Save optimized file
-                html_file.write_text(content, encoding='utf-8')
+                # Only touch the file when the optimizations changed something
+                if optimized != content:
+                    if not self.writer.dry_run:
+                        self.backup_file(html_file, raw)
+                    self.writer.write(html_file, optimized, content)
+                    
+                if not self.writer.dry_run:
+                    output = html_file.read_bytes()
+                    stat = html_file.stat()
+                    self.manifest[rel_path] = {
+                        "input_hash": hashlib.sha256(raw).hexdigest(),
+                        "output_hash": hashlib.sha256(output).hexdigest(),
+                        "version": OPTIMIZER_VERSION,
+                        "mtime_ns": stat.st_mtime_ns,
+                        "size": stat.st_size
+                    }
                 
-                new_size = len(content)
+                new_size = len(optimized)
                 if new_size < original_size:
                     savings = (original_size - new_size) / 1024
                     self.report["total_savings_kb"] += savings
@@ -70,131 +215,63 @@ class FinalPerformanceOptimizer:
             except Exception as e:
                 print(f"Error processing {html_file}: {e}")
                 
-    def add_lazy_loading(self, content, file_path):
-        """Add lazy loading to images below the fold"""
-        lines = content.split('\n')
-        modified_lines = []
-        images_modified = 0
-        line_count = 0
-        
-        for line in lines:
-            line_count += 1
-            
-            # Skip images in header and hero sections (first 30 lines typically)
-            if line_count < 30 or 'hero' in line.lower() or 'header' in line.lower() or 'logo' in line.lower():
-                modified_lines.append(line)
-                continue
-                
-            # Add lazy loading to images
-            if '<img' in line and 'loading=' not in line:
-                # Check if image tag doesn't already have loading attribute
-                line = re.sub(r'<img\s+', '<img loading="lazy" ', line)
-                images_modified += 1
-                
-            modified_lines.append(line)
-            
-        if images_modified > 0:
-            self.report["images_lazy_loaded"].append({
-                "file": file_path.name,
-                "count": images_modified
-            })
+        if not self.writer.dry_run:
+            # Forget pages that no longer exist
+            for rel_path in list(self.manifest):
+                if rel_path not in seen:
+                    del self.manifest[rel_path]
+            self.save_manifest()
             
-        return '\n'.join(modified_lines)
-        
-    def defer_scripts(self, content, file_path):
-        """Add defer to non-critical scripts"""
-        scripts_deferred = 0
-        
-        # List of scripts that should NOT be deferred (critical)
-        critical_scripts = ['gtag', 'analytics', 'main.js', 'main.min.js']
+            run_path = self.backups.save_run()
+            if run_path:
+                print(f"Backed up {self.backups.stats['files']} files to run {self.backups.run_id} "
+                      f"({self.backups.stats['blobs_written']} new blobs); "
+                      f"restore with: python backup_store.py restore {self.backups.run_id}")
         
-        def add_defer(match):
-            nonlocal scripts_deferred
-            script_tag = match.group(0)
-            script_src = match.group(1) if match.group(1) else ""
-            
-            # Check if it's a critical script
-            is_critical = any(critical in script_src.lower() for critical in critical_scripts)
-            
-            # Check if defer/async already present
-            has_defer = 'defer' in script_tag or 'async' in script_tag
-            
-            if not is_critical and not has_defer and script_src:
-                scripts_deferred += 1
-                return script_tag.replace('<script', '<script defer')
+        if self.report["files_skipped"]:
+            print(f"Skipped {len(self.report['files_skipped'])} unchanged files")
                 
-            return script_tag
-            
-        # Pattern to match script tags with src
-        pattern = r'<script(?:\s+[^>]*?)?\s+src="([^"]+)"[^>]*>'
-        content = re.sub(pattern, add_defer, content)
+    def rewrite(self, content, file_path, rewriter=None):
+        """Run transforms over a page in one tokenizer pass and record the results"""
+        rewriter = rewriter or self.rewriter
+        content, stats = rewriter.rewrite(content, file_path)
         
-        if scripts_deferred > 0:
-            self.report["scripts_deferred"].append({
-                "file": file_path.name,
-                "count": scripts_deferred
-            })
+        for name, stat in stats.items():
+            total = self.report["transform_stats"].setdefault(
+                name, {"seconds": 0.0, "bytes_delta": 0, "edits": 0})
+            total["seconds"] += stat["seconds"]
+            total["bytes_delta"] += stat["bytes_delta"]
+            total["edits"] += stat["edits"]
             
+            if name == "remove_unused_code":
+                if stat["bytes_delta"] < 0:
+                    self.report["javascript_removed"].append({
+                        "file": file_path.name,
+                        "savings_kb": round(-stat["bytes_delta"] / 1024, 2)
+                    })
+            elif stat["count"] > 0:
+                self.report[REPORT_KEYS[name]].append({
+                    "file": file_path.name,
+                    "count": stat["count"]
+                })
+                
         return content
         
-    def optimize_css_loading(self, content, file_path):
-        """Optimize CSS loading with media queries"""
-        css_optimized = 0
-        
-        # Critical CSS that should load immediately
-        critical_css = ['styles.min.css', 'combined.min.css']
+    def add_lazy_loading(self, content, file_path):
+        """Add lazy loading to images below the fold"""
+        return self.rewrite(content, file_path, HtmlRewriter([LazyLoadingTransform(str(self.base_path))]))
         
-        lines = content.split('\n')
-        modified_lines = []
+    def defer_scripts(self, content, file_path):
+        """Add defer to non-critical scripts"""
+        return self.rewrite(content, file_path, HtmlRewriter([DeferScriptsTransform()]))
         
-        for line in lines:
-            if '<link' in line and 'stylesheet' in line:
-                is_critical = any(css in line for css in critical_css)
-                
-                # If non-critical and doesn't have media optimization
-                if not is_critical and 'media=' not in line and '.min.css' in line:
-                    # Add media="print" onload pattern for non-critical CSS
-                    line = re.sub(
-                        r'<link\s+rel="stylesheet"\s+href="([^"]+)"([^>]*)>',
-                        r'<link rel="stylesheet" href="\1" media="print" onload="this.media=\'all\'"\2>',
-                        line
-                    )
-                    css_optimized += 1
-                    
-            modified_lines.append(line)
-            
-        if css_optimized > 0:
-            self.report["css_optimized"].append({
-                "file": file_path.name,
-                "count": css_optimized
-            })
-            
-        return '\n'.join(modified_lines)
+    def optimize_css_loading(self, content, file_path):
+        """Optimize CSS loading with media queries"""
+        return self.rewrite(content, file_path, HtmlRewriter([CssLoadingTransform()]))
         
     def remove_unused_code(self, content, file_path):
         """Remove obviously unused code patterns"""
-        original_len = len(content)
-        
-        # Remove empty style tags
-        content = re.sub(r'<style>\s*</style>', '', content)
-        
-        # Remove empty script tags
-        content = re.sub(r'<script>\s*</script>', '', content)
-        
-        # Remove excessive whitespace in HTML
-        content = re.sub(r'\n\s*\n\s*\n', '\n\n', content)
-        
-        # Remove HTML comments (keep conditional comments)
-        content = re.sub(r'<!--(?!\[if).*?-->', '', content, flags=re.DOTALL)
-        
-        if len(content) < original_len:
-            savings = (original_len - len(content)) / 1024
-            self.report["javascript_removed"].append({
-                "file": file_path.name,
-                "savings_kb": round(savings, 2)
-            })
-            
-        return content
+        return self.rewrite(content, file_path, HtmlRewriter([RemoveUnusedCodeTransform()]))
         
     def create_minimal_loader(self):
         """Create minimal JavaScript loader for lazy loading"""
@@ -230,12 +307,12 @@ window.mL=1;
 });'''
         
         loader_path = self.base_path / "js" / "minimal-loader.js"
-        loader_path.write_text(loader_code, encoding='utf-8')
+        self.writer.write(loader_path, loader_code)
         
         # Create minified version
         minified = loader_code.replace('\n', '').replace('  ', ' ')
         min_path = self.base_path / "js" / "minimal-loader.min.js"
-        min_path.write_text(minified, encoding='utf-8')
+        self.writer.write(min_path, minified)
         
         self.report["javascript_removed"].append({
             "action": "Created minimal loader",
@@ -243,28 +320,38 @@ window.mL=1;
         })
         
     def remove_unused_css(self):
-        """Remove unused CSS files and rules"""
+        """Report unused CSS files and the unused rules inside linked ones"""
         css_dir = self.base_path / "css"
-        
+        store = PageStore(self.base_path)
+        pages = store.html_files()
+
         # Check which CSS files are actually used
         used_css = set()
-        html_files = list(self.base_path.glob("**/*.html"))
-        
-        for html_file in html_files:
-            content = html_file.read_text(encoding='utf-8')
-            css_refs = re.findall(r'href="css/([^"]+)"', content)
-            used_css.update(css_refs)
+        for html_file in pages:
+            used_css.update(linked_stylesheets(store, html_file))
             
         # List potentially unused CSS files
         if css_dir.exists():
             for css_file in css_dir.glob("*.css"):
                 css_name = css_file.name
-                if css_name not in used_css and not css_name.endswith('.min.css'):
+                if str(css_file.resolve()) not in used_css and not css_name.endswith('.min.css'):
                     size_kb = css_file.stat().st_size / 1024
                     self.report["css_optimized"].append({
                         "unused_file": css_name,
                         "size_kb": round(size_kb, 2)
                     })
+
+        # Rules no page or script uses (css_purge.py emits the per-page-type copies)
+        allowlist = load_allowlist()
+        usage = build_usage(store, pages, allowlist, script_usage(self.base_path, allowlist))
+        for sheet in sorted(used_css):
+            css = Path(sheet).read_text(encoding='utf-8')
+            unused = len(css.encode('utf-8')) - len(purge_css(css, usage).encode('utf-8'))
+            if unused:
+                self.report["css_optimized"].append({
+                    "stylesheet": os.path.relpath(sheet, self.base_path),
+                    "unused_rules_kb": round(unused / 1024, 2)
+                })
                     
     def generate_final_report(self):
         """Generate comprehensive optimization report"""
@@ -273,10 +360,14 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 
 ## EXECUTIVE SUMMARY
 - Files Modified: {len(self.report['files_modified'])}
+- Files Skipped (unchanged since last run): {len(self.report['files_skipped'])}
 - Total Size Savings: {self.report['total_savings_kb']:.2f} KB
 - Images with Lazy Loading: {sum(item['count'] for item in self.report['images_lazy_loaded'])}
 - Scripts Deferred: {sum(item['count'] for item in self.report['scripts_deferred'])}
 
+## TRANSFORM TIMINGS (single pass)
+{chr(10).join(f"- {name}: {stat['seconds'] * 1000:.1f} ms, {stat['edits']} edits, {stat['bytes_delta']:+d} bytes" for name, stat in self.report['transform_stats'].items())}
+
 ## JAVASCRIPT OPTIMIZATIONS (Target: 972 KiB savings)
 ### Scripts Deferred:
 {json.dumps(self.report['scripts_deferred'], indent=2)}
@@ -311,8 +402,9 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 """
         
         # Save report
-        report_path = Path("performance_optimization_report.md")
-        report_path.write_text(report_text, encoding='utf-8')
+        if not self.writer.dry_run:
+            report_path = Path("performance_optimization_report.md")
+            report_path.write_text(report_text, encoding='utf-8')
         
         print("\n" + "="*60)
         print("OPTIMIZATION COMPLETE!")
@@ -321,28 +413,38 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
         
         return report_text
         
-def main():
-    print("="*60)
-    print("STARTING FINAL PERFORMANCE OPTIMIZATION")
-    print("="*60)
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply the final PageSpeed optimizations to every page")
+    parser.add_argument('base_path', nargs='?', default="public_html")
+    add_dry_run_arguments(parser)
+    args = parser.parse_args(argv)
+    with writer_from_args(args) as writer:
+    
+        print("="*60)
+        print("STARTING FINAL PERFORMANCE OPTIMIZATION")
+        print("="*60)
     
-    optimizer = FinalPerformanceOptimizer()
+        optimizer = FinalPerformanceOptimizer(args.base_path, writer=writer)
     
-    print("\n[1/5] Optimizing HTML files...")
-    optimizer.optimize_all_html_files()
+        print("\n[1/5] Optimizing HTML files...")
+        optimizer.optimize_all_html_files()
     
-    print("\n[2/5] Creating minimal loader...")
-    optimizer.create_minimal_loader()
+        print("\n[2/5] Creating minimal loader...")
+        optimizer.create_minimal_loader()
     
-    print("\n[3/5] Analyzing CSS usage...")
-    optimizer.remove_unused_css()
+        print("\n[3/5] Analyzing CSS usage...")
+        optimizer.remove_unused_css()
     
-    print("\n[4/5] Generating report...")
-    optimizer.generate_final_report()
+        print("\n[4/5] Generating report...")
+        optimizer.generate_final_report()
     
-    print("\n[5/5] Backup created at:", optimizer.backup_dir)
+        if optimizer.backups.run_id:
+            print("\n[5/5] Backup run:", optimizer.backups.run_id, "in", optimizer.backups.store_path)
+        else:
+            print("\n[5/5] No files changed, no backup run recorded")
+        writer.summary()
     
-    return optimizer.report
+        return optimizer.report
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Asset Fingerprinting for BC Roofing Website
+Writes content-hashed copies of static assets and rewrites every page reference to them in one pass
+"""
+
+import os
+import re
+import sys
+import json
+import hashlib
+import argparse
+import posixpath
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import quote, unquote
+
+from page_store import PageStore
+from html_rewriter import tokenize, ATTR_RE, Edit, apply_edits
+from page_writer import InPlaceWriter, add_dry_run_arguments, writer_from_args
+
+ASSET_DIRS = ('css', 'js', 'images', 'assets')
+MANIFEST_NAME = 'cache-manifest.json'
+
+# Attributes holding one URL, and those holding a srcset list
+URL_ATTRIBUTES = {'href', 'src', 'poster', 'data-src'}
+SRCSET_ATTRIBUTES = {'srcset', 'data-srcset'}
+
+CSS_URL_RE = re.compile(r'url\(\s*(["\']?)([^"\')]+)\1\s*\)')
+FINGERPRINTED_RE = re.compile(r'^(.*)-[0-9a-f]{8}(\.[^./]+)$')
+
+
+def content_hash(data):
+    """First 8 hex digits of the SHA-256 (same scheme as cache-busting-strategy.js)"""
+    return hashlib.sha256(data).hexdigest()[:8]
+
+
+def busted_name(rel_path, digest):
+    """'css/styles.min.css' -> 'css/styles.min-1a2b3c4d.css'"""
+    base, ext = posixpath.splitext(rel_path)
+    return f"{base}-{digest}{ext}"
+
+
+def load_manifest(root_path):
+    path = Path(root_path) / MANIFEST_NAME
+    if not path.exists():
+        return {'assets': {}}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _split_url(url):
+    """('path', '?query#fragment')"""
+    cut = min([i for i in (url.find('?'), url.find('#')) if i != -1], default=len(url))
+    return url[:cut], url[cut:]
+
+
+def _is_local(url):
+    return url and not url.startswith(('data:', 'http:', 'https:', '//', 'mailto:', 'tel:', '#', 'javascript:'))
+
+
+def resolve_reference(url, base_dir):
+    """Site-relative path a page or stylesheet URL points at, or None for external URLs"""
+    path, _ = _split_url(url.strip())
+    if not _is_local(path):
+        return None
+    path = unquote(path)
+    if path.startswith('/'):
+        return posixpath.normpath(path.lstrip('/'))
+    return posixpath.normpath(posixpath.join(base_dir, path))
+
+
+def retarget_reference(url, base_dir, mapping):
+    """The URL pointing at mapping[target] instead, written the same way (relative or absolute)"""
+    target = resolve_reference(url, base_dir)
+    if target not in mapping:
+        return None
+    path, suffix = _split_url(url.strip())
+    if path.startswith('/'):
+        new_path = '/' + mapping[target]
+    else:
+        new_path = posixpath.relpath(mapping[target], base_dir or '.')
+    if '%' in path:
+        new_path = quote(new_path)
+    return new_path + suffix
+
+
+def rewrite_css_urls(css, base_dir, mapping):
+    """Point url() references in a stylesheet at their mapped files"""
+    def rewrite(match):
+        new_url = retarget_reference(match.group(2), base_dir, mapping)
+        if new_url is None:
+            return match.group(0)
+        return f'url({match.group(1)}{new_url}{match.group(1)})'
+    return CSS_URL_RE.sub(rewrite, css)
+
+
+def _rewrite_srcset(value, base_dir, mapping):
+    candidates = []
+    changed = False
+    for candidate in value.split(','):
+        parts = candidate.strip().split(None, 1)
+        if not parts:
+            continue
+        new_url = retarget_reference(parts[0], base_dir, mapping)
+        if new_url is not None:
+            parts[0] = new_url
+            changed = True
+        candidates.append(' '.join(parts))
+    return ', '.join(candidates) if changed else None
+
+
+def rewrite_references(content, base_dir, mapping):
+    """Rewrite href/src/srcset attributes and inline <style> url()s in one tokenizer pass
+
+    Returns (new content, number of references rewritten).
+    """
+    edits = []
+    for token in tokenize(content):
+        if token.kind == 'rawtext' and token.name == 'style':
+            css = content[token.start:token.end]
+            new_css = rewrite_css_urls(css, base_dir, mapping)
+            if new_css != css:
+                edits.append(Edit(token.start, token.end, new_css))
+            continue
+        if token.kind != 'starttag' or not token.attrs_src:
+            continue
+        # attrs_src runs up to the closing '>'
+        attrs_offset = token.end - 1 - len(token.attrs_src)
+        for match in ATTR_RE.finditer(token.attrs_src):
+            name = match.group(1).lower()
+            raw = match.group(2)
+            if raw is None or (name not in URL_ATTRIBUTES and name not in SRCSET_ATTRIBUTES):
+                continue
+            quoted = raw[:1] in ('"', "'")
+            value = raw[1:-1] if quoted else raw
+            if name in SRCSET_ATTRIBUTES:
+                new_value = _rewrite_srcset(value, base_dir, mapping)
+            else:
+                new_value = retarget_reference(value, base_dir, mapping)
+            if new_value is None or new_value == value:
+                continue
+            value_start = attrs_offset + match.start(2) + (1 if quoted else 0)
+            edits.append(Edit(value_start, value_start + len(value), new_value))
+    return apply_edits(content, edits), len(edits)
+
+
+def find_assets(root_path, skip):
+    """Site-relative paths of every static asset, stylesheets last so they can point at hashed images"""
+    root = Path(root_path)
+    assets = []
+    for directory in ASSET_DIRS:
+        for path in sorted((root / directory).rglob('*')) if (root / directory).is_dir() else []:
+            rel_path = path.relative_to(root).as_posix()
+            if not path.is_file() or rel_path in skip:
+                continue
+            # .gz/.br sidecars written by precompress.py belong to their source
+            if path.suffix in ('.gz', '.br') and path.with_suffix('').exists():
+                continue
+            # Copies left by earlier runs: the unhashed source sits next to them
+            fingerprinted = FINGERPRINTED_RE.match(rel_path)
+            if fingerprinted and (root / (fingerprinted.group(1) + fingerprinted.group(2))).exists():
+                continue
+            assets.append(rel_path)
+    return sorted(assets, key=lambda rel_path: rel_path.endswith('.css'))
+
+
+def fingerprint_assets(root_path="public_html", writer=None):
+    """Write hashed copies of all assets, record them in the manifest and rewrite every page"""
+    root = Path(root_path)
+    writer = writer or InPlaceWriter()
+    previous = load_manifest(root_path)['assets']
+    # Earlier fingerprinted names map back to their source, so a rerun updates stale references
+    mapping = {}
+    back_to_source = {entry['busted']: source for source, entry in previous.items()}
+    assets = {}
+
+    for rel_path in find_assets(root_path, skip=set(back_to_source)):
+        source = root / rel_path
+        if rel_path.endswith('.css'):
+            css = source.read_text(encoding='utf-8')
+            css = rewrite_css_urls(css, posixpath.dirname(rel_path), mapping)
+            data = css.encode('utf-8')
+        else:
+            data = source.read_bytes()
+        digest = content_hash(data)
+        busted = busted_name(rel_path, digest)
+        target = root / busted
+        if not target.exists():
+            # Stylesheets go in as text so a dry run shows them in the patch
+            writer.write(target, css if rel_path.endswith('.css') else data)
+        mapping[rel_path] = busted
+        assets[rel_path] = {'busted': busted, 'hash': digest, 'size': len(data)}
+
+    for old_busted, source in back_to_source.items():
+        if source in mapping:
+            mapping[old_busted] = mapping[source]
+
+    pages_rewritten, references = _rewrite_pages(root_path, mapping, writer)
+
+    manifest = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'version': datetime.now().strftime('%Y%m%d%H%M'),
+        'assets': assets
+    }
+    writer.write(root / MANIFEST_NAME, json.dumps(manifest, indent=2) + '\n')
+    return {'assets': len(assets), 'pages_rewritten': pages_rewritten, 'references': references}
+
+
+def revert_fingerprints(root_path="public_html", writer=None):
+    """Point every page back at the unhashed asset names"""
+    previous = load_manifest(root_path)['assets']
+    mapping = {entry['busted']: source for source, entry in previous.items()}
+    pages_rewritten, references = _rewrite_pages(root_path, mapping, writer or InPlaceWriter())
+    return {'assets': len(mapping), 'pages_rewritten': pages_rewritten, 'references': references}
+
+
+def _rewrite_pages(root_path, mapping, writer):
+    store = PageStore(root_path)
+    pages_rewritten = references = 0
+    for file_path in store.html_files():
+        content = store.read(file_path)
+        if content is None:
+            continue
+        base_dir = posixpath.dirname(store.relpath(file_path).replace(os.sep, '/'))
+        updated, count = rewrite_references(content, base_dir, mapping)
+        if updated != content:
+            writer.write(file_path, updated, content)
+            pages_rewritten += 1
+            references += count
+    return pages_rewritten, references
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fingerprint static assets and rewrite page references")
+    parser.add_argument('action', nargs='?', choices=['build', 'revert'], default='build')
+    parser.add_argument('--root', default="public_html")
+    add_dry_run_arguments(parser)
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.root):
+        print(f"Error: {args.root} not found")
+        return 1
+
+    with writer_from_args(args) as writer:
+        if args.action == 'revert':
+            result = revert_fingerprints(args.root, writer)
+            print(f"🔄 Reverted {result['references']} references in {result['pages_rewritten']} pages")
+            writer.summary()
+            return 0
+
+        result = fingerprint_assets(args.root, writer)
+        print(f"✅ Fingerprinted {result['assets']} assets")
+        print(f"📝 Rewrote {result['references']} references in {result['pages_rewritten']} pages")
+        print(f"📁 Manifest: {os.path.join(args.root, MANIFEST_NAME)}")
+        print("Fingerprinted files never change, so they can be served with 'Cache-Control: public, max-age=31536000, immutable'")
+        writer.summary()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
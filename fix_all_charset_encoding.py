@@ -8,9 +8,11 @@ import os
 import re
 import glob
 import shutil
+import argparse
 from pathlib import Path
+from page_writer import InPlaceWriter, add_dry_run_arguments, writer_from_args
 
-def fix_charset_encoding(file_path):
+def fix_charset_encoding(file_path, writer=None):
     """Fix charset encoding placement in a single HTML file"""
     
     try:
@@ -66,8 +68,7 @@ def fix_charset_encoding(file_path):
         new_content = re.sub(r'(<head[^>]*>)\s*\n\s*(<meta charset="UTF-8">)', r'\1\n\2', new_content, flags=re.IGNORECASE)
         
         # Write the fixed content back
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(new_content)
+        (writer or InPlaceWriter()).write(file_path, new_content, content)
         
         return {
             'status': 'FIXED',
@@ -83,7 +84,7 @@ def fix_charset_encoding(file_path):
             'changes_made': False
         }
 
-def fix_all_charset_issues():
+def fix_all_charset_issues(writer=None):
     """Fix charset issues across all HTML files"""
     
     base_path = '/mnt/c/Users/adams/OneDrive/Desktop/BC Roofing Website/public_html'
@@ -157,7 +158,7 @@ def fix_all_charset_issues():
                 pass
             
             # Apply fix
-            result = fix_charset_encoding(file_path)
+            result = fix_charset_encoding(file_path, writer)
             
             if result['status'] == 'FIXED':
                 print(f"🔧 {relative_path}: {result['message']}")
@@ -206,7 +207,7 @@ def fix_all_charset_issues():
                 pass
             
             # Apply fix
-            result = fix_charset_encoding(file_path)
+            result = fix_charset_encoding(file_path, writer)
             
             if result['status'] == 'FIXED':
                 print(f"🔧 {relative_path}: {result['message']}")
@@ -255,9 +256,15 @@ def fix_all_charset_issues():
     return results
 
 if __name__ == "__main__":
-    results = fix_all_charset_issues()
+    parser = argparse.ArgumentParser(description="Move the charset declaration to the start of <head> on every page")
+    add_dry_run_arguments(parser)
+    args = parser.parse_args()
+    with writer_from_args(args) as writer:
     
-    print(f"\n" + "=" * 100)
-    print("VERIFICATION RECOMMENDED")
-    print("=" * 100)
-    print("Run 'python scan_all_charset_issues.py' to verify all fixes were applied correctly.")
\ No newline at end of file
+        results = fix_all_charset_issues(writer)
+        writer.summary()
+    
+        print(f"\n" + "=" * 100)
+        print("VERIFICATION RECOMMENDED")
+        print("=" * 100)
+        print("Run 'python scan_all_charset_issues.py' to verify all fixes were applied correctly.")
\ No newline at end of file
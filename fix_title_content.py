@@ -6,7 +6,7 @@ Generates specific content additions to include missing title words
 
 import json
 import os
-from bs4 import BeautifulSoup
+from html_parsers import make_soup
 import re
 
 # Load the analysis results
@@ -93,7 +93,7 @@ def apply_fixes():
         # Also provide location-specific recommendations
         try:
             with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                soup = BeautifulSoup(f.read(), 'html.parser')
+                soup = make_soup(f.read())
             
             # Find specific insertion points
             h1 = soup.find('h1')
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Above-the-Fold Estimator for BC Roofing Website
+Places each image of a page relative to the fold by document order, enclosing section and size
+"""
+
+import os
+import re
+import sys
+import argparse
+from collections import namedtuple
+from functools import lru_cache
+from urllib.parse import unquote
+
+from html_rewriter import tokenize, parse_attrs, VOID_ELEMENTS
+from responsive_images import image_size
+
+# Body markup and start tags that fit on a typical first screen; images past both are below the fold
+FOLD_BYTE_BUDGET = 9000
+FOLD_ELEMENT_BUDGET = 90
+
+# How much a region makes an image a likely Largest Contentful Paint element
+REGION_WEIGHTS = {'hero': 2.0, 'body': 1.0, 'header': 0.5}
+
+# Icons and badges smaller than this never win fetchpriority
+MIN_LCP_AREA = 10000
+
+HERO_RE = re.compile(r'hero|banner|jumbotron', re.IGNORECASE)
+
+# region: 'header', 'hero' (hero/banner block or the first <section>) or 'body'
+# offset / elements: body bytes and start tags before the image
+# area: rendered area from width/height attributes, else the intrinsic size (0 if unknown)
+ImagePlacement = namedtuple('ImagePlacement', 'start end index region offset elements area above_fold attrs')
+
+
+@lru_cache(maxsize=None)
+def _intrinsic_size(path):
+    try:
+        return image_size(path)
+    except OSError:
+        return None
+
+
+def _image_area(attrs, page_dir, root_path):
+    width, height = attrs.get('width', ''), attrs.get('height', '')
+    if width.isdigit() and height.isdigit():
+        return int(width) * int(height)
+    src = unquote(attrs.get('src', '').split('?')[0].split('#')[0])
+    if not src or page_dir is None or src.startswith(('data:', 'http:', 'https:', '//')):
+        return 0
+    path = os.path.join(root_path or page_dir, src.lstrip('/')) if src.startswith('/') else os.path.join(page_dir, src)
+    size = _intrinsic_size(os.path.normpath(path))
+    return size[0] * size[1] if size else 0
+
+
+def estimate_fold(content, page_dir=None, root_path=None,
+                  byte_budget=FOLD_BYTE_BUDGET, element_budget=FOLD_ELEMENT_BUDGET):
+    """Placement of every <img> in document order
+
+    page_dir (and root_path for '/' URLs) let images without width/height be sized from their files.
+    """
+    placements = []
+    stack = []
+    body_start = None
+    elements = 0
+    seen_section = False
+
+    for token in tokenize(content):
+        if token.kind == 'endtag':
+            for i in range(len(stack) - 1, -1, -1):
+                if stack[i][0] == token.name:
+                    del stack[i:]
+                    break
+            continue
+        if token.kind != 'starttag':
+            continue
+        if token.name == 'body':
+            body_start = token.end
+            continue
+        if body_start is None:
+            continue
+        elements += 1
+        attrs = parse_attrs(token.attrs_src)
+
+        if token.name == 'img':
+            regions = [region for _, region in stack]
+            if 'noscript' in regions:
+                continue
+            region = 'header' if 'header' in regions else 'hero' if 'hero' in regions else 'body'
+            offset = token.start - body_start
+            above_fold = region != 'body' or offset <= byte_budget or elements <= element_budget
+            placements.append(ImagePlacement(token.start, token.end, len(placements), region, offset, elements,
+                                             _image_area(attrs, page_dir, root_path), above_fold, attrs))
+
+        if token.name in VOID_ELEMENTS or token.close_end is not None:
+            continue
+        region = None
+        if token.name in ('header', 'nav') and not seen_section:
+            region = 'header'
+        elif token.name == 'noscript':
+            region = 'noscript'
+        elif HERO_RE.search(attrs.get('class', '') + ' ' + attrs.get('id', '')) or \
+                (token.name == 'section' and not seen_section):
+            region = 'hero'
+        if token.name == 'section':
+            seen_section = True
+        stack.append((token.name, region))
+    return placements
+
+
+def lcp_candidate(placements):
+    """The above-the-fold image most likely to be the Largest Contentful Paint, or None"""
+    best = None
+    best_score = 0
+    for placement in placements:
+        if not placement.above_fold or placement.area < MIN_LCP_AREA:
+            continue
+        # Earlier images paint first, so order breaks near-ties
+        score = placement.area * REGION_WEIGHTS[placement.region] / (1 + placement.index)
+        if score > best_score:
+            best, best_score = placement, score
+    return best
+
+
+def loading_plan(content, page_dir=None, root_path=None,
+                 byte_budget=FOLD_BYTE_BUDGET, element_budget=FOLD_ELEMENT_BUDGET):
+    """{img start offset: attribute to add} - loading="lazy" below the fold, fetchpriority="high" on the LCP
+
+    Images that already declare loading or fetchpriority are left alone, and a page
+    that already gives some image fetchpriority gets no second one.
+    """
+    placements = estimate_fold(content, page_dir, root_path, byte_budget, element_budget)
+    plan = {}
+    for placement in placements:
+        if not placement.above_fold and 'loading' not in placement.attrs:
+            plan[placement.start] = 'loading="lazy"'
+    if not any('fetchpriority' in placement.attrs for placement in placements):
+        candidate = lcp_candidate(placements)
+        if candidate is not None and candidate.attrs.get('loading') != 'lazy':
+            plan[candidate.start] = 'fetchpriority="high"'
+    return plan
+
+
+def print_fold_report(file_path, placements):
+    """Where each image of a page lands relative to the fold"""
+    candidate = lcp_candidate(placements)
+    print(f"\n📄 {file_path}")
+    print(f"  {'#':>3} {'Region':<7} {'Offset':>8} {'Tags':>5} {'Area':>8}  Fold   Image")
+    for placement in placements:
+        fold = 'above' if placement.above_fold else 'below'
+        marker = ' ⭐' if placement is candidate else ''
+        print(f"  {placement.index:>3} {placement.region:<7} {placement.offset:>8,} {placement.elements:>5} "
+              f"{placement.area:>8,}  {fold:<6} {placement.attrs.get('src', '')}{marker}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Show where each image of a page falls relative to the fold")
+    parser.add_argument('pages', nargs='+', help="HTML files to inspect")
+    parser.add_argument('--root', default="public_html", help="Site root for '/' image URLs")
+    parser.add_argument('--byte-budget', type=int, default=FOLD_BYTE_BUDGET,
+                        help="Body bytes before the fold; images past this and --element-budget are lazy-loaded")
+    parser.add_argument('--element-budget', type=int, default=FOLD_ELEMENT_BUDGET,
+                        help="Body start tags before the fold; images past this and --byte-budget are lazy-loaded")
+    args = parser.parse_args(argv)
+
+    for file_path in args.pages:
+        if not os.path.exists(file_path):
+            print(f"Error: {file_path} not found")
+            return 1
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        placements = estimate_fold(content, os.path.dirname(file_path), args.root,
+                                   args.byte_budget, args.element_budget)
+        print_fold_report(file_path, placements)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
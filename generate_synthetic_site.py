@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Synthetic Site Generator for BC Roofing Benchmarks
+Builds large test sites (1k-100k pages) from the real city-page and blog-post templates
+"""
+
+import os
+import sys
+import random
+import shutil
+import argparse
+from pathlib import Path
+
+from page_types import SERVICE_PAGES
+
+SOURCE_ROOT = Path("public_html")
+
+# Shared assets copied so page references resolve like on the real site
+ASSET_DIRS = ['css', 'js', 'images']
+
+# Share of generated pages that are city pages; the rest are blog posts
+CITY_PAGE_SHARE = 0.6
+
+GALLERY_IMAGE = '<img src="{prefix}images/logos/logo-color.png" alt="Roofing project {n} in {city}" width="400" height="300">'
+
+
+def load_templates(source_root=SOURCE_ROOT):
+    """City-page and blog-post templates as (city name, html) pairs"""
+    cities, posts = [], []
+    for path in sorted(source_root.glob("*-roofing.html")):
+        # Templates are real pages; service pages share the name pattern but are not cities
+        if path.name not in SERVICE_PAGES:
+            city = path.name[:-len('-roofing.html')].replace('-', ' ').title()
+            cities.append((city, path.read_text(encoding='utf-8')))
+    for path in sorted((source_root / "blog" / "posts").glob("*.html")):
+        posts.append((None, path.read_text(encoding='utf-8')))
+    if not cities or not posts:
+        raise FileNotFoundError(f"No city or blog templates found under {source_root}")
+    return cities, posts
+
+
+def add_gallery(html, rng, prefix, city):
+    """Append a gallery of extra images before </main> (or </body>), as on project pages"""
+    # Most pages carry no gallery; a few are image-heavy
+    count = min(int(rng.expovariate(1 / 4)), 60) if rng.random() < 0.3 else 0
+    if not count:
+        return html
+    images = '\n'.join(GALLERY_IMAGE.format(prefix=prefix, n=n, city=city or 'Metro Detroit')
+                       for n in range(count))
+    gallery = f'<section class="project-gallery">\n{images}\n</section>\n'
+    for marker in ('</main>', '</body>'):
+        position = html.rfind(marker)
+        if position != -1:
+            return html[:position] + gallery + html[position:]
+    return html + gallery
+
+
+def generate_site(output_root, pages, seed=42, source_root=SOURCE_ROOT):
+    """Write `pages` synthetic pages (plus shared assets) under output_root"""
+    rng = random.Random(seed)
+    output_root = Path(output_root)
+    cities, posts = load_templates(source_root)
+
+    if output_root.exists():
+        shutil.rmtree(output_root)
+    (output_root / "blog" / "posts").mkdir(parents=True)
+
+    for asset_dir in ASSET_DIRS:
+        if (source_root / asset_dir).exists():
+            shutil.copytree(source_root / asset_dir, output_root / asset_dir)
+
+    city_pages = int(pages * CITY_PAGE_SHARE)
+    for i in range(pages):
+        if i < city_pages:
+            template_city, html = cities[i % len(cities)]
+            city = f"{template_city} {i // len(cities) + 1}"
+            # Title-case only, so lowercase URLs keep pointing at real pages
+            html = html.replace(template_city, city)
+            html = add_gallery(html, rng, '', city)
+            target = output_root / f"synthetic-{i:06d}-roofing.html"
+        else:
+            _, html = posts[i % len(posts)]
+            html = add_gallery(html, rng, '../../', None)
+            target = output_root / "blog" / "posts" / f"synthetic-post-{i:06d}.html"
+        target.write_text(html, encoding='utf-8')
+
+    return output_root
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic BC Roofing site for benchmarking")
+    parser.add_argument('pages', type=int, help="Number of pages (e.g. 1000, 10000, 100000)")
+    parser.add_argument('--output', default=None, help="Output directory (default: benchmarks/site-<pages>)")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args(argv)
+
+    output = args.output or os.path.join("benchmarks", f"site-{args.pages}")
+    generate_site(output, args.pages, args.seed)
+    print(f"✅ Generated {args.pages} pages in {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+HTML Parser Backends for BC Roofing Website Analyzers
+Builds BeautifulSoup trees with html.parser, or with a faster parser when one is chosen explicitly
+"""
+
+import os
+from bs4 import BeautifulSoup
+
+# Fastest first. html5-parser is a C (gumbo) HTML5 parser that builds BeautifulSoup trees
+# directly; lxml is libxml2 via BeautifulSoup's tree builder; html.parser is pure Python.
+PARSER_BACKENDS = ('html5-parser', 'lxml', 'html.parser')
+
+# Set BC_HTML_PARSER to force a backend for every script ('auto' picks the fastest installed)
+PARSER_ENV_VAR = 'BC_HTML_PARSER'
+
+# The faster backends are opt-in until tests/test_parser_backends.py has no known differences left:
+# lxml currently extracts some meta descriptions differently
+DEFAULT_BACKEND = 'html.parser'
+
+_available = None
+
+
+def _probe(backend):
+    """True if the backend can be imported and used"""
+    try:
+        if backend == 'html5-parser':
+            import html5_parser  # noqa: F401
+        elif backend == 'lxml':
+            import lxml  # noqa: F401
+        return True
+    except Exception:
+        # html5-parser raises RuntimeError when its libxml2 differs from lxml's
+        return False
+
+
+def available_backends():
+    """Installed backends, fastest first"""
+    global _available
+    if _available is None:
+        _available = [backend for backend in PARSER_BACKENDS if _probe(backend)]
+    return list(_available)
+
+
+def resolve_backend(backend=None):
+    """Pick a backend: the argument, then $BC_HTML_PARSER, then html.parser"""
+    backend = backend or os.environ.get(PARSER_ENV_VAR) or DEFAULT_BACKEND
+    if backend == 'auto':
+        return available_backends()[0]
+    if backend not in PARSER_BACKENDS:
+        raise ValueError(f"Unknown parser backend '{backend}' (choose from {', '.join(PARSER_BACKENDS)} or auto)")
+    if backend not in available_backends():
+        raise ValueError(f"Parser backend '{backend}' is not installed")
+    return backend
+
+
+def make_soup(markup, backend=None):
+    """Parse markup into a BeautifulSoup tree with the chosen backend"""
+    backend = resolve_backend(backend)
+    if backend == 'html5-parser':
+        from html5_parser import parse
+        return parse(markup, treebuilder='soup', return_root=False)
+    return BeautifulSoup(markup, backend)
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Streaming HTML Rewrite Engine for BC Roofing Website
+Tokenizes a page once and lets several transforms rewrite tags during the same visit
+"""
+
+import re
+import time
+from collections import namedtuple
+
+# Elements whose content is raw text: no tags are recognised until the matching end tag
+RAW_TEXT_ELEMENTS = {'script', 'style', 'textarea', 'title'}
+
+COMMENT_RE = re.compile(r'<!--.*?-->', re.DOTALL)
+DECLARATION_RE = re.compile(r'<[!?][^>]*>')
+END_TAG_RE = re.compile(r'</([a-zA-Z][^\s/>]*)\s*>')
+START_TAG_RE = re.compile(r'<([a-zA-Z][^\s/>]*)((?:[^>"\']|"[^"]*"|\'[^\']*\')*)>')
+CLOSE_TAG_RES = {name: re.compile(r'</%s\s*>' % name, re.IGNORECASE) for name in RAW_TEXT_ELEMENTS}
+ATTR_RE = re.compile(r'([^\s"\'<>/=]+)(?:\s*=\s*("[^"]*"|\'[^\']*\'|[^\s>]+))?')
+# The rest of a line that held only a removed token, and a text piece ending in a blank line
+LINE_END_RE = re.compile(r'^[ \t]*\n')
+BLANK_LINE_END_RE = re.compile(r'\n[ \t]*\n$')
+
+# kind: text, rawtext, comment, decl, starttag, endtag
+# name: lowercased tag name for tags, None otherwise
+# attrs_src: attribute source of a start tag (between the name and '>')
+# close_end: for raw text elements, offset just past the matching end tag
+Token = namedtuple('Token', 'kind start end name attrs_src line close_end')
+
+Edit = namedtuple('Edit', 'start end replacement')
+
+
+def tokenize(content):
+    """Yield the tokens of an HTML document in order, in one linear scan"""
+    pos = 0
+    line = 1
+    length = len(content)
+
+    while pos < length:
+        lt = content.find('<', pos)
+        if lt == -1:
+            yield Token('text', pos, length, None, None, line, None)
+            return
+        if lt > pos:
+            yield Token('text', pos, lt, None, None, line, None)
+            line += content.count('\n', pos, lt)
+            pos = lt
+
+        match = None
+        if content.startswith('<!--', pos):
+            match = COMMENT_RE.match(content, pos)
+            kind = 'comment'
+        elif content.startswith('</', pos):
+            match = END_TAG_RE.match(content, pos)
+            kind = 'endtag'
+        elif content.startswith('<!', pos) or content.startswith('<?', pos):
+            match = DECLARATION_RE.match(content, pos)
+            kind = 'decl'
+        else:
+            match = START_TAG_RE.match(content, pos)
+            kind = 'starttag'
+
+        if match is None:
+            # A stray '<' is just text
+            next_lt = content.find('<', pos + 1)
+            end = length if next_lt == -1 else next_lt
+            yield Token('text', pos, end, None, None, line, None)
+            line += content.count('\n', pos, end)
+            pos = end
+            continue
+
+        end = match.end()
+        name = match.group(1).lower() if kind in ('starttag', 'endtag') else None
+
+        if kind == 'starttag' and name in RAW_TEXT_ELEMENTS and not match.group(2).rstrip().endswith('/'):
+            close = CLOSE_TAG_RES[name].search(content, end)
+            close_start = close.start() if close else length
+            close_end = close.end() if close else length
+            yield Token(kind, pos, end, name, match.group(2), line, close_end)
+            line += content.count('\n', pos, end)
+            if close_start > end:
+                yield Token('rawtext', end, close_start, name, None, line, None)
+                line += content.count('\n', end, close_start)
+            if close:
+                yield Token('endtag', close_start, close_end, name, None, line, None)
+                line += content.count('\n', close_start, close_end)
+            pos = close_end
+            continue
+
+        attrs_src = match.group(2) if kind == 'starttag' else None
+        yield Token(kind, pos, end, name, attrs_src, line, None)
+        line += content.count('\n', pos, end)
+        pos = end
+
+
+def parse_attrs(attrs_src):
+    """Parse attribute source into a dict with lowercased names and unquoted values"""
+    attrs = {}
+    for match in ATTR_RE.finditer(attrs_src or ''):
+        name = match.group(1).lower()
+        value = match.group(2)
+        if value is None:
+            value = ''
+        elif value[:1] in ('"', "'"):
+            value = value[1:-1]
+        attrs.setdefault(name, value)
+    return attrs
+
+
+def add_attribute(tag_text, attribute):
+    """Insert an attribute (e.g. 'defer' or 'loading="lazy"') before the end of a start tag"""
+    if tag_text.endswith('/>'):
+        body = tag_text[:-2].rstrip()
+        return f'{body} {attribute} />'
+    return f'{tag_text[:-1].rstrip()} {attribute}>'
+
+
+def set_attribute(tag_text, name, value):
+    """Set an attribute on a start tag, replacing its first occurrence (the one parse_attrs reads) or adding it"""
+    match = START_TAG_RE.match(tag_text)
+    attrs_offset = match.start(2)
+    for attr in ATTR_RE.finditer(match.group(2)):
+        if attr.group(1).lower() == name:
+            start, end = attrs_offset + attr.start(), attrs_offset + attr.end()
+            return f'{tag_text[:start]}{name}="{value}"{tag_text[end:]}'
+    return add_attribute(tag_text, f'{name}="{value}"')
+
+
+def apply_edits(content, edits):
+    """Apply non-overlapping edits with a single join, in linear time"""
+    if not edits:
+        return content
+    parts = []
+    pos = 0
+    for edit in sorted(edits, key=lambda e: (e.start, e.end)):
+        if edit.start < pos:
+            raise ValueError(f"Overlapping edit at offset {edit.start}")
+        parts.append(content[pos:edit.start])
+        parts.append(edit.replacement)
+        pos = edit.end
+    parts.append(content[pos:])
+    return ''.join(parts)
+
+
+# Returned by a start tag handler to drop the whole element (tag, content and end tag).
+# An element whose end tag is missing runs until the end tag of an enclosing element.
+REMOVE_ELEMENT = object()
+
+
+class Transform:
+    """Base class for rewrites run by HtmlRewriter.
+
+    Subclasses implement any of on_starttag, on_endtag, on_text, on_rawtext,
+    on_comment and on_decl. Each handler receives the token, the current text
+    of the token (possibly already rewritten by an earlier transform) and the
+    page context, and returns replacement text or None to leave it alone.
+    `tags` limits on_starttag/on_endtag to the listed tag names.
+    """
+
+    name = 'transform'
+    tags = None
+
+    def start_document(self, context):
+        """Reset per-page state"""
+
+    def end_document(self, context):
+        """Called after the last token of the page"""
+
+
+class RewriteContext:
+    """Per-page state shared by the transforms of one rewrite"""
+
+    def __init__(self, content, file_path=None):
+        self.content = content
+        self.file_path = file_path
+        self.open_elements = []
+        self.counts = {}
+
+    def count(self, transform_name, amount=1):
+        """Record that a transform changed something"""
+        self.counts[transform_name] = self.counts.get(transform_name, 0) + amount
+
+    def inside(self, tag_name):
+        """True if the current token sits inside an open element with this name"""
+        return tag_name in self.open_elements
+
+
+# Elements that never have an end tag
+VOID_ELEMENTS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link',
+    'meta', 'param', 'source', 'track', 'wbr'
+}
+
+
+class HtmlRewriter:
+    """Runs a list of transforms over a page in a single tokenizer pass.
+
+    rewrite() returns the new content and per-transform stats:
+    {name: {'seconds': float, 'bytes_delta': int, 'edits': int, 'count': int}}
+    """
+
+    def __init__(self, transforms):
+        self.transforms = list(transforms)
+        self._handlers = {}
+        for kind in ('starttag', 'endtag', 'text', 'rawtext', 'comment', 'decl'):
+            self._handlers[kind] = [
+                (transform, getattr(transform, 'on_' + kind))
+                for transform in self.transforms
+                if hasattr(transform, 'on_' + kind)
+            ]
+
+    def rewrite(self, content, file_path=None):
+        """Rewrite a page, returning (new_content, stats)
+
+        A token or element that is removed entirely while standing alone on
+        its line takes the line with it (outside <pre> and <textarea>).
+        """
+        context = RewriteContext(content, file_path)
+        stats = {t.name: {'seconds': 0.0, 'bytes_delta': 0, 'edits': 0, 'count': 0}
+                 for t in self.transforms}
+        clock = time.perf_counter
+
+        for transform in self.transforms:
+            started = clock()
+            transform.start_document(context)
+            stats[transform.name]['seconds'] += clock() - started
+
+        # [start, end, text] for every stretch of the page, in order and contiguous
+        pieces = []
+        emptied = []
+        skip_until = -1
+        # (piece index, depth of the element in open_elements, transform) while dropping an element
+        removing = None
+        for token in tokenize(content):
+            if token.start < skip_until:
+                continue
+
+            if removing is not None:
+                index, depth, transform = removing
+                stack = context.open_elements
+                if token.kind == 'starttag' and self._opens(token):
+                    stack.append(token.name)
+                if token.kind != 'endtag' or token.name not in stack:
+                    continue
+                closes = len(stack) - 1 - stack[::-1].index(token.name)
+                if closes >= depth - 1:
+                    self._close(context, token.name)
+                    if closes == depth - 1:
+                        self._end_removal(content, pieces, removing, token.end, stats)
+                        removing = None
+                    continue
+                # An enclosing element's end tag closes the removed element too
+                del stack[depth - 1:]
+                self._end_removal(content, pieces, removing, token.start, stats)
+                removing = None
+
+            if token.kind == 'endtag' and token.name not in VOID_ELEMENTS:
+                self._close(context, token.name)
+
+            original = content[token.start:token.end]
+            text = original
+            removed = False
+            for transform, handler in self._handlers[token.kind]:
+                if transform.tags is not None and token.name not in transform.tags:
+                    continue
+                started = clock()
+                result = handler(token, text, context)
+                stats[transform.name]['seconds'] += clock() - started
+                if result is REMOVE_ELEMENT:
+                    stats[transform.name]['bytes_delta'] -= len(text.encode('utf-8'))
+                    stats[transform.name]['edits'] += 1
+                    removed = True
+                    break
+                if result is not None and result != text:
+                    stats[transform.name]['bytes_delta'] += \
+                        len(result.encode('utf-8')) - len(text.encode('utf-8'))
+                    stats[transform.name]['edits'] += 1
+                    text = result
+
+            keeps_whitespace = context.inside('pre') or context.inside('textarea')
+            if removed:
+                pieces.append([token.start, token.end, ''])
+                if token.close_end is not None:
+                    # Raw text element: its content and end tag are already known
+                    self._end_removal(content, pieces, (len(pieces) - 1, 0, transform), token.close_end, stats)
+                    skip_until = token.close_end
+                elif token.kind == 'starttag' and self._opens(token):
+                    context.open_elements.append(token.name)
+                    removing = (len(pieces) - 1, len(context.open_elements), transform)
+                if not keeps_whitespace:
+                    emptied.append(len(pieces) - 1)
+                continue
+
+            pieces.append([token.start, token.end, text])
+            if text == '' and not keeps_whitespace:
+                emptied.append(len(pieces) - 1)
+            if token.kind == 'starttag' and self._opens(token) and token.close_end is None:
+                context.open_elements.append(token.name)
+
+        if removing is not None:
+            self._end_removal(content, pieces, removing, len(content), stats)
+
+        for transform in self.transforms:
+            started = clock()
+            transform.end_document(context)
+            stats[transform.name]['seconds'] += clock() - started
+
+        for name, amount in context.counts.items():
+            if name in stats:
+                stats[name]['count'] += amount
+
+        self._drop_emptied_lines(content, pieces, emptied)
+        return ''.join(text for _, _, text in pieces), stats
+
+    @staticmethod
+    def _opens(token):
+        """True if a start tag leaves an element open until its end tag"""
+        return token.name not in VOID_ELEMENTS and not (token.attrs_src or '').rstrip().endswith('/')
+
+    @staticmethod
+    def _end_removal(content, pieces, removing, end, stats):
+        """Extend a removed start tag's piece over the element's content and end tag"""
+        index, _, transform = removing
+        piece = pieces[index]
+        stats[transform.name]['bytes_delta'] -= len(content[piece[1]:end].encode('utf-8'))
+        piece[1] = end
+
+    @staticmethod
+    def _drop_emptied_lines(content, pieces, emptied):
+        """Remove the lines that only held a removed token, without doubling blank lines"""
+        for index in emptied:
+            start, end, _ = pieces[index]
+            line_start = content.rfind('\n', 0, start) + 1
+            line_end = content.find('\n', end)
+            if content[line_start:start].strip() or content[end:line_end if line_end != -1 else len(content)].strip():
+                continue
+            previous = pieces[index - 1][2] if index > 0 else ''
+            if line_start < start:
+                previous = previous.rstrip(' \t')
+                pieces[index - 1][2] = previous
+            if index + 1 < len(pieces):
+                following = LINE_END_RE.sub('', pieces[index + 1][2], count=1)
+                if BLANK_LINE_END_RE.search(previous):
+                    following = LINE_END_RE.sub('', following, count=1)
+                pieces[index + 1][2] = following
+
+    @staticmethod
+    def _close(context, tag_name):
+        """Pop the innermost open element with this name (and anything left open inside it)"""
+        stack = context.open_elements
+        for i in range(len(stack) - 1, -1, -1):
+            if stack[i] == tag_name:
+                del stack[i:]
+                return
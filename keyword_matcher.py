@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Multi-Keyword Matcher for BC Roofing Keyword Analysis
+Counts any number of keyword phrases in a single pass over the text (Aho-Corasick)
+"""
+
+from collections import deque
+
+
+def is_word_char(ch):
+    """Same notion of a word character as the \\w regex class"""
+    return ch.isalnum() or ch == '_'
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton over lowercased keyword phrases.
+
+    count() gives the same numbers as running re.findall(r'\\b' + re.escape(kw) + r'\\b')
+    for every keyword, but visits each character of the text only once.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = list(keywords)
+        self.patterns = []
+        pattern_index = {}
+        for keyword in self.keywords:
+            pattern = keyword.lower()
+            if pattern and pattern not in pattern_index:
+                pattern_index[pattern] = len(self.patterns)
+                self.patterns.append(pattern)
+        self._pattern_index = pattern_index
+
+        # Trie: goto[state] maps a character to the next state
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+        for index, pattern in enumerate(self.patterns):
+            state = 0
+            for ch in pattern:
+                next_state = self.goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][ch] = next_state
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                state = next_state
+            self.output[state].append(index)
+
+        # Breadth-first pass to fill in failure links and merged outputs
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(ch, 0)
+                self.fail[next_state] = target if target != next_state else 0
+                self.output[next_state] = self.output[next_state] + self.output[self.fail[next_state]]
+
+        # Boundary requirements at each end of every pattern (\b semantics)
+        self._word_start = [is_word_char(p[0]) for p in self.patterns]
+        self._word_end = [is_word_char(p[-1]) for p in self.patterns]
+        self._lengths = [len(p) for p in self.patterns]
+
+    def count_patterns(self, text):
+        """Count non-overlapping, word-bounded matches of every pattern in lowercased text"""
+        counts = [0] * len(self.patterns)
+        last_end = [0] * len(self.patterns)
+        goto, fail, output = self.goto, self.fail, self.output
+        lengths, word_start, word_end = self._lengths, self._word_start, self._word_end
+        text_length = len(text)
+
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if not output[state]:
+                continue
+
+            for index in output[state]:
+                start = i - lengths[index] + 1
+                if start < last_end[index]:
+                    continue
+                before = start > 0 and is_word_char(text[start - 1])
+                if before == word_start[index]:
+                    continue
+                after = i + 1 < text_length and is_word_char(text[i + 1])
+                if after == word_end[index]:
+                    continue
+                counts[index] += 1
+                last_end[index] = i + 1
+
+        return counts
+
+    def count(self, text):
+        """Return {keyword: occurrences} for lowercased text"""
+        counts = self.count_patterns(text)
+        results = {}
+        for keyword in self.keywords:
+            index = self._pattern_index.get(keyword.lower())
+            results[keyword] = counts[index] if index is not None else 0
+        return results
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Site-Wide HTML Minifier for BC Roofing Website
+Minifies every page in one tokenizer pass, preserving whitespace-sensitive elements
+"""
+
+import os
+import re
+import sys
+import gzip
+import argparse
+from pathlib import Path
+
+from html_rewriter import tokenize
+from css_minifier import minify_css
+from page_writer import InPlaceWriter, add_dry_run_arguments, writer_from_args
+
+# Whitespace next to these tags never renders, so it can be dropped entirely
+BLOCK_ELEMENTS = {
+    'html', 'head', 'body', 'title', 'meta', 'link', 'script', 'style', 'base',
+    'div', 'section', 'header', 'footer', 'nav', 'main', 'article', 'aside',
+    'p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'ul', 'ol', 'li', 'dl', 'dt', 'dd',
+    'table', 'thead', 'tbody', 'tfoot', 'tr', 'td', 'th', 'form', 'fieldset',
+    'figure', 'figcaption', 'picture', 'source', 'noscript', 'br', 'hr',
+    'address', 'blockquote', 'details', 'summary', 'iframe', 'template', 'pre'
+}
+
+# Content of these elements is rendered exactly as written
+PRESERVE_WHITESPACE = {'pre', 'textarea'}
+
+TAG_NAME_RE = re.compile(r'</?([a-zA-Z][^\s/>]*)')
+ATTR_PIECE_RE = re.compile(r'"[^"]*"|\'[^\']*\'|\s+|[^\s"\']+')
+WHITESPACE_RE = re.compile(r'\s+')
+TAG_END_SPACE_RE = re.compile(r'\s+(/?>)$')
+
+
+def _minify_tag(tag_text):
+    """Collapse whitespace between attributes, leaving quoted values alone"""
+    pieces = ATTR_PIECE_RE.findall(tag_text)
+    tag = ''.join(' ' if piece.isspace() else piece for piece in pieces)
+    return TAG_END_SPACE_RE.sub(r'\1', tag)
+
+
+def _next_tag_name(html_content, position):
+    """Name of the next tag after position, looking past comments and whitespace
+
+    Returns '' when text comes first and None only at the real end of input.
+    """
+    length = len(html_content)
+    while True:
+        while position < length and html_content[position].isspace():
+            position += 1
+        if position >= length:
+            return None
+        if html_content.startswith('<!--', position):
+            end = html_content.find('-->', position + 4)
+            if end == -1:
+                return None
+            position = end + 3
+            continue
+        match = TAG_NAME_RE.match(html_content, position)
+        return match.group(1).lower() if match else ''
+
+
+def _is_conditional_comment(comment):
+    return comment.startswith('<!--[if') or comment.startswith('<!--<![endif]')
+
+
+def minify_html(html_content):
+    """Minify HTML by removing unnecessary whitespace while preserving functionality
+
+    Runs in one pass over the tokens: comments are dropped (except IE
+    conditional comments), whitespace is collapsed and removed next to block
+    elements, inline <style> is minified, and <pre>/<textarea> and <script>
+    bodies are left untouched.
+    """
+    parts = []
+    open_preserved = []
+    previous_tag = None
+
+    for token in tokenize(html_content):
+        text = html_content[token.start:token.end]
+
+        if token.kind == 'comment':
+            if _is_conditional_comment(text):
+                parts.append(text)
+            continue
+
+        if token.kind == 'rawtext':
+            if token.name == 'style':
+                text = minify_css(text)
+            parts.append(text)
+            continue
+
+        if token.kind == 'text':
+            if open_preserved:
+                parts.append(text)
+                continue
+            if text.isspace():
+                next_tag = _next_tag_name(html_content, token.end)
+                if previous_tag in BLOCK_ELEMENTS or next_tag in BLOCK_ELEMENTS or next_tag is None:
+                    continue
+                # Whitespace on both sides of a dropped comment renders as one space
+                if parts and parts[-1][-1:].isspace():
+                    continue
+            parts.append(WHITESPACE_RE.sub(' ', text))
+            continue
+
+        if token.kind == 'starttag':
+            if token.name in PRESERVE_WHITESPACE and token.close_end is None:
+                open_preserved.append(token.name)
+            text = _minify_tag(text)
+        elif token.kind == 'endtag':
+            if open_preserved and open_preserved[-1] == token.name:
+                open_preserved.pop()
+        previous_tag = token.name
+        parts.append(text)
+
+    return ''.join(parts).strip()
+
+
+def gzip_size(data):
+    """Compressed size the way the server's mod_deflate would roughly send it"""
+    return len(gzip.compress(data, compresslevel=6))
+
+
+def minify_page(source, target=None, writer=None):
+    """Minify one page; returns raw and gzip sizes before and after"""
+    source = Path(source)
+    target = Path(target) if target else source
+    original = source.read_text(encoding='utf-8')
+    minified = minify_html(original)
+
+    if minified != original or target != source:
+        (writer or InPlaceWriter()).write(target, minified, original if target == source else None)
+
+    original_bytes = original.encode('utf-8')
+    minified_bytes = minified.encode('utf-8')
+    return {
+        'file': str(source),
+        'raw_before': len(original_bytes),
+        'raw_after': len(minified_bytes),
+        'gzip_before': gzip_size(original_bytes),
+        'gzip_after': gzip_size(minified_bytes)
+    }
+
+
+def minify_site(root_path="public_html", output_path=None, writer=None):
+    """Minify every page under root_path, in place or into output_path"""
+    root = Path(root_path)
+    results = []
+    for page in sorted(root.glob("**/*.html")):
+        if page.name.endswith('.min.html'):
+            continue
+        target = Path(output_path) / page.relative_to(root) if output_path else None
+        results.append(minify_page(page, target, writer))
+    return results
+
+
+def print_savings(results, root_path):
+    """Per-page raw and gzip savings table"""
+    print(f"{'Page':<60} {'Raw':>16} {'Gzip':>16}")
+    print("-" * 94)
+    totals = {'raw_before': 0, 'raw_after': 0, 'gzip_before': 0, 'gzip_after': 0}
+    for result in results:
+        for key in totals:
+            totals[key] += result[key]
+        page = os.path.relpath(result['file'], root_path)
+        print(f"{page:<60} {result['raw_before'] - result['raw_after']:>10,} bytes "
+              f"{result['gzip_before'] - result['gzip_after']:>10,} bytes")
+    print("-" * 94)
+    raw_pct = (1 - totals['raw_after'] / totals['raw_before']) * 100 if totals['raw_before'] else 0
+    gzip_pct = (1 - totals['gzip_after'] / totals['gzip_before']) * 100 if totals['gzip_before'] else 0
+    print(f"{'TOTAL (' + str(len(results)) + ' pages)':<60} "
+          f"{totals['raw_before'] - totals['raw_after']:>10,} bytes "
+          f"{totals['gzip_before'] - totals['gzip_after']:>10,} bytes")
+    print(f"Raw: {raw_pct:.1f}% smaller | Gzip: {gzip_pct:.1f}% smaller")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Minify every HTML page of the site")
+    parser.add_argument('root_path', nargs='?', default="public_html")
+    parser.add_argument('--output', default=None, help="Write minified pages here instead of in place")
+    add_dry_run_arguments(parser)
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.root_path):
+        print(f"Error: {args.root_path} not found")
+        return 1
+
+    with writer_from_args(args) as writer:
+        results = minify_site(args.root_path, args.output, writer)
+        print_savings(results, args.root_path)
+        writer.summary()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Shared Page Store for BC Roofing Website Analyzers
+Reads and parses each HTML page once per run and hands the same tree to every analyzer
+"""
+
+import os
+from html_parsers import make_soup, resolve_backend
+
+# Directories that never contain site pages
+SKIP_DIRS = {'node_modules', '.git', 'backups'}
+
+
+class PageStore:
+    """Read-once, parse-once cache of the HTML pages under a site root.
+
+    Trees returned by soup() are shared between analyzers and must be
+    treated as read-only; an analyzer that needs to modify a tree has to
+    work on its own copy.
+    """
+
+    def __init__(self, root_path="public_html", parser=None):
+        self.root_path = os.path.abspath(root_path)
+        # Backend name from html_parsers; None uses $BC_HTML_PARSER or html.parser
+        self.parser = resolve_backend(parser)
+        self._text = {}
+        self._soup = {}
+        self.invalid_utf8 = set()
+        self.stats = {'reads': 0, 'parses': 0}
+
+    def _key(self, file_path):
+        return os.path.abspath(file_path)
+
+    def html_files(self):
+        """List every HTML file under the root in a stable order"""
+        html_files = []
+        for root, dirs, files in os.walk(self.root_path):
+            dirs[:] = sorted(d for d in dirs if d not in SKIP_DIRS)
+            for file in sorted(files):
+                if file.endswith('.html'):
+                    html_files.append(os.path.join(root, file))
+        return html_files
+
+    def relpath(self, file_path):
+        """Path of a page relative to the site root"""
+        return os.path.relpath(self._key(file_path), self.root_path)
+
+    def read(self, file_path):
+        """Return the decoded text of a page, reading it from disk only once"""
+        key = self._key(file_path)
+        if key not in self._text:
+            with open(key, 'rb') as f:
+                raw = f.read()
+            self.stats['reads'] += 1
+            try:
+                text = raw.decode('utf-8')
+            except UnicodeDecodeError:
+                # Keep going like the individual scripts did, but remember it
+                self.invalid_utf8.add(key)
+                text = raw.decode('utf-8', errors='ignore')
+            self._text[key] = text
+        return self._text[key]
+
+    def soup(self, file_path):
+        """Return the parsed tree of a page, parsing it only once"""
+        key = self._key(file_path)
+        if key not in self._soup:
+            self._soup[key] = make_soup(self.read(key), self.parser)
+            self.stats['parses'] += 1
+        return self._soup[key]
+
+    def is_valid_utf8(self, file_path):
+        """True if the page decoded cleanly as UTF-8"""
+        self.read(file_path)
+        return self._key(file_path) not in self.invalid_utf8
+
+    def release(self, file_path):
+        """Drop one page from the cache once no analyzer needs it any more"""
+        key = self._key(file_path)
+        self._text.pop(key, None)
+        self._soup.pop(key, None)
+
+    def clear(self):
+        """Drop all cached pages"""
+        self._text.clear()
+        self._soup.clear()
+        self.invalid_utf8.clear()
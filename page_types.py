@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Page Type Classification for BC Roofing Website
+Groups pages into the site's templates (home, service, city, blog, other) by path
+"""
+
+import os
+
+PAGE_TYPES = ('home', 'service', 'city', 'blog', 'other')
+
+# Service pages; the *-roofing.html ones here are not city pages
+SERVICE_PAGES = {
+    'residential-roofing.html', 'commercial-roofing.html', 'metal-roofing.html',
+    'gutter-services.html', 'storm-repair.html'
+}
+
+
+def classify_page(rel_path):
+    """Template a page (path relative to the site root) is built from"""
+    rel_path = rel_path.replace(os.sep, '/')
+    name = os.path.basename(rel_path)
+
+    if rel_path == 'index.html':
+        return 'home'
+    if rel_path.startswith('blog/'):
+        return 'blog'
+    if '/' not in rel_path:
+        if name in SERVICE_PAGES:
+            return 'service'
+        if name.endswith('-roofing.html'):
+            return 'city'
+        return 'other'
+    if rel_path.startswith('service-areas/') and name != 'index.html':
+        return 'city'
+    return 'other'
+
+
+def group_pages(store):
+    """{page type: [file paths]} for every page in a PageStore"""
+    groups = {page_type: [] for page_type in PAGE_TYPES}
+    for file_path in store.html_files():
+        groups[classify_page(store.relpath(file_path))].append(file_path)
+    return groups
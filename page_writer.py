@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Page Writers for BC Roofing Website Transformers
+Writes rewritten files in place, or in dry-run mode streams them as a unified diff without touching the site
+"""
+
+import os
+import sys
+import difflib
+import tempfile
+import contextlib
+from pathlib import Path
+
+
+def write_atomic(path, content):
+    """Write text or bytes via a temp file and rename, so readers never see a partial file"""
+    path = Path(path)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        if isinstance(content, bytes):
+            with os.fdopen(fd, 'wb') as f:
+                f.write(content)
+        else:
+            with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+                f.write(content)
+        if path.exists():
+            os.chmod(tmp_name, path.stat().st_mode & 0o777)
+        os.replace(tmp_name, path)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+
+
+class InPlaceWriter:
+    """Writes every rewritten or generated file atomically (the default for all transformers)"""
+
+    dry_run = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def write(self, path, content, original=None):
+        """Write text or bytes, creating missing directories"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        write_atomic(path, content)
+
+    def summary(self):
+        pass
+
+
+class DryRunWriter:
+    """Streams one unified diff per changed file and never writes to disk.
+
+    Diff paths are relative to root (default: the git repository holding the
+    file, else the working directory) with a/ and b/ prefixes, so a saved
+    patch applies from there with 'git apply' or 'patch -p1'.
+
+    Binary files (bytes content) cannot be expressed in the patch; they only
+    appear in the summary.
+
+    Use it as a context manager: while the diff goes to stdout, everything
+    else printed inside the with block goes to stderr.
+    """
+
+    dry_run = True
+
+    def __init__(self, patch_path=None, stream=None, root=None):
+        self.patch_path = patch_path
+        self.stream = open(patch_path, 'w', encoding='utf-8') if patch_path else stream or sys.stdout
+        self.root = root
+        self.changes = []
+        self.binary_changes = 0
+        self._exit_stack = contextlib.ExitStack()
+
+    def __enter__(self):
+        if self.stream is sys.stdout:
+            self._exit_stack.enter_context(contextlib.redirect_stdout(sys.stderr))
+        return self
+
+    def __exit__(self, *exc_info):
+        self._exit_stack.close()
+        if self.patch_path:
+            self.stream.close()
+        return False
+
+    def diff_path(self, path):
+        """Path used in the diff headers, with forward slashes"""
+        root = self.root or repository_root(path) or os.getcwd()
+        return os.path.relpath(os.path.abspath(path), root).replace(os.sep, '/')
+
+    def write(self, path, content, original=None):
+        path = str(path)
+        binary = isinstance(content, bytes)
+        if original is None:
+            original = b'' if binary else ''
+            if os.path.exists(path) and binary:
+                with open(path, 'rb') as f:
+                    original = f.read()
+            elif os.path.exists(path):
+                with open(path, 'r', encoding='utf-8', newline='') as f:
+                    original = f.read()
+        if content == original:
+            return
+
+        rel_path = self.diff_path(path)
+        if binary:
+            self.binary_changes += 1
+            self.changes.append((rel_path, len(original), len(content)))
+            return
+
+        is_new = not os.path.exists(path)
+        diff = difflib.unified_diff(
+            original.splitlines(keepends=True),
+            content.splitlines(keepends=True),
+            fromfile='/dev/null' if is_new else f'a/{rel_path}',
+            tofile=f'b/{rel_path}'
+        )
+        for line in diff:
+            self.stream.write(line)
+            if not line.endswith('\n'):
+                self.stream.write('\n\\ No newline at end of file\n')
+        self.stream.flush()
+        self.changes.append((rel_path, len(original.encode('utf-8')), len(content.encode('utf-8'))))
+
+    def summary(self):
+        """Byte delta per changed file; goes to stderr when the diff itself is on stdout"""
+        out = sys.stdout if self.patch_path else sys.stderr
+        if self.patch_path:
+            print(f"\n📝 Patch written to {self.patch_path}", file=out)
+        print(f"\n🔍 DRY RUN - nothing was written ({len(self.changes)} files would change)", file=out)
+        if not self.changes:
+            return
+        print(f"{'File':<60} {'Before':>10} {'After':>10} {'Delta':>9}", file=out)
+        print("-" * 92, file=out)
+        total_before = total_after = 0
+        for rel_path, before, after in self.changes:
+            total_before += before
+            total_after += after
+            print(f"{rel_path:<60} {before:>10,} {after:>10,} {after - before:>+9,}", file=out)
+        print("-" * 92, file=out)
+        print(f"{'TOTAL':<60} {total_before:>10,} {total_after:>10,} {total_after - total_before:>+9,}", file=out)
+        if self.binary_changes:
+            print(f"ℹ️  {self.binary_changes} binary files are listed above but left out of the patch", file=out)
+
+
+def write_if_changed(writer, path, content):
+    """Write a generated text file only when its content differs from what is on disk"""
+    existing = None
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            existing = f.read()
+    if content != existing:
+        writer.write(path, content, existing)
+
+
+def repository_root(path):
+    """Closest directory above path holding a .git entry, or None"""
+    directory = os.path.dirname(os.path.abspath(path))
+    while True:
+        if os.path.exists(os.path.join(directory, '.git')):
+            return directory
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+
+def add_dry_run_arguments(parser):
+    """The shared --dry-run/--patch options"""
+    parser.add_argument('--dry-run', action='store_true',
+                        help="Print a unified diff of every change to stdout (reports go to stderr) instead of writing files")
+    parser.add_argument('--patch', metavar='FILE',
+                        help="Write the diff to this .patch file instead of changing files (implies --dry-run)")
+
+
+def writer_from_args(args, root=None):
+    """Writer selected by the add_dry_run_arguments options; use it in a with block and call summary() when done
+
+    When the diff goes to stdout, the rest of the script's output inside the
+    with block is sent to stderr, so '--dry-run > changes.patch' holds nothing but the patch.
+    """
+    if args.patch:
+        return DryRunWriter(args.patch, root=root)
+    if args.dry_run:
+        return DryRunWriter(stream=sys.stdout, root=root)
+    return InPlaceWriter()
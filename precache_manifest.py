@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Service Worker Precache Manifest Generator for BC Roofing Website
+Writes the real URLs of the entry pages' critical assets, with content revisions, into the manifest block of sw.js
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+import posixpath
+from urllib.parse import quote
+
+from asset_graph import AssetGraph
+from fingerprint_assets import content_hash, FINGERPRINTED_RE
+from page_writer import add_dry_run_arguments, writer_from_args
+
+SW_PATH = "sw.js"
+
+DEFAULT_PAGES = ('index.html',)
+
+# Site files precached even though no page references them
+EXTRA_FILES = ('manifest.json',)
+
+# Asset kinds a page needs to render offline; images only when the page preloads them
+PRECACHE_KINDS = {'css', 'js', 'font'}
+
+MANIFEST_BLOCK_RE = re.compile(
+    r'(// precache-manifest:start[^\n]*\n).*?(\n[ \t]*// precache-manifest:end)', re.DOTALL
+)
+
+
+def page_url(rel_path):
+    """'index.html' -> '/', 'blog/index.html' -> '/blog/', 'contact.html' -> '/contact.html'"""
+    if posixpath.basename(rel_path) == 'index.html':
+        return site_url(posixpath.dirname(rel_path) + ('/' if posixpath.dirname(rel_path) else ''))
+    return site_url(rel_path)
+
+
+def site_url(rel_path):
+    """Root-relative, percent-encoded URL the browser requests for a site file"""
+    return quote('/' + rel_path)
+
+
+def precache_files(graph, pages):
+    """Site-relative files to precache for the entry pages, in first-seen order"""
+    files = {}
+    for rel_path in pages:
+        files[rel_path] = page_url(rel_path)
+        for dependency in graph.pages[rel_path]:
+            if dependency.external:
+                continue
+            if dependency.kind in PRECACHE_KINDS or dependency.preload or dependency.blocking:
+                files.setdefault(dependency.target, site_url(dependency.target))
+    for rel_path in EXTRA_FILES:
+        if os.path.isfile(os.path.join(graph.root_path, rel_path)):
+            files.setdefault(rel_path, site_url(rel_path))
+    return files
+
+
+def build_manifest(graph, pages):
+    """[{url, revision}] entries; fingerprinted files carry their version in the URL and get no revision"""
+    entries = []
+    for rel_path, url in precache_files(graph, pages).items():
+        revision = None
+        if not FINGERPRINTED_RE.match(rel_path):
+            with open(os.path.join(graph.root_path, rel_path), 'rb') as f:
+                revision = content_hash(f.read())
+        entries.append({'url': url, 'revision': revision})
+    return entries
+
+
+def render_manifest(entries):
+    lines = ['const PRECACHE_MANIFEST = [']
+    for index, entry in enumerate(entries):
+        comma = ',' if index < len(entries) - 1 else ''
+        lines.append(f"    {{ url: {json.dumps(entry['url'])}, revision: {json.dumps(entry['revision'])} }}{comma}")
+    lines.append('];')
+    return '\n'.join(lines)
+
+
+def update_service_worker(sw_source, entries):
+    """sw.js with its manifest block replaced; None when the markers are missing"""
+    if not MANIFEST_BLOCK_RE.search(sw_source):
+        return None
+    return MANIFEST_BLOCK_RE.sub(lambda match: match.group(1) + render_manifest(entries) + match.group(2),
+                                 sw_source, count=1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate the service worker precache manifest from the asset graph")
+    parser.add_argument('pages', nargs='*', help=f"Entry pages relative to the site root (default: {', '.join(DEFAULT_PAGES)})")
+    parser.add_argument('--root', default="public_html")
+    parser.add_argument('--check', action='store_true', help="Exit non-zero when sw.js is out of date instead of writing it")
+    add_dry_run_arguments(parser)
+    args = parser.parse_args(argv)
+
+    sw_path = os.path.join(args.root, SW_PATH)
+    if not os.path.exists(sw_path):
+        print(f"Error: {sw_path} not found")
+        return 1
+
+    graph = AssetGraph(args.root).build()
+    pages = args.pages or [page for page in DEFAULT_PAGES if page in graph.pages]
+    unknown = [page for page in pages if page not in graph.pages]
+    if unknown:
+        print(f"Error: not a page under {args.root}: {', '.join(unknown)}")
+        return 1
+
+    entries = build_manifest(graph, pages)
+    with open(sw_path, 'r', encoding='utf-8', newline='') as f:
+        original = f.read()
+    updated = update_service_worker(original, entries)
+    if updated is None:
+        print(f"Error: no '// precache-manifest:start' ... '// precache-manifest:end' block in {sw_path}")
+        return 1
+
+    if args.check:
+        if updated != original:
+            print(f"❌ {sw_path} precache manifest is out of date; run precache_manifest.py")
+            return 1
+        print(f"✅ {sw_path} precache manifest is up to date ({len(entries)} entries)")
+        return 0
+
+    with writer_from_args(args) as writer:
+        if updated != original:
+            writer.write(sw_path, updated, original)
+        if writer.dry_run:
+            writer.summary()
+            return 0
+
+        print(f"📦 Precache manifest: {len(entries)} entries for {', '.join(pages)}")
+        for entry in entries:
+            print(f"   {entry['url']:<55} {entry['revision'] or '(fingerprinted)'}")
+        print(f"{'✅ Updated' if updated != original else '✅ Already up to date:'} {sw_path}")
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Precompressed Sidecar Builder for BC Roofing Website
+Writes maximum-level .gz and .br copies of every compressible file so Apache never compresses per request
+"""
+
+import os
+import sys
+import json
+import gzip
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import brotli
+except ImportError:
+    # Optional: without it only .gz sidecars are written
+    brotli = None
+
+from page_store import SKIP_DIRS
+from page_writer import write_atomic
+
+COMPRESSIBLE_EXTENSIONS = {'.html', '.css', '.js', '.svg', '.xml', '.json', '.txt', '.ico', '.webmanifest', '.map'}
+SIDECAR_EXTENSIONS = ('.gz', '.br')
+
+# Below this the compressed copy rarely beats the headers it costs
+MIN_SIZE = 256
+
+DEFAULT_MANIFEST = ".precompress_manifest.json"
+
+# What mod_deflate uses on the fly (DeflateCompressionLevel defaults to zlib's 6)
+ON_THE_FLY_LEVEL = 6
+
+
+def find_compressible(root_path):
+    """Site-relative paths of every file worth a sidecar"""
+    files = []
+    for dirpath, dirnames, filenames in os.walk(root_path):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+        for filename in sorted(filenames):
+            path = os.path.join(dirpath, filename)
+            if os.path.splitext(filename)[1].lower() in COMPRESSIBLE_EXTENSIONS \
+                    and os.path.getsize(path) >= MIN_SIZE:
+                files.append(os.path.relpath(path, root_path))
+    return files
+
+
+def _write_sidecar(path, data):
+    """Write a sidecar atomically, or remove a stale one when compression does not pay off"""
+    if data is None:
+        if os.path.exists(path):
+            os.unlink(path)
+        return 0
+    write_atomic(path, data)
+    return len(data)
+
+
+def compress_file(job):
+    """Worker: write the sidecars of one file and return its sizes"""
+    root_path, rel_path = job
+    path = os.path.join(root_path, rel_path)
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    # mtime=0 keeps .gz output identical across runs for unchanged input
+    gz = gzip.compress(data, compresslevel=9, mtime=0)
+    br = brotli.compress(data, quality=11) if brotli else None
+
+    return {
+        'file': rel_path,
+        'hash': hashlib.sha256(data).hexdigest(),
+        'raw': len(data),
+        'deflate': len(gzip.compress(data, compresslevel=ON_THE_FLY_LEVEL, mtime=0)),
+        'gz': _write_sidecar(path + '.gz', gz if len(gz) < len(data) else None),
+        'br': _write_sidecar(path + '.br', br if br is not None and len(br) < len(data) else None)
+    }
+
+
+def _file_hash(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _is_current(entry, path):
+    """True if a manifest entry still describes the file and its sidecars"""
+    if not entry or entry['hash'] != _file_hash(path):
+        return False
+    # Brotli sidecars are owed once the module is installed
+    if brotli and entry.get('br') is None:
+        return False
+    return all(os.path.exists(path + ext) for ext in SIDECAR_EXTENSIONS if entry.get(ext[1:]))
+
+
+def load_manifest(manifest_path):
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def precompress_site(root_path="public_html", jobs=None, manifest_path=DEFAULT_MANIFEST):
+    """Write sidecars for every changed compressible file; returns (results, skipped count)"""
+    manifest = load_manifest(manifest_path)
+    files = find_compressible(root_path)
+    pending = []
+    results = []
+
+    for rel_path in files:
+        entry = manifest.get(rel_path)
+        if _is_current(entry, os.path.join(root_path, rel_path)):
+            results.append(dict(entry, file=rel_path, skipped=True))
+        else:
+            pending.append((root_path, rel_path))
+
+    if jobs == 1 or len(pending) <= 1:
+        computed = [compress_file(job) for job in pending]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            computed = list(executor.map(compress_file, pending, chunksize=max(1, len(pending) // 64)))
+    results.extend(dict(result, skipped=False) for result in computed)
+
+    # Sidecars of files that no longer exist
+    current = set(files)
+    for rel_path in manifest:
+        if rel_path not in current:
+            for ext in SIDECAR_EXTENSIONS:
+                sidecar = os.path.join(root_path, rel_path + ext)
+                if os.path.exists(sidecar):
+                    os.unlink(sidecar)
+
+    results.sort(key=lambda result: result['file'])
+    new_manifest = {
+        result['file']: {key: result[key] for key in ('hash', 'raw', 'deflate', 'gz', 'br')}
+        for result in results
+    }
+    if not brotli:
+        for entry in new_manifest.values():
+            entry['br'] = None
+    write_atomic(manifest_path, json.dumps(new_manifest, indent=2) + '\n')
+    return results, sum(1 for result in results if result['skipped'])
+
+
+def print_size_table(results, skipped):
+    """Raw, on-the-fly deflate and precompressed sizes per file"""
+    print(f"{'File':<58} {'Raw':>9} {'Deflate-6':>10} {'Gzip-9':>9} {'Brotli':>9}")
+    print("-" * 99)
+    totals = {'raw': 0, 'deflate': 0, 'gz': 0, 'br': 0}
+    for result in results:
+        gz = result['gz'] or result['raw']
+        br = result['br'] or gz
+        totals['raw'] += result['raw']
+        totals['deflate'] += result['deflate']
+        totals['gz'] += gz
+        totals['br'] += br
+        marker = ' ' if result['skipped'] else '*'
+        br_text = f"{result['br']:,}" if result['br'] else '-'
+        print(f"{marker}{result['file']:<57} {result['raw']:>9,} {result['deflate']:>10,} {gz:>9,} {br_text:>9}")
+    print("-" * 99)
+    print(f" {'TOTAL (' + str(len(results)) + ' files)':<57} {totals['raw']:>9,} {totals['deflate']:>10,} "
+          f"{totals['gz']:>9,} {totals['br']:>9,}")
+
+    best = totals['br'] if brotli else totals['gz']
+    if totals['deflate']:
+        print(f"\n📉 Precompressed transfer is {(1 - best / totals['deflate']) * 100:.1f}% smaller than on-the-fly deflate")
+    print(f"* = recompressed this run; {skipped} unchanged file(s) skipped")
+    if not brotli:
+        print("ℹ️  Install the 'brotli' package to also write .br sidecars")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write .gz/.br sidecars for every compressible site file")
+    parser.add_argument('root_path', nargs='?', default="public_html")
+    parser.add_argument('--jobs', '-j', type=int, default=None,
+                        help="Number of worker processes (default: one per CPU)")
+    parser.add_argument('--manifest', default=DEFAULT_MANIFEST)
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.root_path):
+        print(f"Error: {args.root_path} not found")
+        return 1
+
+    results, skipped = precompress_site(args.root_path, args.jobs, args.manifest)
+    print_size_table(results, skipped)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
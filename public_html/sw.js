@@ -10,16 +10,34 @@ const STATIC_CACHE = `${CACHE_NAME}-static-${CACHE_VERSION}`;
 const DYNAMIC_CACHE = `${CACHE_NAME}-dynamic-${CACHE_VERSION}`;
 const THIRD_PARTY_CACHE = `${CACHE_NAME}-third-party-${CACHE_VERSION}`;
 
+// Precache survives version bumps; entries are keyed by revision so only changed ones are refetched
+const PRECACHE = `${CACHE_NAME}-precache`;
+
 // Resources to cache immediately on install
-const CRITICAL_RESOURCES = [
-    '/',
-    '/css/styles.css',
-    '/css/bootstrap.min.css',
-    '/js/main.js',
-    '/assets/images/logo.png',
-    '/assets/fonts/font.woff2',
-    '/manifest.json'
+// precache-manifest:start (generated by precache_manifest.py - do not edit by hand)
+const PRECACHE_MANIFEST = [
+    { url: "/", revision: "ecc4d3e2" },
+    { url: "/css/styles.css", revision: "af1b7d9e" },
+    { url: "/js/main.js", revision: "b8eac520" },
+    { url: "/images/logos/logo-black.svg", revision: "f15123ee" },
+    { url: "/assets/images/logos/Certified_Plus.png", revision: "ab69079f" },
+    { url: "/assets/images/logos/Mulehide%20Logo.png", revision: "5caf4dd2" },
+    { url: "/css/styles.min.css", revision: "1c0da194" },
+    { url: "/css/combined.min.css", revision: "e0133a53" },
+    { url: "/css/responsive.min.css", revision: "3eb3259f" },
+    { url: "/css/business-info-improvements.min.css", revision: "d7669368" },
+    { url: "/css/clickable-rating.min.css", revision: "3acda4cc" },
+    { url: "/js/main.min.js", revision: "8d303617" },
+    { url: "/js/performance-optimized-loader.min.js", revision: "7a141a0b" },
+    { url: "/manifest.json", revision: "1345a34b" }
 ];
+// precache-manifest:end
+
+// Cache key of each precached URL: the URL itself when fingerprinted, else tagged with its revision
+const PRECACHE_KEYS = new Map(PRECACHE_MANIFEST.map(entry => [
+    new URL(entry.url, self.location).href,
+    entry.revision ? `${entry.url}?__precache=${entry.revision}` : entry.url
+]));
 
 // Static resources for cache-first strategy
 const STATIC_RESOURCES = [
@@ -55,13 +73,9 @@ self.addEventListener('install', event => {
     console.log('[SW] Installing Service Worker...');
 
     event.waitUntil(
-        caches.open(STATIC_CACHE)
-            .then(cache => {
-                console.log('[SW] Caching critical resources...');
-                return cache.addAll(CRITICAL_RESOURCES);
-            })
-            .then(() => {
-                console.log('[SW] Critical resources cached successfully');
+        precacheChangedResources()
+            .then(fetched => {
+                console.log(`[SW] Precached ${fetched} new or changed resources`);
                 return self.skipWaiting();
             })
             .catch(error => {
@@ -70,6 +84,51 @@ self.addEventListener('install', event => {
     );
 });
 
+/**
+ * Fetch only manifest entries whose revision is not cached yet
+ */
+async function precacheChangedResources() {
+    const cache = await caches.open(PRECACHE);
+    let fetched = 0;
+
+    for (const [url, cacheKey] of PRECACHE_KEYS) {
+        if (await cache.match(cacheKey)) continue;
+
+        // Bypass the HTTP cache so a changed revision is never filled from a stale copy
+        const response = await fetch(url, { cache: 'reload' });
+        if (!response.ok) {
+            throw new Error(`${url} returned ${response.status}`);
+        }
+        await cache.put(cacheKey, response);
+        fetched++;
+    }
+
+    return fetched;
+}
+
+/**
+ * Drop precached revisions the current manifest no longer lists
+ */
+async function deleteStalePrecache() {
+    const cache = await caches.open(PRECACHE);
+    const current = new Set(Array.from(PRECACHE_KEYS.values(), key => new URL(key, self.location).href));
+    const requests = await cache.keys();
+
+    return Promise.all(
+        requests
+            .filter(request => !current.has(request.url))
+            .map(request => cache.delete(request))
+    );
+}
+
+async function matchPrecache(request) {
+    const cacheKey = PRECACHE_KEYS.get(request.url);
+    if (!cacheKey) return undefined;
+
+    const cache = await caches.open(PRECACHE);
+    return cache.match(cacheKey);
+}
+
 /**
  * Service Worker Activation
  */
@@ -83,6 +142,7 @@ self.addEventListener('activate', event => {
                     cacheNames.map(cacheName => {
                         // Delete old caches
                         if (cacheName.startsWith(CACHE_NAME) &&
+                            cacheName !== PRECACHE &&
                             cacheName !== STATIC_CACHE &&
                             cacheName !== DYNAMIC_CACHE &&
                             cacheName !== THIRD_PARTY_CACHE) {
@@ -92,6 +152,7 @@ self.addEventListener('activate', event => {
                     })
                 );
             })
+            .then(() => deleteStalePrecache())
             .then(() => {
                 console.log('[SW] Service Worker activated');
                 return self.clients.claim();
@@ -113,7 +174,9 @@ self.addEventListener('fetch', event => {
     if (url.protocol === 'chrome-extension:' || url.protocol === 'moz-extension:') return;
 
     // Route to appropriate caching strategy
-    if (isStaticResource(request)) {
+    if (PRECACHE_KEYS.has(request.url) && request.mode !== 'navigate') {
+        event.respondWith(precacheFirstStrategy(request));
+    } else if (isStaticResource(request)) {
         event.respondWith(cacheFirstStrategy(request));
     } else if (isNetworkFirstResource(request)) {
         event.respondWith(networkFirstStrategy(request));
@@ -158,6 +221,19 @@ async function cacheFirstStrategy(request) {
     }
 }
 
+/**
+ * Precache-First Strategy (for manifest entries)
+ * The installed revision is current until the next service worker says otherwise
+ */
+async function precacheFirstStrategy(request) {
+    const cachedResponse = await matchPrecache(request);
+    if (cachedResponse) {
+        return cachedResponse;
+    }
+
+    return cacheFirstStrategy(request);
+}
+
 /**
  * Network-First Strategy (for dynamic content)
  * Fresh content with cache fallback
@@ -175,7 +251,7 @@ async function networkFirstStrategy(request) {
     } catch (error) {
         console.log('[SW] Network failed, trying cache...');
 
-        const cachedResponse = await caches.match(request);
+        const cachedResponse = await caches.match(request) || await matchPrecache(request);
         if (cachedResponse) {
             return cachedResponse;
         }
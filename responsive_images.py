@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""
+Responsive Image Pipeline for BC Roofing Website
+Builds AVIF/WebP variants at several widths and rewrites <img> tags into <picture> with srcset and intrinsic sizes
+"""
+
+import os
+import re
+import sys
+import json
+import struct
+import hashlib
+import argparse
+import posixpath
+import contextlib
+from io import BytesIO
+from pathlib import Path
+from urllib.parse import quote
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:
+    # Optional: without Pillow only width/height are added to <img> tags
+    Image = None
+
+from page_store import PageStore
+from html_rewriter import tokenize, parse_attrs, set_attribute, Edit, apply_edits
+from fingerprint_assets import resolve_reference
+from page_writer import InPlaceWriter, add_dry_run_arguments, writer_from_args, write_if_changed
+
+# Variant widths; sources narrower than a width are never upscaled
+WIDTHS = (320, 640, 960, 1280, 1920)
+
+# Preferred first: browsers pick the first <source> type they support
+FORMATS = (('avif', 'image/avif', 50), ('webp', 'image/webp', 80))
+
+RASTER_EXTENSIONS = {'.png', '.jpg', '.jpeg'}
+VARIANTS_DIR = 'images/responsive'
+DEFAULT_MANIFEST = ".responsive_images.json"
+
+SVG_LENGTH_RE = re.compile(r'<svg\b[^>]*?\s(width|height)\s*=\s*["\']\s*([\d.]+)(?:px)?\s*["\']', re.IGNORECASE)
+SVG_VIEWBOX_RE = re.compile(r'<svg\b[^>]*?\sviewBox\s*=\s*["\']\s*[-\d.]+[\s,]+[-\d.]+[\s,]+([\d.]+)[\s,]+([\d.]+)', re.IGNORECASE)
+
+
+# EXIF orientations that turn the stored image by 90 degrees, swapping width and height
+ROTATED_ORIENTATIONS = {5, 6, 7, 8}
+
+
+def _exif_orientation(segment):
+    """Orientation tag of a JPEG APP1 Exif segment (payload after the length), 1 if absent"""
+    if segment[:6] != b'Exif\x00\x00':
+        return 1
+    tiff = segment[6:]
+    order = {b'II': '<', b'MM': '>'}.get(tiff[:2])
+    if order is None or len(tiff) < 8:
+        return 1
+    offset = struct.unpack(order + 'I', tiff[4:8])[0]
+    if offset + 2 > len(tiff):
+        return 1
+    count = struct.unpack(order + 'H', tiff[offset:offset + 2])[0]
+    for index in range(count):
+        entry = offset + 2 + index * 12
+        if entry + 12 > len(tiff):
+            break
+        if struct.unpack(order + 'H', tiff[entry:entry + 2])[0] == 0x0112:
+            return struct.unpack(order + 'H', tiff[entry + 8:entry + 10])[0]
+    return 1
+
+
+def image_size(path):
+    """Displayed (width, height) read from the file header, or None; needs no imaging library
+
+    JPEGs honour their EXIF orientation, as browsers and the variants do.
+    """
+    with open(path, 'rb') as f:
+        head = f.read(64 * 1024)
+
+    if head[:8] == b'\x89PNG\r\n\x1a\n' and head[12:16] == b'IHDR':
+        return struct.unpack('>II', head[16:24])
+    if head[:6] in (b'GIF87a', b'GIF89a'):
+        return struct.unpack('<HH', head[6:10])
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        chunk = head[12:16]
+        if chunk == b'VP8 ':
+            width, height = struct.unpack('<HH', head[26:30])
+            return width & 0x3fff, height & 0x3fff
+        if chunk == b'VP8L':
+            bits = struct.unpack('<I', head[21:25])[0]
+            return (bits & 0x3fff) + 1, ((bits >> 14) & 0x3fff) + 1
+        if chunk == b'VP8X':
+            return (int.from_bytes(head[24:27], 'little') + 1, int.from_bytes(head[27:30], 'little') + 1)
+    if head[:2] == b'\xff\xd8':
+        position = 2
+        orientation = 1
+        while position + 9 < len(head):
+            if head[position] != 0xff:
+                position += 1
+                continue
+            marker = head[position + 1]
+            # Start-of-frame markers carry the dimensions
+            length = struct.unpack('>H', head[position + 2:position + 4])[0]
+            if marker == 0xe1:
+                orientation = _exif_orientation(head[position + 4:position + 2 + length])
+            if marker in (0xc0, 0xc1, 0xc2, 0xc3, 0xc5, 0xc6, 0xc7, 0xc9, 0xca, 0xcb, 0xcd, 0xce, 0xcf):
+                height, width = struct.unpack('>HH', head[position + 5:position + 9])
+                return (height, width) if orientation in ROTATED_ORIENTATIONS else (width, height)
+            position += 2 + length
+        return None
+    if path.lower().endswith('.svg'):
+        text = head.decode('utf-8', errors='replace')
+        lengths = {name.lower(): float(value) for name, value in SVG_LENGTH_RE.findall(text)}
+        if 'width' in lengths and 'height' in lengths:
+            return round(lengths['width']), round(lengths['height'])
+        viewbox = SVG_VIEWBOX_RE.search(text)
+        if viewbox:
+            return round(float(viewbox.group(1))), round(float(viewbox.group(2)))
+    return None
+
+
+def supported_formats():
+    """Output formats the installed Pillow can encode"""
+    if Image is None:
+        return []
+    formats = []
+    for extension, mime, quality in FORMATS:
+        if extension == 'avif' and not features.check('avif'):
+            try:
+                import pillow_avif  # noqa: F401  (plugin for Pillow < 11.3)
+            except ImportError:
+                continue
+        formats.append((extension, mime, quality))
+    return formats
+
+
+def variant_path(rel_path, digest, width, extension):
+    """Cache location of one variant; the source hash in the name makes it immutable"""
+    stem = posixpath.splitext(posixpath.basename(rel_path))[0].replace(' ', '-')
+    return f"{VARIANTS_DIR}/{stem}-{digest}-{width}w.{extension}"
+
+
+def build_variants(job):
+    """Worker: encode the missing variants of one source image
+
+    size is the displayed size, so the source is turned upright by its EXIF
+    orientation before resizing. A variant no smaller than the source file is
+    left out and recorded as rejected; (width, format) pairs an earlier run
+    rejected for the same source hash are skipped without encoding them again.
+    Formats with no variant left are omitted.
+
+    Returns (rel_path, variants, encoded, oversized, rejected): variants maps a
+    format to [width, path, bytes] entries, encoded holds the bytes of
+    variants not on disk yet for the caller to write, oversized lists variants
+    an earlier run wrote that are no smaller than the source, and rejected
+    holds the [width, format] pairs left out.
+    """
+    root_path, rel_path, digest, size, formats, known_rejected = job
+    source_path = os.path.join(root_path, rel_path)
+    source_bytes = os.path.getsize(source_path)
+    widths = sorted({min(width, size[0]) for width in WIDTHS})
+    variants = {}
+    encoded = {}
+    oversized = []
+    rejected = []
+    image = None
+    for extension, _, quality in formats:
+        kept = []
+        for width in widths:
+            if (width, extension) in known_rejected:
+                rejected.append([width, extension])
+                continue
+            target = variant_path(rel_path, digest, width, extension)
+            target_path = os.path.join(root_path, target)
+            if os.path.exists(target_path):
+                variant_bytes = os.path.getsize(target_path)
+                if variant_bytes >= source_bytes:
+                    oversized.append(target)
+                    rejected.append([width, extension])
+                    continue
+            else:
+                if image is None:
+                    image = ImageOps.exif_transpose(Image.open(source_path))
+                height = round(size[1] * width / size[0])
+                resized = image if width == size[0] else image.resize((width, height), Image.LANCZOS)
+                buffer = BytesIO()
+                resized.save(buffer, format=extension.upper(), quality=quality)
+                variant_bytes = buffer.tell()
+                if variant_bytes >= source_bytes:
+                    rejected.append([width, extension])
+                    continue
+                encoded[target] = buffer.getvalue()
+            kept.append([width, target, variant_bytes])
+        if kept:
+            variants[extension] = kept
+    return rel_path, variants, encoded, oversized, rejected
+
+
+def load_manifest(manifest_path=DEFAULT_MANIFEST):
+    """The manifest of the previous run, or {}"""
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _file_hash(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:12]
+
+
+def find_images(store):
+    """Site-relative paths of every raster image some page references"""
+    images = set()
+    for file_path in store.html_files():
+        base_dir = posixpath.dirname(store.relpath(file_path).replace(os.sep, '/'))
+        for token in tokenize(store.read(file_path) or ''):
+            if token.kind == 'starttag' and token.name == 'img':
+                target = resolve_reference(parse_attrs(token.attrs_src).get('src', ''), base_dir)
+                if target and posixpath.splitext(target)[1].lower() in RASTER_EXTENSIONS \
+                        and os.path.isfile(os.path.join(store.root_path, target)):
+                    images.add(target)
+    return sorted(images)
+
+
+def build_images(root_path="public_html", jobs=None, manifest_path=DEFAULT_MANIFEST, writer=None):
+    """Generate variants for every referenced raster image; returns the manifest"""
+    store = PageStore(root_path)
+    writer = writer or InPlaceWriter()
+    formats = supported_formats()
+    previous = load_manifest(manifest_path)
+
+    manifest = {}
+    pending = []
+    for rel_path in find_images(store):
+        path = os.path.join(root_path, rel_path)
+        size = image_size(path)
+        if size is None:
+            continue
+        digest = _file_hash(path)
+        manifest[rel_path] = {'hash': digest, 'width': size[0], 'height': size[1], 'variants': {}, 'rejected': []}
+        known_rejected = set()
+        if previous.get(rel_path, {}).get('hash') == digest:
+            known_rejected = {(width, extension) for width, extension in previous[rel_path].get('rejected', [])}
+        if formats:
+            pending.append((root_path, rel_path, digest, size, formats, known_rejected))
+
+    # Results are written as they arrive, so only one image's variants are held in memory
+    parallel = jobs != 1 and len(pending) > 1
+    with ProcessPoolExecutor(max_workers=jobs) if parallel else contextlib.nullcontext() as executor:
+        built = executor.map(build_variants, pending) if parallel else map(build_variants, pending)
+        for rel_path, variants, encoded, oversized, rejected in built:
+            manifest[rel_path]['variants'] = variants
+            manifest[rel_path]['rejected'] = rejected
+            for target, data in encoded.items():
+                writer.write(os.path.join(root_path, target), data)
+            if not writer.dry_run:
+                for target in oversized:
+                    os.remove(os.path.join(root_path, target))
+
+    write_if_changed(writer, manifest_path, json.dumps(manifest, indent=2) + '\n')
+    return manifest
+
+
+def _sizes_attribute(attrs, intrinsic_width):
+    if attrs.get('sizes'):
+        return attrs['sizes']
+    display = attrs.get('width', '').strip()
+    if display.isdigit():
+        return f"(max-width: {display}px) 100vw, {display}px"
+    return f"(max-width: {intrinsic_width}px) 100vw, {intrinsic_width}px"
+
+
+def _with_dimensions(tag_text, attrs, width, height):
+    """Add missing width/height, keeping the aspect ratio of any size already given
+
+    A non-numeric value (width="auto") is replaced rather than duplicated.
+    """
+    has_width = attrs.get('width', '').strip().isdigit()
+    has_height = attrs.get('height', '').strip().isdigit()
+    if has_width and has_height:
+        return tag_text
+    if has_width:
+        return set_attribute(tag_text, 'height', round(int(attrs['width']) * height / width))
+    if has_height:
+        return set_attribute(tag_text, 'width', round(int(attrs['height']) * width / height))
+    return set_attribute(set_attribute(tag_text, 'width', width), 'height', height)
+
+
+def rewrite_images(content, base_dir, root_path, manifest):
+    """Wrap <img> tags with variants in <picture> and give every image intrinsic dimensions
+
+    Returns (new content, images wrapped, images sized).
+    """
+    edits = []
+    wrapped = sized = 0
+    in_picture = 0
+    for token in tokenize(content):
+        if token.name == 'picture':
+            in_picture += 1 if token.kind == 'starttag' else -1
+            continue
+        if token.kind != 'starttag' or token.name != 'img':
+            continue
+        attrs = parse_attrs(token.attrs_src)
+        target = resolve_reference(attrs.get('src', ''), base_dir)
+        if not target:
+            continue
+        entry = manifest.get(target)
+        if entry is None:
+            path = os.path.join(root_path, target)
+            size = image_size(path) if os.path.isfile(path) else None
+            entry = {'width': size[0], 'height': size[1], 'variants': {}} if size else None
+        if entry is None or not entry['width'] or not entry['height']:
+            continue
+
+        tag_text = content[token.start:token.end]
+        new_tag = _with_dimensions(tag_text, attrs, entry['width'], entry['height'])
+        sized += new_tag != tag_text
+
+        if any(entry['variants'].values()) and not in_picture and 'srcset' not in attrs:
+            sizes = _sizes_attribute(attrs, entry['width'])
+            sources = []
+            for extension, mime, _ in FORMATS:
+                variants = entry['variants'].get(extension)
+                if variants:
+                    candidates = [(width, path) for width, path, _ in variants]
+                    # When the largest variant was rejected, large screens fall back to the original
+                    if candidates[-1][0] < min(max(WIDTHS), entry['width']):
+                        candidates.append((entry['width'], target))
+                    srcset = ', '.join(f"{quote(posixpath.relpath(path, base_dir or '.'))} {width}w"
+                                       for width, path in candidates)
+                    sources.append(f'<source type="{mime}" srcset="{srcset}" sizes="{sizes}">')
+            new_tag = '<picture>' + ''.join(sources) + new_tag + '</picture>'
+            wrapped += 1
+
+        if new_tag != tag_text:
+            edits.append(Edit(token.start, token.end, new_tag))
+    return apply_edits(content, edits), wrapped, sized
+
+
+def rewrite_site(root_path="public_html", manifest=None, writer=None):
+    """Rewrite every page's images; returns (pages rewritten, images wrapped, images sized)"""
+    store = PageStore(root_path)
+    manifest = manifest or {}
+    writer = writer or InPlaceWriter()
+    pages = wrapped = sized = 0
+    for file_path in store.html_files():
+        content = store.read(file_path)
+        if content is None:
+            continue
+        base_dir = posixpath.dirname(store.relpath(file_path).replace(os.sep, '/'))
+        updated, page_wrapped, page_sized = rewrite_images(content, base_dir, root_path, manifest)
+        if updated != content:
+            writer.write(file_path, updated, content)
+            pages += 1
+            wrapped += page_wrapped
+            sized += page_sized
+    return pages, wrapped, sized
+
+
+def print_image_report(root_path, manifest):
+    """Source bytes against the smallest full-width variant per image"""
+    print(f"{'Image':<55} {'Size':>11} {'Source':>10} {'Best variant':>13}")
+    print("-" * 92)
+    for rel_path, entry in manifest.items():
+        source = os.path.getsize(os.path.join(root_path, rel_path))
+        best = min((variants[-1][2] for variants in entry['variants'].values()), default=None)
+        best_text = f"{best:,}" if best is not None else '-'
+        print(f"{rel_path:<55} {entry['width']:>5}x{entry['height']:<5} {source:>10,} {best_text:>13}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build AVIF/WebP image variants and rewrite <img> tags")
+    parser.add_argument('root_path', nargs='?', default="public_html")
+    parser.add_argument('--jobs', '-j', type=int, default=None,
+                        help="Number of worker processes (default: one per CPU)")
+    parser.add_argument('--manifest', default=DEFAULT_MANIFEST)
+    add_dry_run_arguments(parser)
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.root_path):
+        print(f"Error: {args.root_path} not found")
+        return 1
+
+    with writer_from_args(args) as writer:
+        manifest = build_images(args.root_path, args.jobs, args.manifest, writer)
+        print_image_report(args.root_path, manifest)
+        pages, wrapped, sized = rewrite_site(args.root_path, manifest, writer)
+        print(f"\n✅ {pages} pages rewritten: {wrapped} images wrapped in <picture>, {sized} given width/height")
+        formats = [extension for extension, _, _ in supported_formats()]
+        if not formats:
+            print("ℹ️  Install Pillow (11.3+ for AVIF) to generate image variants")
+        elif 'avif' not in formats:
+            print("ℹ️  This Pillow cannot encode AVIF - only WebP variants were built")
+        writer.summary()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Site Audit Runner for BC Roofing Website
+Runs the title, charset, meta tag and keyword analyzers over one shared page store
+"""
+
+import os
+import sys
+import time
+
+from page_store import PageStore
+from analyze_title_content import analyze_website, generate_report
+from verify_charset_encoding import check_charset_position
+from verify_meta_tags import verify_meta_tags
+from warren_keyword_density import extract_visible_text
+
+
+def run_site_audit(root_path="public_html", parser=None):
+    """Run every analyzer against the same parsed pages"""
+    start = time.perf_counter()
+    store = PageStore(root_path, parser)
+
+    print("🔍 Title-content alignment")
+    print("-" * 80)
+    results = analyze_website(root_path, store=store)
+    generate_report(results)
+
+    print("\n🔍 Charset placement")
+    print("-" * 80)
+    charset_issues = 0
+    for file_path in store.html_files():
+        result = check_charset_position(file_path, store=store)
+        if result['status'] != 'CORRECT':
+            charset_issues += 1
+            print(f"⚠️  {store.relpath(file_path)}: {result['message']}")
+    if not charset_issues:
+        print("✅ Charset is first in <head> on every page")
+
+    metal_roofing = os.path.join(root_path, 'metal-roofing.html')
+    if os.path.exists(metal_roofing):
+        print("\n🔍 Meta tags")
+        verify_meta_tags(metal_roofing, store=store)
+
+    print("\n🔍 Visible word counts")
+    print("-" * 80)
+    for file_path in store.html_files():
+        if file_path.endswith('-roofing.html'):
+            words = len(extract_visible_text(file_path, store=store).split())
+            print(f"• {store.relpath(file_path)}: {words} words")
+
+    elapsed = time.perf_counter() - start
+    print("\n" + "=" * 80)
+    print(f"Parser: {store.parser} | Pages read: {store.stats['reads']} | "
+          f"Pages parsed: {store.stats['parses']} | {elapsed:.2f}s")
+    print("=" * 80)
+    return store
+
+
+if __name__ == "__main__":
+    run_site_audit(sys.argv[1] if len(sys.argv) > 1 else "public_html")
@@ -0,0 +1,18 @@
+from analyze_title_content import check_words_in_content, normalize_word
+
+
+def test_plural_and_singular_share_a_stem():
+    assert normalize_word('services') == normalize_word('service') == 'service'
+    assert check_words_in_content(['Services'], 'we offer roofing service here') == (['Services'], [])
+    assert check_words_in_content(['service'], 'all our services') == (['service'], [])
+    assert check_words_in_content(['Gutters'], 'gutter cleaning') == (['Gutters'], [])
+    assert check_words_in_content(['Companies'], 'a local company') == (['Companies'], [])
+
+
+def test_roof_does_not_match_roofing():
+    assert check_words_in_content(['roof'], 'commercial roofing experts') == ([], ['roof'])
+    assert check_words_in_content(['roof'], 'we replace roofs') == (['roof'], [])
+
+
+def test_no_match_inside_unrelated_words():
+    assert check_words_in_content(['pro'], 'professional crews') == ([], ['pro'])
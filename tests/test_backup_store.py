@@ -0,0 +1,45 @@
+from backup_store import BackupStore
+
+
+def test_identical_content_is_stored_once(tmp_path):
+    site = tmp_path / 'site'
+    site.mkdir()
+    (site / 'a.html').write_text('<p>same</p>', encoding='utf-8')
+    (site / 'b.html').write_text('<p>same</p>', encoding='utf-8')
+
+    store = BackupStore(tmp_path / 'backups', site)
+    store.add(site / 'a.html')
+    store.add(site / 'b.html')
+    store.save_run()
+
+    assert store.stats == {'files': 2, 'blobs_written': 1, 'bytes_written': len('<p>same</p>')}
+    assert len(list((tmp_path / 'backups' / 'objects').glob('*/*'))) == 1
+    assert store.load_run('latest')['files'] == {'a.html': store.files['a.html'], 'b.html': store.files['a.html']}
+
+
+def test_restore_puts_changed_and_deleted_files_back(tmp_path):
+    site = tmp_path / 'site'
+    (site / 'blog').mkdir(parents=True)
+    (site / 'index.html').write_text('<p>home</p>', encoding='utf-8')
+    (site / 'blog' / 'post.html').write_bytes(b'<p>post\r\n</p>')
+
+    store = BackupStore(tmp_path / 'backups', site)
+    store.add(site / 'index.html')
+    store.add(site / 'blog' / 'post.html')
+    run_id = store.save_run().stem
+
+    (site / 'index.html').write_text('<p>changed</p>', encoding='utf-8')
+    (site / 'blog' / 'post.html').unlink()
+    (site / 'blog').rmdir()
+
+    assert BackupStore(tmp_path / 'backups').restore(run_id) == (2, 0)
+    assert (site / 'index.html').read_text(encoding='utf-8') == '<p>home</p>'
+    assert (site / 'blog' / 'post.html').read_bytes() == b'<p>post\r\n</p>'
+    assert BackupStore(tmp_path / 'backups').restore(run_id) == (0, 2)
+
+
+def test_a_run_without_files_writes_no_manifest(tmp_path):
+    store = BackupStore(tmp_path / 'backups', tmp_path)
+    store.begin_run()
+    assert store.save_run() is None
+    assert store.list_runs() == []
@@ -0,0 +1,58 @@
+from cache_policy import effective_policy, parse_expires, parse_htaccess, verify_site
+
+HTACCESS = '''
+<IfModule mod_expires.c>
+    ExpiresActive On
+    ExpiresDefault "access plus 1 day"
+    ExpiresByType image/png "access plus 1 year"
+</IfModule>
+<IfModule mod_nonexistent.c>
+    Header set Cache-Control "no-store"
+</IfModule>
+<FilesMatch "\\.html$">
+    Header set Cache-Control "no-cache"
+</FilesMatch>
+<Files ~ "-[0-9a-f]{8}\\.css$">
+    Header set Cache-Control "public, max-age=31536000, immutable"
+</Files>
+<If "%{HTTP_HOST} == 'staging.example.com'">
+    Header set Cache-Control "no-store"
+</If>
+'''
+
+
+def test_parse_expires_units_and_codes():
+    assert parse_expires('access plus 1 year') == 365 * 86400
+    assert parse_expires('access plus 1 week 2 days') == 9 * 86400
+    assert parse_expires('A3600') == 3600
+    assert parse_expires('modification plus 1 hour', mtime=1000, now=1600) == 3000
+    assert parse_expires('bogus') is None
+
+
+def test_sections_are_resolved_and_unevaluated_ones_reported():
+    skipped = []
+    directives = parse_htaccess(HTACCESS, skipped=skipped)
+    assert skipped == [(16, 'If')]
+    assert all(d.args != ['set', 'Cache-Control', 'no-store'] for d in directives)
+
+
+def test_effective_policy_per_file():
+    directives = parse_htaccess(HTACCESS)
+    assert effective_policy(directives, 'logo.png').lifetime == 365 * 86400
+    assert effective_policy(directives, 'notes.txt').cache_control == 'max-age=86400'
+    page = effective_policy(directives, 'index.html')
+    assert page.cache_control == 'no-cache' and page.lifetime == 0
+    # <Files ~ "regex"> behaves like <FilesMatch>
+    hashed = effective_policy(directives, 'styles-1a2b3c4d.css')
+    assert hashed.lifetime == 31536000
+    assert effective_policy(directives, 'styles.css').lifetime == 86400
+
+
+def test_verify_site_warns_about_immutable_unhashed_files(tmp_path):
+    (tmp_path / '.htaccess').write_text(
+        'Header set Cache-Control "public, max-age=31536000, immutable"\n', encoding='utf-8')
+    (tmp_path / 'app.js').write_text('1', encoding='utf-8')
+    (tmp_path / 'app-1a2b3c4d.js').write_text('1', encoding='utf-8')
+    results, warnings = verify_site(str(tmp_path))
+    assert [result['file'] for result in results] == ['app-1a2b3c4d.js', 'app.js']
+    assert warnings == ['app.js: immutable but not fingerprinted, so edits never reach repeat visitors']
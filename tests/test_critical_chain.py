@@ -0,0 +1,27 @@
+import json
+
+import pytest
+
+from critical_chain import main
+
+
+def make_site(tmp_path):
+    (tmp_path / 'css').mkdir()
+    (tmp_path / 'css' / 'styles.css').write_text('body { color: #333; }\n', encoding='utf-8')
+    (tmp_path / 'index.html').write_text(
+        '<html><head><link rel="stylesheet" href="css/styles.css"></head><body></body></html>\n',
+        encoding='utf-8')
+    return tmp_path
+
+
+def test_zero_rtt_overrides_the_profile(tmp_path):
+    root = make_site(tmp_path)
+    out = tmp_path / 'chain.json'
+    assert main(['--root', str(root), '--rtt', '0', '--json', str(out)]) == 0
+    assert json.loads(out.read_text(encoding='utf-8'))['profile']['rtt_ms'] == 0
+
+
+@pytest.mark.parametrize('argv', [['--bandwidth', '0'], ['--bandwidth', '-5'], ['--rtt', '-1'], ['--rtt', 'fast']])
+def test_invalid_network_overrides_are_rejected(tmp_path, argv):
+    with pytest.raises(SystemExit):
+        main(['--root', str(make_site(tmp_path))] + argv)
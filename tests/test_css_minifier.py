@@ -0,0 +1,39 @@
+import json
+
+from css_minifier import build_css, minify_css, strip_css
+
+
+def test_whitespace_and_comments_are_removed_but_strings_and_calc_kept():
+    assert minify_css('/*! keep */\n/* drop */ a { width : calc(100% - 2px) ; }') == '/*! keep */a{width:calc(100% - 2px)}'
+    assert minify_css('a::before { content: "a  b" }') == 'a::before{content:"a  b"}'
+
+
+def test_adjacent_duplicate_rules_are_merged():
+    assert minify_css('a{x:1}a{y:2}') == 'a{x:1;y:2}'
+    assert minify_css('a{color:red}\nb{color:red}') == 'a,b{color:red}'
+    assert minify_css('a{x:1;x:1}') == 'a{x:1}'
+    assert minify_css('@media (max-width:600px){ a{x:1} a{y:2} }') == '@media (max-width:600px){a{x:1;y:2}}'
+    assert strip_css('a{x:1}a{y:2}') == 'a{x:1}a{y:2}'
+
+
+def test_vendor_selectors_are_not_merged_into_a_list():
+    # One unknown selector would drop the whole list in other browsers
+    assert minify_css('a{x:1}b::-moz-selection{x:1}') == 'a{x:1}b::-moz-selection{x:1}'
+
+
+def test_build_css_writes_min_files_and_bundles(tmp_path):
+    css_dir = tmp_path / 'css'
+    css_dir.mkdir()
+    (css_dir / 'styles.css').write_text('a { color: red; }\n', encoding='utf-8')
+    (css_dir / 'extras.css').write_text('b { color: blue; }\n', encoding='utf-8')
+    (css_dir / 'page.css').write_text('p { margin: 0; }\n', encoding='utf-8')
+    bundles = tmp_path / 'bundles.json'
+    bundles.write_text(json.dumps({'styles.min.css': ['styles.css', 'extras.css']}), encoding='utf-8')
+
+    reports = build_css(css_dir, bundles)
+
+    assert sorted(name for name, _ in reports) == ['page.min.css', 'styles.min.css']
+    assert (css_dir / 'page.min.css').read_text(encoding='utf-8') == 'p{margin:0}'
+    # The bundle output is not overwritten by styles.css alone
+    assert (css_dir / 'styles.min.css').read_text(encoding='utf-8') == 'a{color:red}b{color:blue}'
+    assert not (css_dir / 'extras.min.css').exists()
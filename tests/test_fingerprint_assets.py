@@ -0,0 +1,52 @@
+import json
+
+from fingerprint_assets import (MANIFEST_NAME, busted_name, content_hash, fingerprint_assets,
+                                revert_fingerprints, rewrite_references)
+
+
+def test_busted_name_keeps_directory_and_extension():
+    assert busted_name('css/styles.min.css', '1a2b3c4d') == 'css/styles.min-1a2b3c4d.css'
+    assert len(content_hash(b'body{}')) == 8
+
+
+def test_references_are_rewritten_the_way_they_were_written():
+    mapping = {'css/a.css': 'css/a-11111111.css', 'images/b.png': 'images/b-22222222.png'}
+    page = ('<link href="../css/a.css?v=2"><img src="/images/b.png" srcset="../images/b.png 2x, x.png 1x">'
+            '<style>.x{background:url(\'../images/b.png\')}</style><a href="https://x.test/css/a.css">')
+    updated, count = rewrite_references(page, 'blog', mapping)
+    assert updated == ('<link href="../css/a-11111111.css?v=2"><img src="/images/b-22222222.png" '
+                       'srcset="../images/b-22222222.png 2x, x.png 1x">'
+                       '<style>.x{background:url(\'../images/b-22222222.png\')}</style><a href="https://x.test/css/a.css">')
+    assert count == 4
+
+
+def make_site(tmp_path):
+    (tmp_path / 'css').mkdir()
+    (tmp_path / 'images').mkdir()
+    (tmp_path / 'images' / 'logo.png').write_bytes(b'\x89PNG logo')
+    (tmp_path / 'css' / 'styles.css').write_text('.logo{background:url(../images/logo.png)}', encoding='utf-8')
+    (tmp_path / 'index.html').write_text('<link rel="stylesheet" href="css/styles.css"><img src="images/logo.png">',
+                                         encoding='utf-8')
+    return tmp_path
+
+
+def test_fingerprint_then_revert(tmp_path):
+    root = make_site(tmp_path)
+    result = fingerprint_assets(root)
+    assert result == {'assets': 2, 'pages_rewritten': 1, 'references': 2}
+
+    assets = json.loads((root / MANIFEST_NAME).read_text(encoding='utf-8'))['assets']
+    logo = assets['images/logo.png']['busted']
+    styles = assets['css/styles.css']['busted']
+    assert (root / logo).read_bytes() == b'\x89PNG logo'
+    # Stylesheets point at the hashed images they use
+    assert f'url(../{logo})' in (root / styles).read_text(encoding='utf-8')
+    page = (root / 'index.html').read_text(encoding='utf-8')
+    assert f'href="{styles}"' in page and f'src="{logo}"' in page
+
+    # A rerun finds nothing new to rewrite
+    assert fingerprint_assets(root)['pages_rewritten'] == 0
+
+    revert_fingerprints(root)
+    assert (root / 'index.html').read_text(encoding='utf-8') == \
+        '<link rel="stylesheet" href="css/styles.css"><img src="images/logo.png">'
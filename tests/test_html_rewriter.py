@@ -0,0 +1,94 @@
+import pytest
+
+from html_rewriter import (HtmlRewriter, Transform, Edit, REMOVE_ELEMENT, tokenize, parse_attrs,
+                           add_attribute, set_attribute, apply_edits)
+
+
+class RemoveTags(Transform):
+    name = 'remove_tags'
+
+    def __init__(self, *tags):
+        self.tags = set(tags)
+
+    def on_starttag(self, token, text, context):
+        return REMOVE_ELEMENT
+
+
+class DropComments(Transform):
+    name = 'drop_comments'
+
+    def on_comment(self, token, text, context):
+        return ''
+
+
+def kinds(content):
+    return [(token.kind, token.name, content[token.start:token.end]) for token in tokenize(content)]
+
+
+def test_comments_are_single_tokens_even_with_tags_inside():
+    content = '<p>a<!-- <b>not a tag</b> --></p>'
+    assert kinds(content) == [
+        ('starttag', 'p', '<p>'), ('text', None, 'a'),
+        ('comment', None, '<!-- <b>not a tag</b> -->'), ('endtag', 'p', '</p>')
+    ]
+
+
+def test_raw_text_elements_hide_tags_until_their_end_tag():
+    content = '<script>if (a < b) { x = "</div>"; }</script><title>A <b> B</title>'
+    tokens = list(tokenize(content))
+    assert [(t.kind, t.name) for t in tokens] == [
+        ('starttag', 'script'), ('rawtext', 'script'), ('endtag', 'script'),
+        ('starttag', 'title'), ('rawtext', 'title'), ('endtag', 'title')
+    ]
+    assert tokens[0].close_end == content.index('<title>')
+    assert content[tokens[1].start:tokens[1].end] == 'if (a < b) { x = "</div>"; }'
+
+
+def test_unquoted_and_duplicate_attributes():
+    attrs = parse_attrs(' src=a.jpg width=100 alt="x > y" width=200 hidden data-X=\'q\'')
+    assert attrs == {'src': 'a.jpg', 'width': '100', 'alt': 'x > y', 'hidden': '', 'data-x': 'q'}
+    assert kinds('<img alt="a>b" src=x>')[0] == ('starttag', 'img', '<img alt="a>b" src=x>')
+
+
+def test_set_attribute_replaces_the_first_duplicate_and_add_attribute_appends():
+    assert set_attribute('<img width=auto width="5">', 'width', 10) == '<img width="10" width="5">'
+    assert set_attribute('<img src="a" />', 'height', 3) == '<img src="a" height="3" />'
+    assert add_attribute('<script src="a.js">', 'defer') == '<script src="a.js" defer>'
+
+
+def test_overlapping_edits_are_rejected():
+    assert apply_edits('abcdef', [Edit(4, 5, 'E'), Edit(0, 1, 'A')]) == 'AbcdEf'
+    with pytest.raises(ValueError):
+        apply_edits('abcdef', [Edit(0, 3, ''), Edit(2, 4, '')])
+
+
+def test_remove_element_drops_content_and_end_tag():
+    content = '<div><p>keep</p><aside>x <b>y</b><aside>z</aside></aside><p>keep</p></div>'
+    new_content, stats = HtmlRewriter([RemoveTags('aside')]).rewrite(content)
+    assert new_content == '<div><p>keep</p><p>keep</p></div>'
+    assert stats['remove_tags']['bytes_delta'] == len(new_content) - len(content)
+
+
+def test_remove_element_without_end_tag_stops_at_the_enclosing_end_tag():
+    content = '<div><section>open<p>a</div><p>after</p>'
+    new_content, _ = HtmlRewriter([RemoveTags('section')]).rewrite(content)
+    assert new_content == '<div></div><p>after</p>'
+
+
+def test_remove_element_on_raw_text_and_void_elements():
+    content = '<style>\n</style><br><script>x()</script><img src=a>'
+    new_content, _ = HtmlRewriter([RemoveTags('style', 'img')]).rewrite(content)
+    assert new_content == '<br><script>x()</script>'
+
+
+def test_removed_lines_leave_no_whitespace_only_lines():
+    content = ('<head>\n    <meta a>\n\n    <!-- section -->\n\n    <meta b>\n'
+               '    <!-- one -->\n    <!-- two -->\n    <meta c>\n</head>\n')
+    new_content, _ = HtmlRewriter([DropComments()]).rewrite(content)
+    assert new_content == '<head>\n    <meta a>\n\n    <meta b>\n    <meta c>\n</head>\n'
+
+
+def test_lines_inside_pre_and_inline_comments_are_kept():
+    content = '<pre>\n  <!-- c -->\n</pre>\n<p>a <!-- c --> b</p>\n'
+    new_content, _ = HtmlRewriter([DropComments()]).rewrite(content)
+    assert new_content == '<pre>\n  \n</pre>\n<p>a  b</p>\n'
@@ -0,0 +1,27 @@
+import re
+
+from keyword_index import KeywordIndex
+
+TEXT = ("roofing in st. clair shores - the st. clair shores roofing company. "
+        "warren. roofing company - warren roofers, st clair")
+
+
+def regex_count(keyword, text):
+    return len(re.findall(r'\b' + re.escape(keyword) + r'\b', text))
+
+
+def test_punctuated_keywords_match_the_regex_counter():
+    index = KeywordIndex()
+    index.add_page('page.html', TEXT)
+    for keyword in ('st. clair shores', 'st. clair', 'st clair', 'roofing company', 'warren roofing',
+                    'roofing company warren', 'roofing company - warren', 'roofing'):
+        assert index.count(keyword, 'page.html') == regex_count(keyword, TEXT), keyword
+
+
+def test_city_keywords_use_the_pages_spelling():
+    index = KeywordIndex()
+    index.add_page('st-clair-shores-roofing.html', TEXT)
+    results = index.query(['{city}', '{city} roofing'], ['st-clair-shores-roofing.html'])
+    keywords = results['st-clair-shores-roofing.html']['keywords']
+    assert keywords['st. clair shores']['count'] == regex_count('st. clair shores', TEXT) == 2
+    assert keywords['st. clair shores roofing']['count'] == 1
@@ -0,0 +1,28 @@
+import re
+
+from keyword_matcher import KeywordAutomaton
+
+TEXT = ("roofers warren mi - the best roofers warren has. warren roofers fix roofs; "
+        "roof repair warren, roof repair warren mi and roofing. roof roof roof. st. clair shores")
+
+KEYWORDS = ['roofers warren', 'roofers warren mi', 'warren', 'roof', 'roofing', 'roof repair warren',
+            'roof repair warren mi', 'roof roof', 'st. clair shores', 'clair', 'Warren', 'missing']
+
+
+def regex_count(keyword, text):
+    return len(re.findall(r'\b' + re.escape(keyword.lower()) + r'\b', text))
+
+
+def test_counts_match_the_regex_counter():
+    counts = KeywordAutomaton(KEYWORDS).count(TEXT)
+    assert counts == {keyword: regex_count(keyword, TEXT) for keyword in KEYWORDS}
+
+
+def test_word_boundaries_and_overlaps():
+    automaton = KeywordAutomaton(['roof', 'roof roof', 'war'])
+    assert automaton.count('roofing roof_top roof roof roof warren') == {'roof': 3, 'roof roof': 1, 'war': 0}
+
+
+def test_duplicate_and_empty_keywords():
+    automaton = KeywordAutomaton(['Warren', 'warren', ''])
+    assert automaton.count('warren, warren') == {'Warren': 2, 'warren': 2, '': 0}
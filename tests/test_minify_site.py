@@ -0,0 +1,11 @@
+from minify_site import minify_html
+
+
+def test_space_before_comment_between_inline_elements_is_kept():
+    assert minify_html('<p><b>x</b> <!--c--><b>y</b></p>') == '<p><b>x</b> <b>y</b></p>'
+    assert minify_html('<p><b>x</b> <!--c--> <b>y</b></p>') == '<p><b>x</b> <b>y</b></p>'
+
+
+def test_space_next_to_block_elements_or_at_end_is_dropped():
+    assert minify_html('<div>\n  <p>x</p>\n  <!-- c -->\n</div>\n') == '<div><p>x</p></div>'
+    assert minify_html('<p>x</p> <!-- trailing -->') == '<p>x</p>'
@@ -0,0 +1,66 @@
+import io
+import os
+import sys
+import argparse
+import subprocess
+
+from page_writer import DryRunWriter, InPlaceWriter, add_dry_run_arguments, writer_from_args, write_atomic
+
+
+def parse(argv):
+    parser = argparse.ArgumentParser()
+    add_dry_run_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def test_patch_implies_dry_run(tmp_path):
+    patch = tmp_path / 'changes.patch'
+    with writer_from_args(parse(['--patch', str(patch)])) as writer:
+        assert writer.dry_run
+    assert isinstance(writer_from_args(parse([])), InPlaceWriter)
+
+
+def test_stdout_is_redirected_only_inside_the_with_block(capsys):
+    stdout = sys.stdout
+    with writer_from_args(parse(['--dry-run'])) as writer:
+        assert writer.stream is stdout
+        assert sys.stdout is sys.stderr
+        print('report')
+    assert sys.stdout is stdout
+    captured = capsys.readouterr()
+    assert captured.out == '' and 'report' in captured.err
+
+
+def test_diff_paths_are_relative_to_the_repository(tmp_path, monkeypatch):
+    repo = tmp_path / 'repo'
+    (repo / 'public_html').mkdir(parents=True)
+    page = repo / 'public_html' / 'index.html'
+    page.write_text('<p>old</p>\n', encoding='utf-8')
+    subprocess.run(['git', 'init', '-q', str(repo)], check=True)
+
+    elsewhere = tmp_path / 'elsewhere'
+    elsewhere.mkdir()
+    monkeypatch.chdir(elsewhere)
+    stream = io.StringIO()
+    with DryRunWriter(stream=stream) as writer:
+        writer.write(os.path.relpath(page), '<p>new</p>\n')
+
+    patch = stream.getvalue()
+    assert '--- a/public_html/index.html\n+++ b/public_html/index.html\n' in patch
+    assert page.read_text(encoding='utf-8') == '<p>old</p>\n'
+    (repo / 'changes.patch').write_text(patch, encoding='utf-8')
+    subprocess.run(['git', 'apply', 'changes.patch'], cwd=repo, check=True)
+    assert page.read_text(encoding='utf-8') == '<p>new</p>\n'
+
+
+def test_write_atomic_writes_text_and_bytes_and_keeps_the_mode(tmp_path):
+    page = tmp_path / 'page.html'
+    page.write_text('old', encoding='utf-8')
+    page.chmod(0o640)
+    write_atomic(page, 'línea\r\n')
+    assert page.read_bytes() == 'línea\r\n'.encode('utf-8')
+    assert page.stat().st_mode & 0o777 == 0o640
+
+    write_atomic(tmp_path / 'image.webp', b'\x00RIFF')
+    assert (tmp_path / 'image.webp').read_bytes() == b'\x00RIFF'
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['image.webp', 'page.html']
@@ -0,0 +1,72 @@
+import io
+import contextlib
+from pathlib import Path
+
+import pytest
+
+from html_parsers import PARSER_BACKENDS, available_backends
+from page_store import PageStore
+from analyze_title_content import analyze_website
+from verify_charset_encoding import check_charset_position
+from warren_keyword_density import extract_visible_text, count_keyword_occurrences, TARGET_KEYWORDS
+from keyword_matcher import KeywordAutomaton
+
+SITE_ROOT = Path(__file__).resolve().parent.parent / 'public_html'
+REFERENCE_BACKEND = 'html.parser'
+
+# Results a backend is known to report differently from html.parser. These pages'
+# <meta name="description" ...> tag is missing its closing '>': lxml (like browsers)
+# still reads the description, html.parser loses it. Fix the markup, then drop the entry.
+KNOWN_DIFFERENCES = {
+    'lxml': {
+        'meta:blog/posts/michigan-roof-lifespan.html',
+        'meta:commercial-roofing.html',
+        'meta:contact.html',
+        'meta:gutter-services.html',
+        'meta:index.html',
+        'meta:residential-roofing.html',
+        'meta:service-areas.html',
+    },
+}
+
+
+def collect_analysis(root_path, backend):
+    """Everything the analyzers report for a site, keyed by check and page"""
+    store = PageStore(root_path, backend)
+    output = {}
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = analyze_website(root_path, store=store)
+    output['title_content'] = results['pages_with_issues']
+
+    automaton = KeywordAutomaton(TARGET_KEYWORDS)
+    for file_path in store.html_files():
+        page = store.relpath(file_path).replace('\\', '/')
+        output[f'charset:{page}'] = check_charset_position(file_path, store=store)
+
+        text = extract_visible_text(file_path, store=store)
+        output[f'keywords:{page}'] = count_keyword_occurrences(text, TARGET_KEYWORDS, automaton)
+
+        soup = store.soup(file_path)
+        title_tag = soup.find('title')
+        desc_tag = soup.find('meta', attrs={'name': 'description'})
+        output[f'meta:{page}'] = {
+            'title': title_tag.get_text() if title_tag else None,
+            'description': desc_tag.get('content') if desc_tag else None
+        }
+
+    return output
+
+
+@pytest.fixture(scope='module')
+def reference():
+    return collect_analysis(str(SITE_ROOT), REFERENCE_BACKEND)
+
+
+@pytest.mark.parametrize('backend', [backend for backend in PARSER_BACKENDS if backend != REFERENCE_BACKEND])
+def test_backend_matches_html_parser_except_known_differences(backend, reference):
+    if backend not in available_backends():
+        pytest.skip(f"{backend} is not installed or cannot be imported")
+    candidate = collect_analysis(str(SITE_ROOT), backend)
+    differences = {key for key in set(reference) | set(candidate) if reference.get(key) != candidate.get(key)}
+    assert differences == KNOWN_DIFFERENCES.get(backend, set())
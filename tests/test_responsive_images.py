@@ -0,0 +1,64 @@
+import json
+import random
+
+import pytest
+
+import responsive_images
+from responsive_images import _with_dimensions, build_images, rewrite_images
+from html_rewriter import parse_attrs
+
+
+def img_attrs(tag):
+    return parse_attrs(tag[len('<img'):-1])
+
+
+def test_non_numeric_dimensions_are_replaced_not_duplicated():
+    tag = '<img src="a.jpg" width="auto" alt="">'
+    new_tag = _with_dimensions(tag, img_attrs(tag), 800, 600)
+    assert new_tag == '<img src="a.jpg" width="800" alt="" height="600">'
+
+    tag = '<img src="a.jpg" width="400" height=auto>'
+    assert _with_dimensions(tag, img_attrs(tag), 800, 600) == '<img src="a.jpg" width="400" height="300">'
+
+    tag = '<img src="a.jpg" width="400" height="300">'
+    assert _with_dimensions(tag, img_attrs(tag), 800, 600) == tag
+
+
+def test_original_is_the_largest_candidate_without_a_full_width_variant():
+    manifest = {'images/a b.jpg': {'width': 1000, 'height': 500, 'variants': {
+        'webp': [[320, 'images/responsive/a-b-1-320w.webp', 900], [640, 'images/responsive/a-b-1-640w.webp', 2000]]
+    }}}
+    content, wrapped, _ = rewrite_images('<img src="images/a%20b.jpg">', '', '.', manifest)
+    assert wrapped == 1
+    assert ('srcset="images/responsive/a-b-1-320w.webp 320w, images/responsive/a-b-1-640w.webp 640w, '
+            'images/a%20b.jpg 1000w"') in content
+
+
+def test_rejected_variants_are_not_encoded_again(tmp_path, monkeypatch):
+    Image = pytest.importorskip('PIL.Image')
+    rng = random.Random(0)
+    noise = Image.new('RGB', (400, 300))
+    noise.putdata([(rng.randrange(256), rng.randrange(256), rng.randrange(256)) for _ in range(400 * 300)])
+    # A heavily compressed JPEG of noise: every WebP variant at quality 80 comes out larger
+    noise.save(tmp_path / 'noise.jpg', quality=5)
+    (tmp_path / 'index.html').write_text('<img src="noise.jpg">', encoding='utf-8')
+    manifest_path = tmp_path / 'manifest.json'
+    monkeypatch.setattr(responsive_images, 'supported_formats', lambda: [('webp', 'image/webp', 80)])
+
+    manifest = build_images(str(tmp_path), jobs=1, manifest_path=manifest_path)
+    entry = manifest['noise.jpg']
+    assert [400, 'webp'] in entry['rejected']
+    assert json.loads(manifest_path.read_text(encoding='utf-8'))['noise.jpg']['rejected'] == entry['rejected']
+
+    def no_encoding(*args, **kwargs):
+        raise AssertionError("a rejected variant was encoded again")
+
+    monkeypatch.setattr(responsive_images.Image, 'open', no_encoding)
+    assert build_images(str(tmp_path), jobs=1, manifest_path=manifest_path) == manifest
+
+
+def test_sources_wider_than_the_largest_width_do_not_list_the_original():
+    variants = [[width, f'images/responsive/a-1-{width}w.webp', 100] for width in (320, 640, 960, 1280, 1920)]
+    manifest = {'a.png': {'width': 3000, 'height': 1000, 'variants': {'webp': variants}}}
+    content, _, _ = rewrite_images('<img src="a.png">', '', '.', manifest)
+    assert 'a.png 3000w' not in content and '1920w"' in content
@@ -6,14 +6,22 @@ Verifies that UTF-8 charset is properly declared in HTML files
 
 import os
 import re
-from bs4 import BeautifulSoup
+from html_parsers import make_soup
 
-def check_charset_position(file_path):
+def check_charset_position(file_path, store=None):
     """Check if charset meta tag is properly positioned in HTML file"""
     
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        if store is not None:
+            if not store.is_valid_utf8(file_path):
+                return {
+                    'status': 'ERROR',
+                    'message': 'File is not valid UTF-8'
+                }
+            content = store.read(file_path)
+        else:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                content = f.read()
         
         # Check for DOCTYPE
         has_doctype = content.strip().lower().startswith('<!doctype html>')
@@ -52,7 +60,10 @@ def check_charset_position(file_path):
             position_msg = f'Content found before charset: {content_between[:100]}...'
         
         # Parse with BeautifulSoup for additional validation
-        soup = BeautifulSoup(content, 'html.parser')
+        if store is not None:
+            soup = store.soup(file_path)
+        else:
+            soup = make_soup(content)
         
         # Check charset value
         charset_tag = soup.find('meta', attrs={'charset': True})
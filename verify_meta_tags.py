@@ -5,18 +5,19 @@ Verifies the updated meta tags meet SEO requirements
 """
 
 import re
-from bs4 import BeautifulSoup
+from html_parsers import make_soup
 
-def verify_meta_tags():
+def verify_meta_tags(file_path='/mnt/c/Users/adams/OneDrive/Desktop/BC Roofing Website/public_html/metal-roofing.html', store=None):
     """Verify the updated metal roofing page meta tags"""
     
-    file_path = '/mnt/c/Users/adams/OneDrive/Desktop/BC Roofing Website/public_html/metal-roofing.html'
-    
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        soup = BeautifulSoup(content, 'html.parser')
+        if store is not None:
+            soup = store.soup(file_path)
+        else:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+            
+            soup = make_soup(content)
         
         # Extract title
         title_tag = soup.find('title')
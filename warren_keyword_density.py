@@ -4,21 +4,24 @@ Warren Page Keyword Density Analyzer
 Analyzes keyword usage and density for SEO optimization
 """
 
-import re
-from bs4 import BeautifulSoup
-from collections import Counter
+from bs4 import NavigableString, CData
+from html_parsers import make_soup
+from keyword_matcher import KeywordAutomaton
 
-def extract_visible_text(html_file):
+def extract_visible_text(html_file, store=None):
     """Extract visible text from HTML file"""
-    with open(html_file, 'r', encoding='utf-8') as f:
-        soup = BeautifulSoup(f.read(), 'html.parser')
-    
-    # Remove script and style elements
-    for script in soup(["script", "style"]):
-        script.decompose()
+    if store is not None:
+        soup = store.soup(html_file)
+    else:
+        with open(html_file, 'r', encoding='utf-8') as f:
+            soup = make_soup(f.read())
     
-    # Get text
-    text = soup.get_text()
+    # Get text, skipping script and style elements without touching the tree
+    text = ''.join(
+        string for string in soup.find_all(string=True)
+        if type(string) in (NavigableString, CData)
+        and string.parent.name not in ('script', 'style')
+    )
     
     # Break into lines and remove leading/trailing space
     lines = (line.strip() for line in text.splitlines())
@@ -29,17 +32,16 @@ def extract_visible_text(html_file):
     
     return text.lower()
 
-def count_keyword_occurrences(text, keywords):
-    """Count occurrences of specific keywords/phrases"""
-    results = {}
+def count_keyword_occurrences(text, keywords, automaton=None):
+    """Count occurrences of specific keywords/phrases
     
-    for keyword in keywords:
-        # Use word boundaries for more accurate counting
-        pattern = r'\b' + re.escape(keyword.lower()) + r'\b'
-        matches = re.findall(pattern, text.lower())
-        results[keyword] = len(matches)
+    All keywords are matched with word boundaries in a single pass over the
+    text. Pass a prebuilt KeywordAutomaton to reuse it across pages.
+    """
+    if automaton is None:
+        automaton = KeywordAutomaton(keywords)
     
-    return results
+    return automaton.count(text.lower())
 
 def calculate_density(text, keyword_counts):
     """Calculate keyword density as percentage"""
@@ -57,48 +59,48 @@ def calculate_density(text, keyword_counts):
     
     return densities, total_words
 
-def analyze_warren_page():
+# Target keywords to analyze
+TARGET_KEYWORDS = [
+    # Primary targets
+    'roofers warren',
+    'roof repair warren',
+    
+    # Variations
+    'warren roofing contractors',
+    'roofing company warren',
+    'warren roof repair',
+    'roof repair warren mi',
+    'warren roofers',
+    'roofers warren mi',
+    
+    # Existing important keywords to preserve
+    'warren',
+    'roofing',
+    'roof',
+    'roofer',
+    'top',
+    'gaf',
+    'big cat roofing',
+    
+    # Service keywords
+    'roof replacement',
+    'emergency',
+    'commercial',
+    'residential'
+]
+
+def analyze_warren_page(file_path='/mnt/c/Users/adams/OneDrive/Desktop/BC Roofing Website/public_html/warren-roofing.html', store=None):
     """Analyze the Warren page for keyword optimization"""
     
-    # Target keywords to analyze
-    target_keywords = [
-        # Primary targets
-        'roofers warren',
-        'roof repair warren',
-        
-        # Variations
-        'warren roofing contractors',
-        'roofing company warren',
-        'warren roof repair',
-        'roof repair warren mi',
-        'warren roofers',
-        'roofers warren mi',
-        
-        # Existing important keywords to preserve
-        'warren',
-        'roofing',
-        'roof',
-        'roofer',
-        'top',
-        'gaf',
-        'big cat roofing',
-        
-        # Service keywords
-        'roof replacement',
-        'emergency',
-        'commercial',
-        'residential'
-    ]
+    target_keywords = TARGET_KEYWORDS
     
     # Analyze the file
-    file_path = '/mnt/c/Users/adams/OneDrive/Desktop/BC Roofing Website/public_html/service-areas/warren.html'
-    
     print("=" * 80)
     print("WARREN PAGE KEYWORD DENSITY ANALYSIS")
     print("=" * 80)
     
     # Extract text
-    text = extract_visible_text(file_path)
+    text = extract_visible_text(file_path, store=store)
     
     # Count keywords
     keyword_counts = count_keyword_occurrences(text, target_keywords)